@@ -0,0 +1,48 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/batch_throughput.py
+# =============================================
+"""
+Compara el throughput de N llamadas a /api/predict contra una sola llamada
+a /api/predict/batch con los mismos registros.
+
+El modelo se entrena en memoria sobre bank.csv y el acceso a base de datos se
+sustituye por no-ops, de modo que se mide solo el coste de la API y el modelo.
+
+Uso:
+    python -m app.benchmarks.batch_throughput [N]
+"""
+
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from app.benchmarks.common import load_controller, valid_records
+from app.main import app
+
+
+def run(n: int = 2000) -> dict:
+    load_controller()
+    client = TestClient(app)
+    records = valid_records(n)
+
+    start = time.perf_counter()
+    for record in records:
+        client.post("/api/predict", json=record).raise_for_status()
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    client.post("/api/predict/batch", json={"records": records}).raise_for_status()
+    batch_s = time.perf_counter() - start
+
+    return {
+        "records": n,
+        "single_rows_per_s": round(n / single_s, 1),
+        "batch_rows_per_s": round(n / batch_s, 1),
+        "speedup": round(single_s / batch_s, 1),
+    }
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(run(n))
@@ -0,0 +1,124 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/bench_micro.py
+# =============================================
+"""
+Micro-benchmarks con puerta de regresión: preprocesamiento, entrenamiento y
+etapas de make_prediction, sobre bank.csv y sobre datos sintéticos x10
+(app/services/synthetic_data.py, semilla fija).
+
+    pytest app/benchmarks/bench_micro.py -q
+    BENCH_UPDATE_BASELINE=1 pytest app/benchmarks/bench_micro.py -q
+
+Ver app/benchmarks/conftest.py y app/benchmarks/regression.py.
+"""
+
+import pandas as pd
+import pytest
+
+from app.benchmarks.common import load_controller, valid_records
+from app.controllers import predict_controller
+from app.services import train_model
+from app.services.data_preprocessing import encode_categorical, preprocess_data
+from app.services.prediction_cache import cache_key
+from app.services.synthetic_data import SyntheticModel
+
+DATA_PATH = "app/data/raw/bank.csv"
+SCALES = (1, 10)
+
+
+def scaled_copy(df: pd.DataFrame, factor: int, seed: int = 0) -> pd.DataFrame:
+    """bank.csv tal cual (factor 1) o len(df) * factor filas sintéticas aprendidas de él."""
+    if factor == 1:
+        return df
+    n_rows = len(df) * factor
+    return pd.concat(SyntheticModel.fit(df).generate(n_rows, seed=seed), ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def raw_frames():
+    raw = pd.read_csv(DATA_PATH)
+    return {factor: scaled_copy(raw, factor) for factor in SCALES}
+
+
+@pytest.fixture(scope="module")
+def csv_paths(raw_frames, tmp_path_factory):
+    directory = tmp_path_factory.mktemp("bench")
+    paths = {}
+    for factor, frame in raw_frames.items():
+        paths[factor] = str(directory / f"bank_x{factor}.csv")
+        frame.to_csv(paths[factor], index=False)
+    return paths
+
+
+@pytest.fixture(scope="module")
+def encoded_frames(raw_frames):
+    return {factor: encode_categorical(frame.dropna())[0] for factor, frame in raw_frames.items()}
+
+
+@pytest.fixture(scope="module")
+def controller():
+    load_controller()
+    records = valid_records(256)
+    active = predict_controller.model_registry.current
+    processed = [predict_controller._normalize_record(r) for r in records]
+    return active, records, processed
+
+
+@pytest.mark.parametrize("factor", SCALES)
+def test_encode_categorical(benchmark, raw_frames, factor):
+    frame = raw_frames[factor]
+    benchmark(f"encode_categorical_x{factor}", lambda: encode_categorical(frame), repeat=5 if factor == 1 else 3)
+
+
+@pytest.mark.parametrize("factor", SCALES)
+def test_preprocess_data(benchmark, csv_paths, factor):
+    path = csv_paths[factor]
+    benchmark(f"preprocess_data_x{factor}", lambda: preprocess_data(path), repeat=5 if factor == 1 else 3)
+
+
+@pytest.mark.parametrize("factor", SCALES)
+def test_train_and_evaluate(benchmark, encoded_frames, factor, tmp_path, monkeypatch):
+    monkeypatch.setattr(train_model, "LOG_PATH", str(tmp_path / "training.log"))
+    frame = encoded_frames[factor]
+    benchmark(f"train_and_evaluate_x{factor}", lambda: train_model.train_and_evaluate(frame),
+              repeat=5 if factor == 1 else 3)
+
+
+def test_normalize_record(benchmark, controller):
+    _, records, _ = controller
+    benchmark("predict_normalize_256", lambda: [predict_controller._normalize_record(r) for r in records], number=40)
+
+
+def test_cache_key(benchmark, controller):
+    _, _, processed = controller
+    benchmark("predict_cache_key_256", lambda: [cache_key(p) for p in processed], number=40)
+
+
+def test_encode_row(benchmark, controller):
+    active, _, processed = controller
+    build_row = active.feature_builder.build_row
+    benchmark("predict_encode_row_256", lambda: [build_row(p) for p in processed], number=40)
+
+
+def test_compiled_predict_one(benchmark, controller):
+    active, _, processed = controller
+    rows = [active.feature_builder.build_row(p)[0] for p in processed]
+    predict_one = active.compiled_model.predict_one
+    benchmark("predict_compiled_one_256", lambda: [predict_one(row) for row in rows], number=40)
+
+
+def test_sklearn_predict_one(benchmark, controller):
+    active, _, processed = controller
+    rows = [active.feature_builder.build_row(p) for p in processed[:32]]
+    benchmark("predict_sklearn_one_32", lambda: [predict_controller._sklearn_predict_one(active.model, r) for r in rows])
+
+
+def test_make_prediction(benchmark, controller):
+    _, records, _ = controller
+    benchmark("make_prediction_256", lambda: [predict_controller.make_prediction(dict(r)) for r in records], number=3)
+
+
+def test_make_batch_prediction(benchmark, controller):
+    _, records, _ = controller
+    batch = [dict(r) for r in records] * 4
+    benchmark("make_batch_prediction_1024", lambda: predict_controller.make_batch_prediction(batch), number=3)
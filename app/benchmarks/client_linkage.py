@@ -0,0 +1,107 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/client_linkage.py
+# =============================================
+"""
+Costo de vincular una predicción con su cliente: consulta SQL sin índice,
+consulta SQL con idx_clients_linkage e índice en memoria (ClientIndex).
+
+Necesita una base de datos de pruebas VACÍA: crea la tabla clients, la llena
+con CLIENTES filas sintéticas (muestreadas de bank.csv) y la borra al terminar.
+
+Uso:
+    python -m app.benchmarks.client_linkage DSN [CLIENTES] [BUSQUEDAS]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import psycopg2
+from psycopg2.extras import execute_values
+
+from app.database.connection import ConnectionPool, close_pool, set_pool
+from app.models import db_model
+from app.services.client_index import ClientIndex
+
+DATA_PATH = "app/data/raw/bank.csv"
+
+
+def _time_lookups(lookup, records) -> float:
+    started = time.perf_counter()
+    for record in records:
+        lookup(record)
+    return (time.perf_counter() - started) / len(records) * 1e6  # µs por búsqueda
+
+
+def run(dsn: str, n_clients: int = 200000, n_lookups: int = 2000) -> dict:
+    sample = pd.read_csv(DATA_PATH).sample(n_clients, replace=True, random_state=0)
+    start = datetime(2024, 1, 1)
+    rows = [
+        (int(r.age), r.job, r.marital, r.education, start + timedelta(seconds=i))
+        for i, r in enumerate(sample.itertuples())
+    ]
+    records = [
+        {"age": age, "job": job, "marital": marital, "education": education}
+        for age, job, marital, education, _ in rows[:n_lookups]
+    ]
+
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE clients (
+            id SERIAL PRIMARY KEY, age INT NOT NULL, job VARCHAR(50), marital VARCHAR(20),
+            education VARCHAR(50), created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    execute_values(
+        cur, "INSERT INTO clients (age, job, marital, education, created_at) VALUES %s", rows, page_size=5000
+    )
+    cur.execute("ANALYZE clients")
+    conn.commit()
+    set_pool(ConnectionPool(dsn, 1, 2))
+
+    try:
+        seq_scan = _time_lookups(db_model.find_client_by_features, records)
+
+        cur.execute("""
+            CREATE INDEX idx_clients_linkage
+                ON clients (age, job, marital, education, created_at DESC NULLS LAST, id DESC)
+        """)
+        cur.execute("ANALYZE clients")
+        conn.commit()
+        indexed = _time_lookups(db_model.find_client_by_features, records)
+
+        index = ClientIndex()
+        started = time.perf_counter()
+        index.reload()
+        load_ms = (time.perf_counter() - started) * 1e3
+        in_memory = _time_lookups(index.lookup, records)
+        assert [index.lookup(r) for r in records[:200]] == [
+            db_model.find_client_by_features(r) for r in records[:200]
+        ]
+    finally:
+        close_pool()
+        cur.execute("DROP TABLE clients")
+        conn.commit()
+        conn.close()
+
+    return {
+        "clients": n_clients,
+        "keys": len(index),
+        "full_load_ms": round(load_ms, 1),
+        "us_per_lookup": {
+            "sql_seq_scan": round(seq_scan, 1),
+            "sql_indexed": round(indexed, 1),
+            "in_memory": round(in_memory, 2),
+        },
+        "speedup_vs_seq_scan": round(seq_scan / in_memory, 1),
+    }
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    dsn = args[0]
+    n_clients = int(args[1]) if len(args) > 1 else 200000
+    n_lookups = int(args[2]) if len(args) > 2 else 2000
+    print(run(dsn, n_clients, n_lookups))
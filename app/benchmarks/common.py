@@ -0,0 +1,73 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/common.py
+# =============================================
+"""
+Utilidades compartidas por los benchmarks: modelo entrenado en memoria,
+base de datos sustituida por dobles y registros válidos de bank.csv.
+"""
+
+import time
+
+import pandas as pd
+from pydantic import ValidationError
+from sklearn.tree import DecisionTreeClassifier
+
+from app.controllers import predict_controller
+from app.models.schemas import PredictionRequest
+from app.services.compiled_tree import CompiledTree
+from app.services.data_preprocessing import preprocess_data
+from app.services.feature_vector import FeatureVectorBuilder
+from app.services.model_registry import LoadedModel, ModelRegistry
+from app.services.prediction_cache import PredictionCache
+
+DATA_PATH = "app/data/raw/bank.csv"
+
+
+def load_controller(db_latency: float = 0.0, cache_size: int = 0, sink=None):
+    """
+    Entrena el modelo en memoria y lo carga en predict_controller.
+    Las funciones de base de datos se sustituyen por esperas bloqueantes de
+    'db_latency' segundos (como psycopg2), o por no-ops si es 0.
+    'sink' es el PredictionSink a usar; por defecto None (INSERT síncrono).
+    """
+    df, label_encoders, _, feature_names = preprocess_data(DATA_PATH)
+    model = DecisionTreeClassifier(max_depth=5, random_state=42)
+    model.fit(df.drop("deposit", axis=1), df["deposit"])
+
+    def db_call(result=None):
+        def call(*args, **kwargs):
+            if db_latency:
+                time.sleep(db_latency)
+            return result(*args) if callable(result) else result
+        return call
+
+    registry = ModelRegistry(None)
+    registry.install(LoadedModel(
+        "benchmark",
+        FeatureVectorBuilder.from_encoders(label_encoders, feature_names),
+        CompiledTree.from_sklearn(model),
+        model,
+    ))
+    predict_controller.model_registry = registry
+    predict_controller.prediction_cache = PredictionCache(cache_size)
+    predict_controller.find_client_by_features = db_call()
+    predict_controller.find_clients_by_features = db_call(lambda records: [None] * len(records))
+    predict_controller.save_prediction = db_call()
+    predict_controller.save_predictions = db_call()
+    predict_controller.prediction_sink = sink
+    predict_controller.client_index = None
+
+
+def _is_valid(record: dict) -> bool:
+    try:
+        PredictionRequest.model_validate(record)
+        return True
+    except ValidationError:
+        return False
+
+
+def valid_records(n: int, seed: int = 0) -> list:
+    """N registros de bank.csv que pasan la validación de PredictionRequest (p. ej. campaign <= 50)."""
+    raw = pd.read_csv(DATA_PATH).drop(columns=["deposit"])
+    valid = pd.DataFrame([r for r in raw.to_dict("records") if _is_valid(r)])
+    return valid.sample(n, replace=n > len(valid), random_state=seed).to_dict("records")
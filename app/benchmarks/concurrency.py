@@ -0,0 +1,97 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/concurrency.py
+# =============================================
+"""
+Latencia de /api/predict con 100 clientes concurrentes, ejecutando la
+predicción dentro del event loop ("before", como hacían los handlers
+originales) o con inferencia y base de datos en los pools de
+app/services/executors.py ("after").
+
+La API corre en proceso (httpx + ASGITransport). Cada cliente envía sus
+solicitudes según un calendario fijo (carga de lazo abierto) y la latencia se
+mide desde el instante programado, de modo que incluye el tiempo que la
+solicitud esperó mientras el event loop estaba bloqueado por otra. Cada
+llamada a base de datos se sustituye por una espera bloqueante de
+DB_LATENCY segundos, igual que haría psycopg2.
+
+Uso:
+    python -m app.benchmarks.concurrency [CLIENTES] [RPS_TOTAL] [DURACION_S] [DB_LATENCY]
+"""
+
+import asyncio
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from app.benchmarks.common import load_controller, valid_records
+from app.controllers import predict_controller
+from app.main import app
+from app.routes import predict_routes
+from app.services import executors
+
+
+async def _blocking_prediction(data):
+    # Comportamiento original: código síncrono directamente en el handler async
+    return predict_controller.make_prediction(data)
+
+
+async def _client(http, records, interval, t0, latencies, errors):
+    for i, record in enumerate(records):
+        scheduled = t0 + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        response = await http.post("/api/predict", json=record)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+        latencies.append(time.perf_counter() - scheduled)
+
+
+async def _load(clients, rps, duration, records):
+    per_client = int(rps * duration / clients)
+    interval = clients / rps
+    latencies, errors = [], []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(
+            # Clientes desfasados para repartir las llegadas en el intervalo
+            _client(http, records[c * per_client:(c + 1) * per_client], interval,
+                    t0 + c * interval / clients, latencies, errors)
+            for c in range(clients)
+        ))
+        elapsed = time.perf_counter() - t0
+    ms = np.asarray(latencies) * 1e3
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+    }
+
+
+def run(clients: int = 100, rps: float = 100, duration: float = 10, db_latency: float = 0.005) -> dict:
+    load_controller(db_latency=db_latency)
+    records = valid_records(int(rps * duration))
+    original = predict_routes.make_prediction_async
+
+    predict_routes.make_prediction_async = _blocking_prediction
+    before = asyncio.run(_load(clients, rps, duration, records))
+
+    predict_routes.make_prediction_async = original
+    after = asyncio.run(_load(clients, rps, duration, records))
+    executors.shutdown_executors()
+
+    return {"clients": clients, "target_rps": rps, "db_latency_ms": db_latency * 1e3, "before": before, "after": after}
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    clients = int(args[0]) if len(args) > 0 else 100
+    rps = float(args[1]) if len(args) > 1 else 100
+    duration = float(args[2]) if len(args) > 2 else 10
+    db_latency = float(args[3]) if len(args) > 3 else 0.005
+    print(run(clients, rps, duration, db_latency))
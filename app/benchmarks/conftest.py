@@ -0,0 +1,75 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/conftest.py
+# =============================================
+"""
+Fixtures de los micro-benchmarks (bench_micro.py). Solo se ejecutan si se
+pasa el fichero explícitamente:
+
+    pytest app/benchmarks/bench_micro.py                            # compara con baselines.json
+    BENCH_UPDATE_BASELINE=1 pytest app/benchmarks/bench_micro.py    # reescribe las baselines
+    BENCH_TOLERANCE=0.5 pytest app/benchmarks/bench_micro.py        # tolerancia más amplia
+
+BENCH_REPORT=ruta.json escribe además los resultados de la corrida.
+"""
+
+import json
+import os
+
+import pytest
+
+from app.benchmarks import regression
+
+
+class BenchmarkSession:
+    def __init__(self):
+        self.update = os.getenv("BENCH_UPDATE_BASELINE") == "1"
+        self.baselines = regression.load_baselines()
+        self.results = {}
+
+    def record(self, name: str, result: dict) -> dict:
+        outcome = regression.check(name, result["normalized"], self.baselines)
+        self.results[name] = {**result, "normalized": round(result["normalized"], 6), **outcome}
+        return self.results[name]
+
+    def finish(self):
+        if self.update and self.results:
+            benchmarks = dict(self.baselines.get("benchmarks", {}))
+            for name, result in self.results.items():
+                entry = {key: result[key] for key in ("min_s", "median_s", "reference_s", "normalized")}
+                if "tolerance" in benchmarks.get(name, {}):
+                    entry["tolerance"] = benchmarks[name]["tolerance"]
+                benchmarks[name] = entry
+            regression.save_baselines({
+                "tolerance": self.baselines.get("tolerance", regression.DEFAULT_TOLERANCE),
+                "benchmarks": benchmarks,
+            })
+        if os.getenv("BENCH_REPORT"):
+            with open(os.getenv("BENCH_REPORT"), "w", encoding="utf-8") as f:
+                json.dump({"results": self.results}, f, indent=2)
+
+
+@pytest.fixture(scope="session")
+def bench_session():
+    session = BenchmarkSession()
+    yield session
+    session.finish()
+
+
+@pytest.fixture
+def benchmark(bench_session):
+    """
+    benchmark(nombre, func, number=1, repeat=9): mide func() y falla si el
+    tiempo normalizado supera la baseline más la tolerancia. 'number' sube
+    solo hasta que cada muestra dure regression.MIN_SAMPLE_S.
+    """
+    def run(name: str, func, number: int = 1, repeat: int = 9):
+        result = bench_session.record(name, regression.measure(func, number=number, repeat=repeat,
+                                                               min_sample_s=regression.MIN_SAMPLE_S))
+        if result["status"] == "regressed" and not bench_session.update:
+            pytest.fail(
+                f"{name}: {result['min_s'] * 1e3:.3f} ms por llamada, {result['ratio']:.2f}x la baseline "
+                f"(tolerancia {result['tolerance']:.0%})"
+            )
+        return result
+
+    return run
@@ -0,0 +1,334 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/load_test.py
+# =============================================
+"""
+Prueba de carga repetible de la API con reporte JSON.
+
+Fuente de las solicitudes:
+- --input FICHERO.jsonl: un cuerpo de solicitud JSON por línea (las líneas
+  vacías o ilegibles se descartan y se cuentan)
+- si no, --records registros válidos muestreados de bank.csv con --seed
+
+Modo de carga:
+- --rate RPS: lazo abierto; las solicitudes salen según un calendario fijo y
+  la latencia se mide desde el instante programado (incluye la espera si el
+  servidor se atrasa)
+- --concurrency N: lazo cerrado; N clientes envían una solicitud tras otra
+
+Destino:
+- por defecto, app.main:app en proceso (httpx + ASGITransport) con el modelo
+  entrenado en memoria y la base de datos sustituida por esperas de
+  --db-latency segundos (app/benchmarks/common.py)
+- --uvicorn: lanza uvicorn en un puerto libre con esa misma app de pruebas
+  (stub_app) y la carga pasa por HTTP real
+- --url URL: un servidor ya levantado (con su propia base de datos)
+
+El reporte (--output, o stdout) incluye throughput, latencias p50/p95/p99 y
+tasa de errores. --compare REPORTE.json agrega la variación frente a otra
+corrida.
+
+Uso:
+    python -m app.benchmarks.load_test --concurrency 32 --requests 5000 --output report.json
+    python -m app.benchmarks.load_test --rate 200 --duration 30 --input solicitudes.jsonl
+    python -m app.benchmarks.load_test --uvicorn --concurrency 16 --compare report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+import httpx
+import numpy as np
+
+# Variables de entorno con las que --uvicorn configura stub_app en el subproceso
+_ENV_DB_LATENCY = "LOAD_TEST_DB_LATENCY"
+_ENV_CACHE_SIZE = "LOAD_TEST_CACHE_SIZE"
+
+
+def read_jsonl(path: str) -> tuple:
+    """Retorna (cuerpos, líneas descartadas) de un fichero JSON lines."""
+    bodies, skipped = [], 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                body = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            if isinstance(body, dict):
+                bodies.append(body)
+            else:
+                skipped += 1
+    return bodies, skipped
+
+
+def batch_bodies(records: list, batch_size: int) -> list:
+    """Agrupa registros en cuerpos {"records": [...]} para /api/predict/batch."""
+    return [{"records": records[i:i + batch_size]} for i in range(0, len(records), batch_size)]
+
+
+def _percentiles(latencies: list) -> dict:
+    if not latencies:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    ms = np.asarray(latencies) * 1e3
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "mean": round(float(ms.mean()), 3),
+        "max": round(float(ms.max()), 3),
+    }
+
+
+class _Results:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.transport_errors = Counter()
+
+    async def send(self, http, endpoint: str, body: dict, scheduled: float):
+        try:
+            response = await http.post(endpoint, json=body)
+            self.statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            self.transport_errors[type(e).__name__] += 1
+        self.latencies.append(time.perf_counter() - scheduled)
+
+    def report(self, elapsed: float) -> dict:
+        total = len(self.latencies)
+        errors = sum(n for status, n in self.statuses.items() if status >= 400) + sum(self.transport_errors.values())
+        return {
+            "requests": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 6) if total else 0.0,
+            "status_codes": {str(status): n for status, n in sorted(self.statuses.items())},
+            "transport_errors": dict(self.transport_errors),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+            "latency_ms": _percentiles(self.latencies),
+        }
+
+
+async def _closed_loop(http, endpoint, bodies, concurrency, n_requests, duration, results):
+    next_index = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal next_index
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if n_requests is not None and next_index >= n_requests:
+                return
+            body = bodies[next_index % len(bodies)]
+            next_index += 1
+            await results.send(http, endpoint, body, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _open_loop(http, endpoint, bodies, rate, n_requests, duration, results):
+    total = n_requests if n_requests is not None else int(rate * duration)
+    interval = 1.0 / rate
+    t0 = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        scheduled = t0 + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(results.send(http, endpoint, bodies[i % len(bodies)], scheduled)))
+    await asyncio.gather(*tasks)
+
+
+async def run_load(bodies: list, endpoint: str = "/api/predict", app=None, url: str = None,
+                   concurrency: int = None, rate: float = None, n_requests: int = None,
+                   duration: float = None, timeout: float = 30.0) -> dict:
+    """
+    Envía 'bodies' (en ciclo) a 'endpoint' de la app ASGI 'app' o del servidor
+    'url', con 'concurrency' clientes o a 'rate' solicitudes por segundo, hasta
+    'n_requests' solicitudes o 'duration' segundos. Retorna el reporte.
+    """
+    if not bodies:
+        raise ValueError("No hay solicitudes que enviar")
+    if (concurrency is None) == (rate is None):
+        raise ValueError("Indica concurrency o rate (uno de los dos)")
+    if n_requests is None and duration is None:
+        n_requests = len(bodies)
+
+    if app is not None:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=timeout)
+    else:
+        limits = httpx.Limits(max_connections=max(concurrency or 0, 100))
+        client = httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits)
+
+    results = _Results()
+    async with client as http:
+        t0 = time.perf_counter()
+        if concurrency is not None:
+            await _closed_loop(http, endpoint, bodies, concurrency, n_requests, duration, results)
+        else:
+            await _open_loop(http, endpoint, bodies, rate, n_requests, duration, results)
+        elapsed = time.perf_counter() - t0
+    return results.report(elapsed)
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Variación relativa de throughput y latencias frente a un reporte anterior."""
+    def change(new, old):
+        if new is None or not old:
+            return None
+        return round((new - old) / old, 4)
+
+    return {
+        "throughput_rps": change(current["throughput_rps"], baseline["throughput_rps"]),
+        "error_rate": round(current["error_rate"] - baseline["error_rate"], 6),
+        **{
+            f"latency_{key}": change(current["latency_ms"][key], baseline["latency_ms"][key])
+            for key in ("p50", "p95", "p99")
+        },
+    }
+
+
+def stub_app():
+    """
+    app.main:app con el modelo entrenado en memoria y la base de datos
+    sustituida por esperas (para uvicorn --factory en el modo --uvicorn).
+    """
+    from app.benchmarks.common import load_controller
+    from app.main import app
+
+    load_controller(
+        db_latency=float(os.getenv(_ENV_DB_LATENCY, "0")),
+        cache_size=int(os.getenv(_ENV_CACHE_SIZE, "0")),
+    )
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_uvicorn(db_latency: float, cache_size: int) -> tuple:
+    port = _free_port()
+    env = {**os.environ, _ENV_DB_LATENCY: str(db_latency), _ENV_CACHE_SIZE: str(cache_size), "LOG_LEVEL": "WARNING"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "app.benchmarks.load_test:stub_app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn terminó antes de aceptar conexiones")
+        try:
+            httpx.get(url + "/", timeout=1)
+            return process, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn no respondió en 60 s")
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de predicciones")
+    source = parser.add_argument_group("solicitudes")
+    source.add_argument("--input", help="Fichero JSON lines con un cuerpo de solicitud por línea")
+    source.add_argument("--records", type=int, default=1000, help="Registros muestreados de bank.csv (sin --input)")
+    source.add_argument("--seed", type=int, default=0)
+    source.add_argument("--endpoint", default="/api/predict")
+    source.add_argument("--batch-size", type=int, default=100, help="Registros por cuerpo si el endpoint es .../batch")
+
+    load = parser.add_argument_group("carga")
+    mode = load.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--concurrency", type=int, help="Clientes en lazo cerrado")
+    mode.add_argument("--rate", type=float, help="Solicitudes por segundo en lazo abierto")
+    load.add_argument("--requests", type=int, help="Total de solicitudes (por defecto, una por cuerpo)")
+    load.add_argument("--duration", type=float, help="Duración en segundos (en lugar de --requests)")
+    load.add_argument("--timeout", type=float, default=30.0)
+
+    target = parser.add_argument_group("destino")
+    where = target.add_mutually_exclusive_group()
+    where.add_argument("--url", help="Servidor ya levantado (p. ej. http://127.0.0.1:8000)")
+    where.add_argument("--uvicorn", action="store_true", help="Lanzar uvicorn local con la app de pruebas")
+    target.add_argument("--db-latency", type=float, default=0.002, help="Espera por llamada a la BD sustituida (s)")
+    target.add_argument("--cache-size", type=int, default=0, help="Tamaño de la caché de predicciones")
+
+    parser.add_argument("--output", help="Fichero donde escribir el reporte JSON")
+    parser.add_argument("--compare", help="Reporte JSON anterior con el que comparar")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = _parse_args(argv)
+    skipped = 0
+    if args.input:
+        bodies, skipped = read_jsonl(args.input)
+    else:
+        from app.benchmarks.common import valid_records
+        bodies = valid_records(args.records, seed=args.seed)
+    if args.endpoint.rstrip("/").endswith("/batch") and bodies and "records" not in bodies[0]:
+        bodies = batch_bodies(bodies, args.batch_size)
+
+    app, url, process = None, args.url, None
+    if args.uvicorn:
+        process, url = _start_uvicorn(args.db_latency, args.cache_size)
+    elif url is None:
+        os.environ[_ENV_DB_LATENCY] = str(args.db_latency)
+        os.environ[_ENV_CACHE_SIZE] = str(args.cache_size)
+        app = stub_app()
+
+    try:
+        result = asyncio.run(run_load(
+            bodies, args.endpoint, app=app, url=url, concurrency=args.concurrency, rate=args.rate,
+            n_requests=args.requests, duration=args.duration, timeout=args.timeout,
+        ))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "target": "uvicorn" if args.uvicorn else (url or "in-process"),
+            "endpoint": args.endpoint,
+            "mode": "concurrency" if args.concurrency else "rate",
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "bodies": len(bodies),
+            "skipped_lines": skipped,
+            "source": args.input or f"bank.csv (seed={args.seed})",
+            "db_latency_s": None if args.url else args.db_latency,
+            "cache_size": None if args.url else args.cache_size,
+        },
+        **result,
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["vs_baseline"] = compare(result, json.load(f))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/regression.py
+# =============================================
+"""
+Medición y comparación con baselines para los micro-benchmarks
+(app/benchmarks/bench_micro.py).
+
+Los tiempos absolutos cambian de una máquina a otra y, en máquinas
+compartidas, de un segundo al siguiente. Por eso cada muestra de un benchmark
+va precedida de una carga de calibración fija (Python puro + numpy) y lo que
+se compara es un percentil bajo (RATIO_PERCENTILE) de los cocientes
+benchmark / calibración de cada muestra: "veces la calibración", medida en las
+mismas condiciones. El ruido de una máquina compartida solo suma tiempo, así
+que las muestras más rápidas son las más estables; la mediana heredaba las
+interrupciones de la mitad de las muestras.
+
+Cada muestra repite func() las veces necesarias para durar al menos
+MIN_SAMPLE_S: con muestras de décimas de milisegundo una sola interrupción
+del sistema cambiaba el resultado.
+
+Las baselines viven en app/benchmarks/baselines.json:
+
+    {"tolerance": 0.35,
+     "benchmarks": {"nombre": {"min_s": ..., "median_s": ..., "reference_s": ...,
+                               "normalized": ..., "tolerance": opcional}}}
+
+Una métrica regresa si su valor normalizado supera la baseline en más de la
+tolerancia: la propia del benchmark si la tiene; si no, BENCH_TOLERANCE; si
+no, la "tolerance" general del fichero.
+"""
+
+import json
+import math
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+
+import numpy as np
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_TOLERANCE = 0.35
+# Duración mínima de cada muestra (s) y percentil de los cocientes que se compara
+MIN_SAMPLE_S = 0.05
+RATIO_PERCENTILE = 0.2
+
+
+def calibration_workload():
+    """
+    Carga de referencia (~5 ms): bucle de Python, diccionarios y cadenas (como
+    la normalización y la codificación de registros) y ordenamiento con numpy.
+    """
+    total = 0
+    for i in range(20000):
+        total += i * i % 7
+    rows = [{"age": i % 90, "job": f"job{i % 12}", "balance": i * 1.5} for i in range(4000)]
+    total += sum(len(row["job"].upper()) + row["age"] for row in rows if row["balance"] >= 0)
+    values = np.random.default_rng(0).random(50000)
+    np.sort(values)
+    return total
+
+
+def _timed(func, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - started) / number
+
+
+def low_percentile(values: list, q: float = RATIO_PERCENTILE) -> float:
+    """Valor en el percentil q (0..1) de 'values', sin interpolar: con 9 muestras y 0.2, el segundo menor."""
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def measure(func, number: int = 1, repeat: int = 7, warmup: int = 1, reference=calibration_workload,
+            min_sample_s: float = 0.0) -> dict:
+    """
+    Ejecuta func() 'number' veces por muestra, 'repeat' muestras, cada una
+    precedida por 'reference'. Con 'min_sample_s', 'number' (y las
+    repeticiones de la referencia) suben hasta que cada muestra dure al menos
+    eso, según lo medido en el calentamiento. Retorna el mínimo y la mediana del tiempo por llamada (s),
+    el mínimo de la referencia y 'normalized', el percentil bajo de los
+    cocientes por muestra.
+    """
+    ref_number = 1
+    for _ in range(warmup):
+        elapsed, ref_elapsed = _timed(func, 1), _timed(reference, 1)
+        if min_sample_s:
+            number = max(number, math.ceil(min_sample_s / max(elapsed, 1e-9)))
+            ref_number = math.ceil(min_sample_s / max(ref_elapsed, 1e-9))
+    samples, references = [], []
+    for _ in range(repeat):
+        references.append(_timed(reference, ref_number))
+        samples.append(_timed(func, number))
+    ratios = [sample / ref for sample, ref in zip(samples, references)]
+    return {
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "reference_s": min(references),
+        "normalized": low_percentile(ratios),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def load_baselines(path: str = BASELINES_PATH) -> dict:
+    if not os.path.exists(path):
+        return {"benchmarks": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(baselines: dict, path: str = BASELINES_PATH):
+    baselines = {
+        "tolerance": baselines.get("tolerance", DEFAULT_TOLERANCE),
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "benchmarks": {
+            name: {
+                **entry,
+                **{key: round(entry[key], 9) for key in ("min_s", "median_s", "reference_s") if key in entry},
+            }
+            for name, entry in sorted(baselines["benchmarks"].items())
+        },
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=False)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def tolerance_for(name: str, baselines: dict) -> float:
+    entry = baselines["benchmarks"].get(name, {})
+    if "tolerance" in entry:
+        return entry["tolerance"]
+    if os.getenv("BENCH_TOLERANCE"):
+        return float(os.getenv("BENCH_TOLERANCE"))
+    return baselines.get("tolerance", DEFAULT_TOLERANCE)
+
+
+def check(name: str, normalized: float, baselines: dict) -> dict:
+    """
+    Compara un resultado normalizado con su baseline.
+    Retorna {"status": "ok" | "regressed" | "new", "ratio": ..., "tolerance": ...}.
+    """
+    entry = baselines["benchmarks"].get(name)
+    tolerance = tolerance_for(name, baselines)
+    if entry is None:
+        return {"status": "new", "ratio": None, "tolerance": tolerance}
+    ratio = normalized / entry["normalized"]
+    status = "regressed" if ratio > 1 + tolerance else "ok"
+    return {"status": status, "ratio": round(ratio, 4), "tolerance": tolerance}
@@ -0,0 +1,67 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/tree_latency.py
+# =============================================
+"""
+Latencia de inferencia de una fila: sklearn (predict + predict_proba, como
+hacía make_prediction) contra CompiledTree.predict_one, y por lotes
+predict_proba contra CompiledTree.predict_many.
+
+Uso:
+    python -m app.benchmarks.tree_latency [REPETICIONES]
+"""
+
+import sys
+import time
+import warnings
+
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+
+from app.services.compiled_tree import CompiledTree
+from app.services.data_preprocessing import preprocess_data
+
+DATA_PATH = "app/data/raw/bank.csv"
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+
+
+def _percentiles_us(samples):
+    samples = np.asarray(samples) * 1e6
+    return {"p50_us": round(float(np.percentile(samples, 50)), 2), "p99_us": round(float(np.percentile(samples, 99)), 2)}
+
+
+def run(repeats: int = 2000) -> dict:
+    df = preprocess_data(DATA_PATH)[0]
+    X = df.drop("deposit", axis=1).to_numpy(dtype=np.float64)
+    model = DecisionTreeClassifier(max_depth=5, random_state=42).fit(X, df["deposit"])
+    compiled = CompiledTree.from_sklearn(model)
+    rows = X[np.random.default_rng(0).integers(0, len(X), size=repeats)]
+
+    sklearn_samples, compiled_samples = [], []
+    for row in rows:
+        r = row.reshape(1, -1)
+        start = time.perf_counter()
+        int(model.predict(r)[0]), float(model.predict_proba(r)[0][1])
+        sklearn_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        compiled.predict_one(row)
+        compiled_samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    model.predict_proba(X)
+    sklearn_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    compiled.predict_many(X)
+    compiled_batch = time.perf_counter() - start
+
+    return {
+        "single_row": {"sklearn": _percentiles_us(sklearn_samples), "compiled": _percentiles_us(compiled_samples)},
+        "batch_rows": len(X),
+        "batch_ms": {"sklearn": round(sklearn_batch * 1e3, 2), "compiled": round(compiled_batch * 1e3, 2)},
+    }
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(run(repeats))
@@ -0,0 +1,182 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/worker_scaling.py
+# =============================================
+"""
+Escalado del modo gunicorn (app/gunicorn_conf.py) con el número de workers.
+
+Para cada valor de --workers lanza gunicorn con la app de pruebas de
+load_test (modelo entrenado en memoria, BD sustituida por esperas de
+--db-latency s), le aplica carga en lazo cerrado durante --duration segundos
+y mide:
+- throughput y latencias, con el escalado frente a 1 worker y la eficiencia
+  (escalado / workers)
+- memoria del maestro y los workers según /proc/<pid>/smaps_rollup: RSS, PSS
+  (las páginas compartidas se reparten entre los procesos que las usan) y
+  memoria privada por worker
+
+--compare-preload repite cada corrida con GUNICORN_PRELOAD=0 (cada worker
+carga su propio modelo) para ver cuánta memoria ahorra el preload.
+
+Uso:
+    python -m app.benchmarks.worker_scaling --workers 1 2 4 8 --concurrency 64 --duration 15
+    python -m app.benchmarks.worker_scaling --workers 4 --compare-preload --output scaling.json
+
+El generador de carga corre en la misma máquina: en máquinas con pocos
+núcleos compite con los workers y limita el escalado medido.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+from app.benchmarks.load_test import _ENV_CACHE_SIZE, _ENV_DB_LATENCY, _free_port, run_load
+
+
+def _smaps_rollup(pid: int) -> dict:
+    """Rss, Pss y memoria privada del proceso en MB (Linux)."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                values[key] = int(rest.split()[0]) / 1024
+    return {
+        "rss_mb": round(values.get("Rss", 0.0), 1),
+        "pss_mb": round(values.get("Pss", 0.0), 1),
+        "private_mb": round(values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0), 1),
+    }
+
+
+def _children(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children", encoding="utf-8") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def memory_report(master_pid: int) -> dict:
+    master = _smaps_rollup(master_pid)
+    workers = [_smaps_rollup(pid) for pid in _children(master_pid)]
+    return {
+        "master": master,
+        "workers": len(workers),
+        "worker_private_mb": round(sum(w["private_mb"] for w in workers) / max(len(workers), 1), 1),
+        "total_rss_mb": round(master["rss_mb"] + sum(w["rss_mb"] for w in workers), 1),
+        "total_pss_mb": round(master["pss_mb"] + sum(w["pss_mb"] for w in workers), 1),
+    }
+
+
+# Token de las rutas /api/admin en el gunicorn de pruebas (GET /api/admin/model)
+ADMIN_TOKEN = "worker-scaling"
+
+
+def start_gunicorn(workers: int, preload: bool, db_latency: float, cache_size: int) -> tuple:
+    """Lanza gunicorn con la app de pruebas y espera a que respondan todos los workers."""
+    port = _free_port()
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_PRELOAD": "1" if preload else "0",
+        "MODEL_WATCH_INTERVAL": "0",
+        "ADMIN_TOKEN": ADMIN_TOKEN,
+        "LOG_LEVEL": "WARNING",
+        _ENV_DB_LATENCY: str(db_latency),
+        _ENV_CACHE_SIZE: str(cache_size),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "app/gunicorn_conf.py", "--log-level", "warning",
+         "app.benchmarks.load_test:stub_app()"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn terminó antes de aceptar conexiones")
+        try:
+            httpx.get(url + "/", timeout=1)
+            # Sin preload cada worker entrena su modelo: esperar a que todos estén listos
+            if len(_children(process.pid)) == workers:
+                time.sleep(1 + (0 if preload else workers * 2))
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("gunicorn no respondió en 120 s")
+
+
+def measure(workers: int, bodies: list, concurrency: int, duration: float, preload: bool = True,
+            db_latency: float = 0.002, cache_size: int = 0) -> dict:
+    process, url = start_gunicorn(workers, preload, db_latency, cache_size)
+    try:
+        # Ronda corta de calentamiento de las conexiones
+        asyncio.run(run_load(bodies, url=url, concurrency=concurrency, n_requests=concurrency * 4))
+        result = asyncio.run(run_load(bodies, url=url, concurrency=concurrency, duration=duration))
+        memory = memory_report(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {
+        "workers": workers,
+        "preload": preload,
+        "throughput_rps": result["throughput_rps"],
+        "latency_ms": result["latency_ms"],
+        "error_rate": result["error_rate"],
+        "memory": memory,
+    }
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Escalado del modo gunicorn con el número de workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--db-latency", type=float, default=0.002)
+    parser.add_argument("--cache-size", type=int, default=0)
+    parser.add_argument("--compare-preload", action="store_true", help="Repetir cada corrida sin preload")
+    parser.add_argument("--output", help="Fichero donde escribir el reporte JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    from app.benchmarks.common import valid_records
+
+    args = _parse_args(argv)
+    bodies = valid_records(args.records)
+    runs = []
+    for workers in args.workers:
+        for preload in ((True, False) if args.compare_preload else (True,)):
+            print(f"⏱️ {workers} worker(s), preload={preload}...", file=sys.stderr)
+            runs.append(measure(workers, bodies, args.concurrency, args.duration, preload,
+                                args.db_latency, args.cache_size))
+
+    base = next((r["throughput_rps"] for r in runs if r["workers"] == min(args.workers) and r["preload"]), None)
+    for run in runs:
+        if base:
+            run["scaling"] = round(run["throughput_rps"] / base, 3)
+            run["efficiency"] = round(run["scaling"] * min(args.workers) / run["workers"], 3)
+
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "cpus": os.cpu_count(),
+        "config": {"concurrency": args.concurrency, "duration_s": args.duration, "db_latency_s": args.db_latency},
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# =============================================
+# 📁 Archivo: /app/benchmarks/write_behind.py
+# =============================================
+"""
+Latencia de /api/predict guardando la predicción con un INSERT síncrono
+("before") o encolándola en el PredictionSink ("after"), y comportamiento con
+la base de datos caída.
+
+Cada llamada a base de datos se sustituye por una espera bloqueante de
+DB_LATENCY segundos; el writer del sink espera lo mismo por lote. La caché de
+predicciones se desactiva para que todas las solicitudes consulten la BD.
+
+Uso:
+    python -m app.benchmarks.write_behind [SOLICITUDES] [DB_LATENCY]
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from app.benchmarks.common import load_controller, valid_records
+from app.controllers import predict_controller
+from app.main import app
+from app.services import executors
+from app.services.prediction_sink import PredictionSink
+
+
+async def _sequential(records) -> dict:
+    latencies, errors = [], 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        for record in records:
+            started = time.perf_counter()
+            response = await http.post("/api/predict", json=record)
+            latencies.append(time.perf_counter() - started)
+            errors += response.status_code != 200
+    ms = np.asarray(latencies) * 1e3
+    return {
+        "requests": len(records),
+        "errors": errors,
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+    }
+
+
+def run(n: int = 300, db_latency: float = 0.01) -> dict:
+    records = valid_records(n)
+    spool_dir = tempfile.mkdtemp()
+
+    load_controller(db_latency=db_latency)
+    before = asyncio.run(_sequential(records))
+
+    def slow_writer(rows):
+        time.sleep(db_latency)
+
+    sink = PredictionSink(slow_writer, f"{spool_dir}/predictions.jsonl", flush_interval=0.05)
+    load_controller(db_latency=db_latency, sink=sink)
+    after = asyncio.run(_sequential(records))
+    sink.close()
+    after["sink"] = {k: sink.stats()[k] for k in ("written", "flushes", "spooled")}
+
+    # Base de datos caída: vinculación y escritura fallan
+    def db_down(*args, **kwargs):
+        raise ConnectionError("base de datos caída")
+
+    load_controller(db_latency=db_latency)
+    predict_controller.find_client_by_features = db_down
+    predict_controller.save_prediction = db_down
+    before_down = asyncio.run(_sequential(records[:50]))
+
+    sink = PredictionSink(db_down, f"{spool_dir}/down.jsonl", flush_interval=0.05)
+    predict_controller.prediction_sink = sink
+    after_down = asyncio.run(_sequential(records[:50]))
+    sink.close()
+    after_down["sink"] = {k: sink.stats()[k] for k in ("written", "spooled")}
+    executors.shutdown_executors()
+
+    return {
+        "db_latency_ms": db_latency * 1e3,
+        "before": before,
+        "after": after,
+        "db_down": {"before": before_down, "after": after_down},
+    }
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    n = int(args[0]) if len(args) > 0 else 300
+    db_latency = float(args[1]) if len(args) > 1 else 0.01
+    print(run(n, db_latency))
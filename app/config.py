@@ -3,11 +3,127 @@ import os
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Si no tienes DATABASE_URL (por si usas otro hosting), usa esto como fallback:
-if not DATABASE_URL:
-    DATABASE_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME')}"
+# Si no tienes DATABASE_URL (por si usas otro hosting), usa esto como fallback.
+# Sin DATABASE_URL ni DB_PASSWORD queda en None y el pool no se crea
+# (app/database/connection.py lo reporta): nunca se prueba una contraseña por defecto.
+if not DATABASE_URL and os.getenv("DB_PASSWORD"):
+    DATABASE_URL = (
+        f"postgresql://{os.getenv('DB_USER', 'postgres')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'bank_marketing')}"
+    )
 
 # Esto es lo que antes estaba en config.py
 DB_CONFIG = {
     "database_url": DATABASE_URL
-}
\ No newline at end of file
+}
+
+# Pool de conexiones compartido por la API y el dashboard (app/database/connection.py)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))            # espera máxima por una conexión libre
+DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))  # cierre de ociosas por encima del mínimo
+DB_POOL_HEALTHCHECK = float(os.getenv("DB_POOL_HEALTHCHECK", "30"))     # SELECT 1 si lleva más de N s sin usarse
+
+# Máximo de registros aceptados por /api/predict/batch en una sola llamada
+PREDICT_BATCH_MAX_RECORDS = int(os.getenv("PREDICT_BATCH_MAX_RECORDS", "50000"))
+
+# /api/predict/stream (NDJSON): registros por micro-lote y tamaño máximo de una línea
+PREDICT_STREAM_BATCH_SIZE = int(os.getenv("PREDICT_STREAM_BATCH_SIZE", "500"))
+PREDICT_STREAM_MAX_LINE_BYTES = int(os.getenv("PREDICT_STREAM_MAX_LINE_BYTES", "65536"))
+
+# Usar el evaluador compilado del árbol (app/services/compiled_tree.py) en lugar
+# de model.predict/predict_proba de sklearn. Poner a "0" para volver a sklearn.
+USE_COMPILED_TREE = os.getenv("USE_COMPILED_TREE", "1") == "1"
+
+# Caché de resultados de predicción (app/services/prediction_cache.py).
+# PREDICTION_CACHE_SIZE=0 la desactiva.
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+
+# Pools de hilos de la API (app/services/executors.py): inferencia / base de datos,
+# y máximo de tareas en cola por pool antes de aplicar contrapresión
+API_CPU_WORKERS = int(os.getenv("API_CPU_WORKERS", str(os.cpu_count() or 1)))
+API_IO_WORKERS = int(os.getenv("API_IO_WORKERS", "16"))
+API_EXECUTOR_QUEUE = int(os.getenv("API_EXECUTOR_QUEUE", "256"))
+
+# Registro diferido de predicciones (app/services/prediction_sink.py): las filas
+# se encolan y un hilo las escribe por lotes; si la BD no responde van al spool local.
+# PREDICTION_SINK_ENABLED=0 vuelve al INSERT síncrono dentro de la solicitud.
+PREDICTION_SINK_ENABLED = os.getenv("PREDICTION_SINK_ENABLED", "1") == "1"
+PREDICTION_SINK_BATCH_SIZE = int(os.getenv("PREDICTION_SINK_BATCH_SIZE", "500"))
+PREDICTION_SINK_FLUSH_INTERVAL = float(os.getenv("PREDICTION_SINK_FLUSH_INTERVAL", "1.0"))  # segundos
+PREDICTION_SINK_MAX_QUEUE = int(os.getenv("PREDICTION_SINK_MAX_QUEUE", "100000"))
+PREDICTION_SINK_RETRY_INTERVAL = float(os.getenv("PREDICTION_SINK_RETRY_INTERVAL", "5.0"))  # tras un fallo de BD
+PREDICTION_SINK_SPOOL_PATH = os.getenv("PREDICTION_SINK_SPOOL_PATH", "app/data/spool/predictions.jsonl")
+
+# Índice en memoria para vincular predicciones con clientes (app/services/client_index.py).
+# CLIENT_INDEX_ENABLED=0 vuelve a consultar la tabla clients en cada predicción.
+CLIENT_INDEX_ENABLED = os.getenv("CLIENT_INDEX_ENABLED", "1") == "1"
+CLIENT_INDEX_REFRESH_INTERVAL = float(os.getenv("CLIENT_INDEX_REFRESH_INTERVAL", "30"))  # segundos
+CLIENT_INDEX_REFRESH_OVERLAP = float(os.getenv("CLIENT_INDEX_REFRESH_OVERLAP", "5"))     # segundos releídos
+
+# Bundle único de artefactos del modelo que escribe train_model.py (app/services/model_bundle.py)
+MODEL_BUNDLE_PATH = os.getenv("MODEL_BUNDLE_PATH", "app/models/model_bundle.bin")
+
+# Recarga en caliente del modelo (app/services/model_registry.py): cada N segundos se
+# comprueba si el bundle cambió en disco. MODEL_WATCH_INTERVAL=0 la desactiva y deja
+# solo POST /api/admin/model/reload.
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "5"))
+
+# Las rutas /api/admin exigen la cabecera X-Admin-Token con este valor; sin definir, responden 403
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Métricas en formato Prometheus en GET /metrics (app/services/metrics.py).
+# METRICS_ENABLED=0 deja de registrar latencias y contadores.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Logs JSON lines por cola (app/services/structured_logging.py). Los payloads de
+# depuración solo se registran con LOG_LEVEL=DEBUG y para una fracción
+# LOG_DEBUG_SAMPLE_RATE (0-1) de las solicitudes.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # registros en cola antes de descartar
+
+# Modo de producción con gunicorn (app/gunicorn_conf.py): N workers de uvicorn
+# creados por fork desde un maestro que ya cargó el modelo. Cada worker se
+# recicla tras GUNICORN_MAX_REQUESTS solicitudes (+ hasta _JITTER al azar, para
+# que no se reinicien todos a la vez); 0 lo desactiva.
+GUNICORN_BIND = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+GUNICORN_WORKERS = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+GUNICORN_PRELOAD = os.getenv("GUNICORN_PRELOAD", "1") == "1"   # 0: cada worker carga su propio modelo
+GUNICORN_MAX_REQUESTS = int(os.getenv("GUNICORN_MAX_REQUESTS", "20000"))
+GUNICORN_MAX_REQUESTS_JITTER = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "2000"))
+GUNICORN_TIMEOUT = int(os.getenv("GUNICORN_TIMEOUT", "60"))                 # worker sin responder -> reinicio
+GUNICORN_GRACEFUL_TIMEOUT = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))  # para terminar lo que tiene en curso
+
+# Matriz de confusión desde la vista materializada prediction_truth
+# (app/dashboards/truth_view.py): si al leerla tiene más de TRUTH_VIEW_MAX_AGE
+# segundos, se refresca en segundo plano y mientras tanto se sirve la anterior.
+TRUTH_VIEW_MAX_AGE = float(os.getenv("TRUTH_VIEW_MAX_AGE", "60"))
+
+# GET /api/dashboard/predictions: páginas por cursor sobre (predicted_at, id).
+# DASHBOARD_PAGE_SIZE filas por defecto, hasta DASHBOARD_PAGE_MAX con ?limit=.
+# Con ?stream=true las filas salen como NDJSON desde un cursor del servidor,
+# leídas de a DASHBOARD_STREAM_BATCH_ROWS.
+DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "100"))
+DASHBOARD_PAGE_MAX = int(os.getenv("DASHBOARD_PAGE_MAX", "1000"))
+DASHBOARD_STREAM_BATCH_ROWS = int(os.getenv("DASHBOARD_STREAM_BATCH_ROWS", "2000"))
+
+# Serie temporal del dashboard (app/dashboards/prediction_series.py): total y
+# tasa de positivos por minuto, hora o día, el intervalo más fino que deje el
+# rango visible en DASHBOARD_SERIES_MAX_BUCKETS puntos o menos.
+DASHBOARD_SERIES_MAX_BUCKETS = int(os.getenv("DASHBOARD_SERIES_MAX_BUCKETS", "1500"))
+
+# GET /api/dashboard/distribution (app/dashboards/distributions.py): histogramas
+# con width_bucket en SQL, DASHBOARD_HISTOGRAM_BINS intervalos por defecto y
+# hasta DASHBOARD_HISTOGRAM_MAX_BINS.
+DASHBOARD_HISTOGRAM_BINS = int(os.getenv("DASHBOARD_HISTOGRAM_BINS", "30"))
+DASHBOARD_HISTOGRAM_MAX_BINS = int(os.getenv("DASHBOARD_HISTOGRAM_MAX_BINS", "200"))
+
+# Caché de los callbacks del dashboard (app/dashboards/callback_cache.py): los
+# resultados (con las figuras ya construidas) se guardan en DASHBOARD_CACHE_DIR,
+# compartido por todas las pestañas y procesos del dashboard, por versión de los
+# datos (máximo id de predictions, ...). Una entrada vale como mucho
+# DASHBOARD_CACHE_TTL segundos aunque la versión no cambie; 0 desactiva la caché.
+DASHBOARD_CACHE_DIR = os.getenv("DASHBOARD_CACHE_DIR", "app/data/cache/dashboard")
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "300"))
@@ -2,132 +2,512 @@
 # 📁 Archivo: /app/controllers/predict_controller.py
 # =============================================
 
-import pickle
-import pandas as pd
+import logging
+import os
+import time
+import warnings
+from datetime import datetime
+import numpy as np
 from fastapi import HTTPException
-from app.models.db_model import save_prediction, find_client_by_features
-from app.services.data_preprocessing import ENCODERS_PATH, COLUMNS_PATH, DEFAULT_VALUES
-
-MODEL_PATH = "app/models/model_dt.pkl"
-
-# Cargar artefactos de preprocesamiento
-try:
-    with open("app/models/encoders.pkl", "rb") as f:
-        label_encoders = pickle.load(f)
-    with open("app/models/feature_names.pkl", "rb") as f:
-        feature_names = pickle.load(f)
-    print("✅ Artefactos de preprocesamiento cargados")
-except Exception as e:
-    print("⚠️ Error al cargar artefactos de preprocesamiento:", e)
-    label_encoders = None
-    feature_names = None
-
-try:
-    with open(MODEL_PATH, "rb") as f:
-        model = pickle.load(f)
-    print("✅ Modelo cargado exitosamente desde", MODEL_PATH)
-except Exception as e:
-    print("❌ Error al cargar el modelo:", e)
-    model = None
-
-# Cargar artefactos de preprocesado (si existen)
-try:
-    with open("app/models/encoders.pkl", "rb") as f:
-        label_encoders = pickle.load(f)
-except Exception:
-    label_encoders = None
-
-try:
-    with open("app/models/default_values.pkl", "rb") as f:
-        default_values = pickle.load(f)
-except Exception:
-    default_values = {}
-
-try:
-    with open("app/models/feature_names.pkl", "rb") as f:
-        feature_names = pickle.load(f)
-except Exception:
-    feature_names = None
+from app.config import (
+    MODEL_BUNDLE_PATH,
+    MODEL_WATCH_INTERVAL,
+    USE_COMPILED_TREE,
+    PREDICTION_CACHE_SIZE,
+    PREDICTION_CACHE_TTL,
+    PREDICTION_SINK_ENABLED,
+    PREDICTION_SINK_BATCH_SIZE,
+    PREDICTION_SINK_FLUSH_INTERVAL,
+    PREDICTION_SINK_MAX_QUEUE,
+    PREDICTION_SINK_RETRY_INTERVAL,
+    PREDICTION_SINK_SPOOL_PATH,
+    CLIENT_INDEX_ENABLED,
+    CLIENT_INDEX_REFRESH_INTERVAL,
+    CLIENT_INDEX_REFRESH_OVERLAP,
+)
+from app.models.db_model import (
+    save_prediction,
+    save_predictions,
+    find_client_by_features,
+    find_clients_by_features,
+    insert_prediction_rows,
+    prediction_row,
+)
+from app.services.data_preprocessing import DEFAULT_VALUES
+from app.services.feature_vector import normalize_record as _normalize_record
+from app.services.model_bundle import rss_mb
+from app.services.model_registry import ModelRegistry
+from app.services.prediction_cache import PredictionCache, cache_key
+from app.services.prediction_sink import PredictionSink
+from app.services.client_index import ClientIndex
+from app.services.executors import run_cpu, run_io
+from app.services.metrics import PREDICT_ERRORS, PREDICT_REQUESTS, PREDICT_STAGE_SECONDS, REGISTRY
+from app.services.structured_logging import payload_sampled
 
+log = logging.getLogger(__name__)
 
-def make_prediction(data: dict):
-    print("📥 Iniciando predicción con datos:", data)
-    if model is None:
-        print("❌ Error: Modelo no cargado")
+# El modelo se entrenó con un DataFrame, pero en inferencia recibe filas NumPy
+# ya ordenadas por FeatureVectorBuilder; el aviso de sklearn no aplica.
+warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+
+# Modelo activo (bundle + codificador + evaluador), recargable en caliente
+model_registry = ModelRegistry(MODEL_BUNDLE_PATH, USE_COMPILED_TREE, MODEL_WATCH_INTERVAL)
+if model_registry.reload()["status"] == "loaded":
+    log.info("Bundle del modelo cargado", extra={"fields": {
+        "model_version": model_registry.current.version,
+        "load_ms": round(model_registry.current.load_ms, 3),
+        "rss_mb": rss_mb(),
+    }})
+else:
+    log.error("Modelo no cargado; genera un bundle con: python -m app.services.train_model",
+              extra={"fields": {"path": MODEL_BUNDLE_PATH}})
+
+# Tiempo de carga y memoria del worker tras cargar el modelo
+model_load_report = {
+    "pid": os.getpid(),
+    "load_ms": round(model_registry.current.load_ms, 3) if model_registry.current else None,
+    "rss_mb": rss_mb(),
+}
+
+# Resultados recientes por perfil de cliente: (predicción, probabilidad, client_id)
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+
+def _build_prediction_sink():
+    if not PREDICTION_SINK_ENABLED:
+        return None
+    return PredictionSink(
+        insert_prediction_rows,
+        PREDICTION_SINK_SPOOL_PATH,
+        batch_size=PREDICTION_SINK_BATCH_SIZE,
+        flush_interval=PREDICTION_SINK_FLUSH_INTERVAL,
+        max_queue=PREDICTION_SINK_MAX_QUEUE,
+        retry_interval=PREDICTION_SINK_RETRY_INTERVAL,
+    )
+
+
+# Escritura diferida de predicciones (None -> INSERT síncrono en la solicitud)
+prediction_sink = _build_prediction_sink()
+
+# Vinculación con clientes en memoria (None -> consulta SQL en cada predicción).
+# Se carga en start_client_index() al arrancar la API.
+client_index = (
+    ClientIndex(CLIENT_INDEX_REFRESH_INTERVAL, CLIENT_INDEX_REFRESH_OVERLAP)
+    if CLIENT_INDEX_ENABLED else None
+)
+
+
+# Métricas leídas al momento del scrape de /metrics (sin costo por solicitud)
+REGISTRY.callback(
+    "bank_prediction_cache_hits_total", "Aciertos de la caché de predicciones",
+    lambda: prediction_cache.stats()["hits"], kind="counter",
+)
+REGISTRY.callback(
+    "bank_prediction_cache_misses_total", "Fallos de la caché de predicciones",
+    lambda: prediction_cache.stats()["misses"], kind="counter",
+)
+REGISTRY.callback(
+    "bank_prediction_sink_queue_depth", "Filas en cola del registro diferido",
+    lambda: prediction_sink.stats()["queue_depth"] if prediction_sink is not None else None,
+)
+REGISTRY.callback(
+    "bank_prediction_sink_spooled_total", "Filas enviadas al spool local por fallos de la BD",
+    lambda: prediction_sink.stats()["spooled"] if prediction_sink is not None else None, kind="counter",
+)
+REGISTRY.callback(
+    "bank_client_index_size", "Combinaciones de cliente en el índice en memoria",
+    lambda: client_index.stats()["size"] if client_index is not None else None,
+)
+REGISTRY.callback(
+    "bank_model_info", "Versión del modelo activo (valor siempre 1)",
+    lambda: {(model_registry.current.version,): 1} if model_registry.current else None, labelnames=("version",),
+)
+
+
+def _prediction_message(prediction_num: int) -> str:
+    return (
+        "Cliente propenso a aceptar la campaña."
+        if prediction_num == 1
+        else "Cliente no propenso a aceptar la campaña."
+    )
+
+
+def _active_model():
+    """
+    Modelo activo para esta solicitud. Se lee una sola vez: si hay una recarga
+    en curso, la solicitud termina con la versión con la que empezó.
+    """
+    active = model_registry.current
+    if active is None:
+        PREDICT_ERRORS.inc("model_not_loaded")
+        log.error("Modelo no cargado", extra={"fields": {"path": MODEL_BUNDLE_PATH}})
         raise HTTPException(status_code=500, detail="Modelo no cargado o inválido.")
-    if label_encoders is None or feature_names is None:
-        print("❌ Error: Artefactos faltantes:", 
-              f"label_encoders={'✓' if label_encoders else '❌'}, "
-              f"feature_names={'✓' if feature_names else '❌'}")
-        raise HTTPException(status_code=500, detail="Artefactos de preprocesamiento no disponibles.")
+    return active
+
+
+def ensure_model_loaded():
+    """Lanza HTTPException 500 si no hay modelo activo."""
+    _active_model()
+
+
+def _sklearn_predict_one(model, row):
+    with PREDICT_STAGE_SECONDS.time("predict", "single"):
+        prediction_num = int(model.predict(row)[0])
+    # Intentar obtener probabilidades si el modelo lo soporta
+    try:
+        with PREDICT_STAGE_SECONDS.time("predict_proba", "single"):
+            probability = float(model.predict_proba(row)[0][1])  # Probabilidad de clase positiva
+    except (AttributeError, NotImplementedError) as e:
+        log.warning("El modelo no soporta probabilidades: %s", e)
+        # Si el modelo no soporta probabilidades, usar un valor por defecto
+        probability = 1.0 if prediction_num == 1 else 0.0
+    return prediction_num, probability
+
+
+def _predict_one(active, processed_data: dict) -> tuple:
+    """Codifica un registro normalizado y retorna (predicción, probabilidad)."""
+    feature_builder = active.feature_builder
+    # Codificar con los mismos encoders del entrenamiento, en el orden de columnas del modelo
+    unknown = []
+    with PREDICT_STAGE_SECONDS.time("encode", "single"):
+        row = feature_builder.build_row(processed_data, unknown)
+    for col in unknown:
+        # Si hay una categoría nueva, se usa el código por defecto
+        PREDICT_ERRORS.inc("unknown_category")
+        log.warning("Valor desconocido en columna %s", col,
+                    extra={"fields": {"column": col, "value": processed_data.get(col)}})
+
+    sampled = log.isEnabledFor(logging.DEBUG) and payload_sampled()
+    if sampled:
+        log.debug("Vector preparado", extra={"fields": {
+            "vector": dict(zip(feature_builder.feature_cols, row[0].tolist())),
+        }})
+
+    if active.compiled_model is not None:
+        # Clase y probabilidad en un único recorrido del árbol
+        with PREDICT_STAGE_SECONDS.time("predict", "single"):
+            prediction_num, probability = active.compiled_model.predict_one(row[0])
+    else:
+        prediction_num, probability = _sklearn_predict_one(active.model, row)
+    if sampled:
+        log.debug("Predicción calculada", extra={"fields": {
+            "prediction": prediction_num, "probability": probability, "model_version": active.version,
+        }})
+    return prediction_num, probability
+
+
+def _start_prediction(data: dict) -> tuple:
+    """Toma el modelo activo, normaliza el registro y consulta la caché."""
+    active = _active_model()
+    sampled = log.isEnabledFor(logging.DEBUG) and payload_sampled()
+    if sampled:
+        log.debug("Iniciando predicción", extra={"fields": {"payload": data}})
+
+    try:
+        with PREDICT_STAGE_SECONDS.time("normalize", "single"):
+            processed_data = _normalize_record(data)
+        with PREDICT_STAGE_SECONDS.time("cache_lookup", "single"):
+            key = cache_key(processed_data)
+            cached = prediction_cache.get(key, active.version)
+    except Exception as e:
+        PREDICT_ERRORS.inc("invalid_input")
+        raise HTTPException(status_code=400, detail=f"Error en predicción: {str(e)}")
+    if sampled and cached is not None:
+        log.debug("Resultado desde caché", extra={"fields": {"cached": cached}})
+    return active, processed_data, key, cached
+
+
+def _index_ready() -> bool:
+    return client_index is not None and client_index.ready
+
+
+def _link_client(data: dict) -> tuple:
+    """
+    Retorna (client_id, ok). Usa el índice en memoria si está cargado; si no,
+    consulta la base de datos. Si la base de datos no responde la predicción
+    continúa sin vincular (ok=False) en lugar de fallar.
+    """
+    if _index_ready():
+        return client_index.lookup(data), True
+    try:
+        return find_client_by_features(data), True
+    except Exception as e:
+        PREDICT_ERRORS.inc("db_link")
+        log.warning("No se pudo vincular el cliente: %s", e, extra={"fields": {"error_type": type(e).__name__}})
+        return None, False
+
+
+def _link_clients(records: list) -> list:
+    """Versión por lotes de _link_client; sin base de datos retorna None para todos."""
+    if _index_ready():
+        return [client_index.lookup(r) for r in records]
+    try:
+        return find_clients_by_features(records)
+    except Exception as e:
+        PREDICT_ERRORS.inc("db_link")
+        log.warning("No se pudieron vincular los clientes del lote: %s", e,
+                    extra={"fields": {"error_type": type(e).__name__, "records": len(records)}})
+        return [None] * len(records)
+
+
+def _record_prediction(data: dict, prediction_num: int, client_id, model_version):
+    """Registra la predicción en el sink diferido (o con un INSERT síncrono si está desactivado)."""
+    if prediction_sink is not None:
+        prediction_sink.submit(prediction_row(data, prediction_num, client_id, model_version=model_version))
+    else:
+        _save_prediction(data, prediction_num, client_id, model_version)
+
+
+def _save_prediction(*args):
+    try:
+        save_prediction(*args)
+    except Exception:
+        PREDICT_ERRORS.inc("db_save")
+        raise
+
+
+def _timed_link_client(data: dict) -> tuple:
+    with PREDICT_STAGE_SECONDS.time("link_client", "single"):
+        return _link_client(data)
+
 
+def _finish_request(path: str, started: float, outcome: str):
+    PREDICT_REQUESTS.inc(path, outcome)
+    PREDICT_STAGE_SECONDS.observe(time.perf_counter() - started, "total", path)
+
+
+def _prediction_response(prediction_num: int, probability: float, client_id, model_version) -> dict:
+    return {
+        "prediction": "yes" if prediction_num == 1 else "no",
+        "probability": probability,
+        "message": _prediction_message(prediction_num),
+        "linked_client_id": client_id,
+        "model_version": model_version,
+    }
+
+
+def make_prediction(data: dict):
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        active, processed_data, key, cached = _start_prediction(data)
+        if cached is not None:
+            prediction_num, probability, client_id = cached
+        else:
+            prediction_num, probability = _predict_one(active, processed_data)
+            # Buscar cliente (si existe en tabla clients)
+            client_id, linked = _timed_link_client(processed_data)
+            if linked:
+                prediction_cache.put(key, (prediction_num, probability, client_id), active.version)
+
+        with PREDICT_STAGE_SECONDS.time("save", "single"):
+            _record_prediction(processed_data, prediction_num, client_id, active.version)
+        outcome = "cached" if cached is not None else "ok"
+        return _prediction_response(prediction_num, probability, client_id, active.version)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error en predicción: {str(e)}")
+    finally:
+        _finish_request("single", started, outcome)
+
+
+async def make_prediction_async(data: dict):
+    """
+    Igual que make_prediction, pero sin bloquear el event loop: la inferencia
+    se ejecuta en el pool de CPU y cada acceso a base de datos en el pool de E/S.
+    Con el sink diferido activo, el guardado solo encola la fila.
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        active, processed_data, key, cached = _start_prediction(data)
+        if cached is not None:
+            prediction_num, probability, client_id = cached
+        else:
+            prediction_num, probability = await run_cpu(_predict_one, active, processed_data)
+            if _index_ready():
+                # Búsqueda en memoria: no hace falta pasar por el pool de E/S
+                client_id, linked = _timed_link_client(processed_data)
+            else:
+                client_id, linked = await run_io(_timed_link_client, processed_data)
+            if linked:
+                prediction_cache.put(key, (prediction_num, probability, client_id), active.version)
+
+        with PREDICT_STAGE_SECONDS.time("save", "single"):
+            if prediction_sink is not None:
+                # Solo encola la fila: no bloquea el event loop
+                _record_prediction(processed_data, prediction_num, client_id, active.version)
+            else:
+                await run_io(_record_prediction, processed_data, prediction_num, client_id, active.version)
+        outcome = "cached" if cached is not None else "ok"
+        return _prediction_response(prediction_num, probability, client_id, active.version)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error en predicción: {str(e)}")
+    finally:
+        _finish_request("single", started, outcome)
+
+
+def get_prediction_cache_stats() -> dict:
+    """Contadores de la caché de predicciones (aciertos, fallos, expulsiones...)."""
+    return prediction_cache.stats()
+
+
+def get_prediction_sink_stats() -> dict:
+    """Profundidad de cola, filas escritas / en spool y latencia de escritura del sink."""
+    if prediction_sink is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_sink.stats()}
+
+
+def get_model_info() -> dict:
+    """Modelo activo, historial de recargas, tiempo de carga inicial y RSS de este worker."""
+    return {
+        "loaded": model_registry.current is not None,
+        **model_registry.stats(),
+        "startup": model_load_report,
+        # Cargado por el maestro de gunicorn antes del fork (preload_app)
+        "preloaded": model_load_report["pid"] != os.getpid(),
+        "pid": os.getpid(),
+        "warm_up": worker_warm_up_report,
+        "rss_mb": rss_mb(),
+    }
+
+
+def reload_model(force: bool = False) -> dict:
+    """Carga y activa el bundle de MODEL_BUNDLE_PATH si cambió (o siempre con 'force')."""
+    return model_registry.reload(force=force)
+
+
+def start_model_watcher():
+    model_registry.start_watching()
+
+
+def stop_model_watcher():
+    model_registry.stop_watching()
+
+
+def get_client_index_stats() -> dict:
+    """Tamaño, aciertos y marca de actualización del índice de clientes."""
+    if client_index is None:
+        return {"enabled": False}
+    return {"enabled": True, **client_index.stats()}
+
+
+def start_client_index():
+    """Carga el índice de clientes y arranca su actualización periódica (al iniciar la API)."""
+    if client_index is not None:
+        client_index.start()
+
+
+def stop_client_index():
+    if client_index is not None:
+        client_index.stop()
+
+
+# Calentamiento del worker actual (warm_up_worker, al arrancar la API)
+worker_warm_up_report = None
+
+
+def warm_up_worker(rounds: int = 50) -> dict:
+    """
+    Calienta este worker antes de aceptar solicitudes: recorre 'rounds' veces
+    la normalización, la clave de caché y la predicción del modelo activo
+    (filas y lotes) sin tocar la caché, la base de datos ni las métricas.
+    Con gunicorn corre en cada worker después del fork.
+    """
+    global worker_warm_up_report
+    started = time.perf_counter()
+    active = model_registry.current
+    if active is not None:
+        for _ in range(rounds):
+            cache_key(_normalize_record(dict(DEFAULT_VALUES)))
+            active.warm_up()
+    worker_warm_up_report = {
+        "pid": os.getpid(),
+        "model_version": active.version if active is not None else None,
+        "rounds": rounds if active is not None else 0,
+        "ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+    log.info("Worker calentado", extra={"fields": worker_warm_up_report})
+    return worker_warm_up_report
+
+
+def close_prediction_sink():
+    """Vacía el sink al detener la API (lo que no pueda escribirse queda en el spool)."""
+    if prediction_sink is not None:
+        prediction_sink.close()
+
+
+def make_batch_prediction(records: list) -> list:
+    """
+    Predice un lote de registros en bloque.
+
+    Todos los registros se codifican juntos en una matriz (FeatureVectorBuilder),
+    se hace una única llamada a predict_proba, una única consulta de
+    vinculación de clientes y un único INSERT multi-fila (o un único envío
+    al sink diferido).
+
+    Retorna una lista de dicts con la misma forma que make_prediction,
+    en el mismo orden que 'records'.
+    """
+    started = time.perf_counter()
+    outcome = "error"
     try:
-        # Convertir enums a strings
-        processed_data = {}
-        for key, value in data.items():
-            processed_data[key] = str(value.value) if hasattr(value, 'value') else value
-        # Completar valores faltantes con defaults
-        for col in DEFAULT_VALUES:
-            if col not in processed_data or processed_data[col] is None:
-                processed_data[col] = DEFAULT_VALUES[col]
-
-        # Crear DataFrame y aplicar transformaciones
-        df = pd.DataFrame([processed_data])
-        
-        # Codificar variables categóricas usando los mismos encoders del entrenamiento
-        for col in df.select_dtypes(include=["object"]).columns:
-            if col in label_encoders:
+        active = _active_model()
+        if not records:
+            outcome = "ok"
+            return []
+
+        stage = PREDICT_STAGE_SECONDS.time
+        with stage("normalize", "batch"):
+            processed = [_normalize_record(r) for r in records]
+        with stage("encode", "batch"):
+            X = active.feature_builder.build_matrix(processed)
+
+        with stage("predict", "batch"):
+            if active.compiled_model is not None:
+                predicted, probabilities = active.compiled_model.predict_many(X)
+            else:
+                # Una sola llamada al modelo: la clase es el argmax de las probabilidades,
+                # que es exactamente lo que hace model.predict internamente
+                proba = active.model.predict_proba(X)
+                predicted = active.model.classes_.take(np.argmax(proba, axis=1))
+                probabilities = proba[:, 1]  # Probabilidad de clase positiva
+
+        predictions = [int(p) for p in predicted]
+        with stage("link_client", "batch"):
+            client_ids = _link_clients(processed)
+        with stage("save", "batch"):
+            if prediction_sink is not None:
+                predicted_at = datetime.now()
+                prediction_sink.submit_many([
+                    prediction_row(data, prediction_num, client_id, predicted_at, active.version)
+                    for data, prediction_num, client_id in zip(processed, predictions, client_ids)
+                ])
+            else:
                 try:
-                    df[col] = label_encoders[col].transform(df[col].astype(str))
-                except ValueError as e:
-                    # Si hay una categoría nueva, usar el valor por defecto
-                    print(f"⚠️ Valor desconocido en columna {col}: {df[col].iloc[0]}")
-                    df[col] = 0
-
-        # Asegurar mismo orden de columnas que en entrenamiento, excluyendo 'deposit'
-        feature_cols = [col for col in feature_names if col != 'deposit']
-        df = df.reindex(columns=feature_cols, fill_value=0)
-        
-        # Predecir
-        print("📊 DataFrame preparado:", df.head())
-        print("🔍 Columnas disponibles:", df.columns.tolist())
-        
-        prediction_num = int(model.predict(df)[0])
-        print("🎯 Predicción numérica:", prediction_num)
-        prediction_str = "yes" if prediction_num == 1 else "no"
-        
-        # Intentar obtener probabilidades si el modelo lo soporta
-        try:
-            probability = float(model.predict_proba(df)[0][1])  # Probabilidad de clase positiva
-            print("📈 Probabilidad:", probability)
-        except (AttributeError, NotImplementedError) as e:
-            print("⚠️ Modelo no soporta probabilidades:", str(e))
-            # Si el modelo no soporta probabilidades, usar un valor por defecto
-            probability = 1.0 if prediction_num == 1 else 0.0
-
-        # Buscar cliente (si existe en tabla clients)
-        client_id = find_client_by_features(data)
-
-        save_prediction(data, prediction_num, client_id)
-
-        msg = (
-            "Cliente propenso a aceptar la campaña."
-            if prediction_num == 1
-            else "Cliente no propenso a aceptar la campaña."
-        )
-        
-        try:
-            return {
-                "prediction": prediction_str,
-                "probability": probability,
-                "message": msg,
+                    save_predictions(processed, predictions, client_ids, active.version)
+                except Exception:
+                    PREDICT_ERRORS.inc("db_save")
+                    raise
+
+        outcome = "ok"
+        return [
+            {
+                "prediction": "yes" if prediction_num == 1 else "no",
+                "probability": float(probability),
+                "message": _prediction_message(prediction_num),
                 "linked_client_id": client_id,
+                "model_version": active.version,
             }
-        except Exception as e:
-            print("❌ Error al construir respuesta:", str(e))
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error al construir respuesta: {str(e)}"
-            )
+            for prediction_num, probability, client_id in zip(predictions, probabilities, client_ids)
+        ]
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error en predicción: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error en predicción por lotes: {str(e)}")
+    finally:
+        _finish_request("batch", started, outcome)
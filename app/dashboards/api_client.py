@@ -7,6 +7,7 @@ Cliente para consumir la API desde el dashboard.
 
 import os
 import requests
+from urllib.parse import urlencode
 import pandas as pd
 from typing import Dict, Any, Optional
 
@@ -46,4 +47,14 @@ class APIClient:
 
     def get_confusion_matrix(self) -> Dict[str, Any]:
         """Obtiene datos para la matriz de confusión."""
-        return self._get("/api/dashboard/confusion-matrix")
\ No newline at end of file
+        return self._get("/api/dashboard/confusion-matrix")
+
+    def get_series(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        """Obtiene la serie temporal de predicciones (total y tasa de positivos por intervalo)."""
+        params = urlencode({k: v for k, v in (("start", start), ("end", end)) if v})
+        return self._get("/api/dashboard/series" + (f"?{params}" if params else ""))
+
+    def get_distribution(self, column: str, source: str = "predictions", bins: Optional[int] = None) -> Dict[str, Any]:
+        """Obtiene la distribución de una columna contada en el servidor (histograma o conteo por valor)."""
+        params = urlencode({"source": source, **({"bins": bins} if bins else {})})
+        return self._get(f"/api/dashboard/distribution/{column}?{params}")
@@ -0,0 +1,183 @@
+# =============================================
+# 📁 Archivo: /app/dashboards/callback_cache.py
+# =============================================
+"""
+Caché compartida para los callbacks del dashboard.
+
+Cada pestaña abierta dispara update_dashboard cada 30 segundos, y cada
+disparo repetía las consultas y armaba todas las figuras aunque los datos
+fueran los mismos. Ahora el resultado de un callback se guarda por clave y
+por versión de los datos (db_utils.fetch_data_version: máximo id de
+predictions, ...):
+
+- Mientras la versión no cambie (y la entrada tenga menos de 'ttl'
+  segundos), todas las pestañas y todos los procesos del dashboard leen el
+  resultado guardado, con las figuras ya construidas
+- Si varias llamadas piden a la vez una clave vieja, solo una la calcula
+  (un lock entre hilos y un flock entre procesos); las demás esperan y leen
+  su resultado. Ambos se reparten en LOCK_STRIPES franjas según el hash de
+  la clave: LOCK_STRIPES locks por instancia y ficheros fijos ("lock-<n>")
+  que nunca se borran, así que no crecen con las claves nuevas (p. ej. cada
+  rango de zoom)
+- Las entradas son ficheros pickle en un directorio local, escritos de forma
+  atómica (fichero temporal + os.replace)
+
+Si la versión no puede leerse (BD caída), se calcula sin caché. Los errores
+del cálculo se propagan y no se guarda nada.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+
+from app.config import DASHBOARD_CACHE_DIR, DASHBOARD_CACHE_TTL
+from app.dashboards.db_utils import fetch_data_version
+from app.services.file_lock import file_lock
+
+log = logging.getLogger(__name__)
+
+# Locks y ficheros de flock compartidos por las claves (claves distintas pueden compartir uno)
+LOCK_STRIPES = 64
+
+
+class CallbackCache:
+    """Resultados de callbacks por (clave, versión de datos) en 'directory'; ttl <= 0 la desactiva."""
+
+    def __init__(self, directory: str, ttl: float = 300.0, version=fetch_data_version, clock=time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self._version = version
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._pruned_at = clock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.uncached = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".pkl")
+
+    @staticmethod
+    def _stripe(key: str) -> int:
+        return int(hashlib.sha1(key.encode()).hexdigest()[:8], 16) % LOCK_STRIPES
+
+    def _lock_path(self, key: str) -> str:
+        # Un número fijo de ficheros: se pueden conservar siempre sin que crezca el directorio
+        return os.path.join(self.directory, f"lock-{self._stripe(key)}")
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        # La misma franja que _lock_path: quien tiene el lock del hilo es el único del proceso en su flock
+        return self._key_locks[self._stripe(key)]
+
+    def _read(self, path: str, version):
+        """El valor guardado en 'path' si es de 'version' y no venció; si no, None."""
+        try:
+            with open(path, "rb") as f:
+                entry_version, created_at, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # fichero corrupto o de otra versión del código: se recalcula
+            log.warning("Entrada ilegible en la caché del dashboard %s: %s", path, e)
+            return None
+        if entry_version != version or self._clock() - created_at >= self.ttl:
+            return None
+        return (value,)
+
+    def _write(self, path: str, version, value):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((version, self._clock(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def _prune(self):
+        """
+        Borra las entradas vencidas (p. ej. rangos de zoom que nadie volvió a
+        pedir), una vez por ttl. Los ficheros de lock no se tocan: otro proceso
+        puede tener un flock sobre ellos.
+        """
+        now = self._clock()
+        with self._lock:
+            if now - self._pruned_at < self.ttl:
+                return
+            self._pruned_at = now
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith(".pkl") and now - os.path.getmtime(path) >= self.ttl:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get_or_compute(self, key: str, compute):
+        """Valor de 'key' para la versión actual de los datos; lo calcula con compute() si hace falta."""
+        if not self.enabled:
+            return compute()
+        try:
+            version = self._version()
+        except Exception as e:
+            self._count("uncached")
+            log.warning("Sin versión de datos para la caché del dashboard: %s", e,
+                        extra={"fields": {"error_type": type(e).__name__}})
+            return compute()
+
+        path = self._path(key)
+        cached = self._read(path, version)
+        if cached is not None:
+            self._count("hits")
+            return cached[0]
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._key_lock(key), file_lock(self._lock_path(key)):
+            # Otra llamada pudo calcularla mientras se esperaba el lock
+            cached = self._read(path, version)
+            if cached is not None:
+                self._count("waits")
+                return cached[0]
+            self._count("misses")
+            try:
+                value = compute()
+            except Exception:
+                self._count("errors")
+                raise
+            self._write(path, version, value)
+        self._prune()
+        return value
+
+    def clear(self):
+        """Borra todas las entradas del directorio (no los ficheros de lock)."""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                os.remove(os.path.join(self.directory, name))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "directory": self.directory,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "uncached": self.uncached,
+                "errors": self.errors,
+            }
+
+
+# Compartida por los callbacks del dashboard de este proceso; el directorio, entre procesos
+callback_cache = CallbackCache(DASHBOARD_CACHE_DIR, DASHBOARD_CACHE_TTL)
@@ -6,49 +6,41 @@ Componente de gráficos de distribución para el dashboard
 """
 
 import plotly.express as px
+import plotly.graph_objects as go
 from dash import html, dcc
 
-def create_balance_distribution(df):
-    """Crea histograma de distribución de balance"""
-    fig = px.histogram(
-        df, 
-        x="balance",
-        nbins=30,
-        title="Distribución de Balance Económico",
-        labels={"balance": "Balance (€)", "count": "Frecuencia"}
-    )
+# Las funciones reciben la distribución ya contada en SQL
+# (app/dashboards/distributions.py o GET /api/dashboard/distribution/{column}),
+# no el DataFrame de filas.
+
+def create_histogram(dist, title, x_label):
+    """Barras contiguas con los conteos de un histograma {"edges", "counts"}"""
+    edges, counts = dist["edges"], dist["counts"]
+    centers = [(lo + hi) / 2 for lo, hi in zip(edges, edges[1:])]
+    widths = [(hi - lo) or 1 for lo, hi in zip(edges, edges[1:])]
+    fig = go.Figure(go.Bar(x=centers, y=counts, width=widths, name=x_label))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title="Frecuencia", bargap=0)
     return fig
 
-def create_duration_distribution(df):
+def create_category_pie(dist, title):
+    """Gráfico circular con los conteos {"categories", "counts"}"""
+    return px.pie(values=dist["counts"], names=dist["categories"], title=title)
+
+def create_balance_distribution(dist):
+    """Crea histograma de distribución de balance"""
+    return create_histogram(dist, "Distribución de Balance Económico", "Balance (€)")
+
+def create_duration_distribution(dist):
     """Crea histograma de duración de llamadas"""
-    fig = px.histogram(
-        df,
-        x="duration",
-        nbins=30,
-        title="Distribución de Duración de Llamadas",
-        labels={"duration": "Duración (segundos)", "count": "Frecuencia"}
-    )
-    return fig
+    return create_histogram(dist, "Distribución de Duración de Llamadas", "Duración (segundos)")
 
-def create_job_distribution(df):
+def create_job_distribution(dist):
     """Crea gráfico circular de distribución por trabajo"""
-    job_counts = df["job"].value_counts()
-    fig = px.pie(
-        values=job_counts.values,
-        names=job_counts.index,
-        title="Distribución por Tipo de Trabajo"
-    )
-    return fig
+    return create_category_pie(dist, "Distribución por Tipo de Trabajo")
 
-def create_education_distribution(df):
+def create_education_distribution(dist):
     """Crea gráfico circular de distribución por educación"""
-    education_counts = df["education"].value_counts()
-    fig = px.pie(
-        values=education_counts.values,
-        names=education_counts.index,
-        title="Distribución por Nivel Educativo"
-    )
-    return fig
+    return create_category_pie(dist, "Distribución por Nivel Educativo")
 
 def add_distribution_plots():
     """Agrega gráficos de distribución al dashboard"""
@@ -5,34 +5,64 @@ import dash
 from dash import html, dcc, dash_table
 from dash.dependencies import Input, Output, State
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
-from sklearn.metrics import confusion_matrix, accuracy_score
-from app.dashboards.db_utils import get_connection, fetch_predictions
+from app.dashboards.callback_cache import callback_cache
+from app.dashboards.components.distribution_plots import create_histogram
+from app.dashboards.distributions import distribution
+from app.dashboards.prediction_series import prediction_series
+from app.dashboards.db_utils import PAGE_COLUMNS, fetch_prediction_page, fetch_summary_metrics
+from app.dashboards.truth_view import truth_view
+from app.services.structured_logging import configure_logging
 import requests  # Agregado para llamadas a la API
 
+# Logs JSON por cola de db_utils (errores de BD)
+configure_logging()
+
 app = dash.Dash(__name__, title="Dashboard Bank Marketing", assets_folder="../../app/static")
 server = app.server
 
-def compute_metrics(df):
-    total = int(df.shape[0]) if not df.empty else 0
-    positive = int(df["result"].sum()) if not df.empty else 0
+# Filas de la tabla de últimas predicciones
+TABLE_ROWS = 20
+
+def compute_metrics(summary):
+    """Métricas de las tarjetas desde los totales de prediction_summary (fetch_summary_metrics)."""
+    total, positive = summary["total"], summary["positive"]
     positive_rate = round((positive / total) * 100, 2) if total > 0 else 0.0
-    last_update = df["predicted_at"].max() if not df.empty else None
-    return {"total": total, "positive": positive, "positive_rate": positive_rate, "last_update": last_update}
+    return {"total": total, "positive": positive, "positive_rate": positive_rate, "last_update": summary["last_update"]}
+
+BUCKET_LABELS = {"minute": "minuto", "hour": "hora", "day": "día"}
 
-def fetch_with_truth():
-    """Une predictions con clients para calcular accuracy."""
-    conn = get_connection()
-    query = """
-        SELECT p.result AS predicted, c.deposit AS actual
-        FROM predictions p
-        JOIN clients c ON p.client_id = c.id
+def visible_range(relayout):
     """
-    df = pd.read_sql(query, conn)
-    conn.close()
-    if not df.empty:
-        df["actual"] = df["actual"].map({"yes": 1, "no": 0})
-    return df
+    Rango del eje x tras un zoom en el histórico, según relayoutData.
+    None para volver al rango completo; dash.no_update si el evento no cambia el rango.
+    """
+    if not relayout:
+        return dash.no_update
+    if relayout.get("xaxis.autorange"):
+        return None
+    if "xaxis.range[0]" in relayout:
+        return [relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]]
+    if "xaxis.range" in relayout:
+        return list(relayout["xaxis.range"])
+    return dash.no_update
+
+def series_figure(series):
+    """Barras con el total por intervalo y línea con la tasa de positivos (eje derecho)."""
+    points = pd.DataFrame(series["points"], columns=["bucket", "total", "positive", "positive_rate"])
+    fig = go.Figure()
+    fig.add_bar(x=points["bucket"], y=points["total"], name="Predicciones")
+    fig.add_scatter(x=points["bucket"], y=points["positive_rate"], name="% positivos", mode="lines", yaxis="y2")
+    fig.update_layout(
+        title=f"Histórico de predicciones (por {BUCKET_LABELS[series['bucket']]})",
+        yaxis={"title": "Predicciones"},
+        yaxis2={"title": "% positivos", "overlaying": "y", "side": "right", "range": [0, 100]},
+        legend={"orientation": "h"},
+        # Conserva el zoom del usuario al reemplazar la figura
+        uirevision="ts-predictions",
+    )
+    return fig
 
 # Opciones para dropdowns basadas en el dataset UCI Bank Marketing
 job_options = [
@@ -106,6 +136,7 @@ app.layout = html.Div([
     ]),
     html.Div([
         dcc.Graph(id="ts-predictions"),
+        dcc.Store(id="ts-range"),
     ]),
     html.Div([
         html.H3("Últimas predicciones"),
@@ -183,6 +214,29 @@ app.layout = html.Div([
     dcc.Interval(id="interval", interval=30000, n_intervals=0)
 ])
 
+def dashboard_data():
+    """Métricas, figuras ya serializadas y tabla de update_dashboard (lo que guarda callback_cache)."""
+    # Totales de prediction_summary: el costo no depende del tamaño de predictions
+    metrics = compute_metrics(fetch_summary_metrics())
+
+    # Cuatro celdas de la vista materializada prediction_truth, sin traer el join
+    truth = truth_view.summary()
+    if truth["labelled"] > 0:
+        acc = truth["accuracy"]
+        cm_df = pd.DataFrame(truth["matrix"], index=["No", "Sí"], columns=["Pred. No", "Pred. Sí"])
+        cm_fig = px.imshow(cm_df, text_auto=True, color_continuous_scale="Blues", title="Matriz de confusión")
+    else:
+        acc = 0
+        cm_fig = px.imshow([[0, 0], [0, 0]], text_auto=True, title="Sin datos")
+
+    # 20 intervalos armados con los conteos por edad de prediction_age_summary (~80 filas)
+    age_fig = create_histogram(distribution("age", bins=20), "Distribución de edades", "Edad")
+    # Primera página del índice (predicted_at, id), como GET /api/dashboard/predictions
+    table_data = [dict(zip(PAGE_COLUMNS, row)) for row in fetch_prediction_page(TABLE_ROWS)]
+
+    return {"metrics": metrics, "accuracy": acc, "cm_fig": cm_fig.to_dict(), "age_fig": age_fig.to_dict(),
+            "table": table_data}
+
 @app.callback(
     [
         Output("card-total", "children"),
@@ -191,35 +245,21 @@ app.layout = html.Div([
         Output("card-update", "children"),
         Output("conf-matrix", "figure"),
         Output("hist-age", "figure"),
-        Output("ts-predictions", "figure"),
         Output("table", "data")
     ],
     [Input("interval", "n_intervals")]
 )
 def update_dashboard(n):
     try:
-        df = fetch_predictions()
-        metrics = compute_metrics(df)
+        # Todas las pestañas y procesos comparten el resultado mientras los datos no cambien
+        data = callback_cache.get_or_compute("update_dashboard", dashboard_data)
+        metrics = data["metrics"]
         total_card = [html.H4("Total"), html.H2(metrics["total"])]
         pos_card = [html.H4("Positivos"), html.H2(metrics["positive"])]
         update_card = [html.H4("Última actualización"), html.P(str(metrics["last_update"]))]
+        acc_card = [html.H4("Exactitud del modelo"), html.H2(f"{data['accuracy']}%")]
 
-        df_truth = fetch_with_truth()
-        if not df_truth.empty:
-            acc = round(accuracy_score(df_truth["actual"], df_truth["predicted"]) * 100, 2)
-            cm = confusion_matrix(df_truth["actual"], df_truth["predicted"])
-            cm_df = pd.DataFrame(cm, index=["No", "Sí"], columns=["Pred. No", "Pred. Sí"])
-            cm_fig = px.imshow(cm_df, text_auto=True, color_continuous_scale="Blues", title="Matriz de confusión")
-        else:
-            acc = 0
-            cm_fig = px.imshow([[0, 0], [0, 0]], text_auto=True, title="Sin datos")
-
-        acc_card = [html.H4("Exactitud del modelo"), html.H2(f"{acc}%")]
-        age_fig = px.histogram(df, x="age", nbins=20, title="Distribución de edades")
-        ts_fig = px.line(df, x="predicted_at", y="result", title="Histórico de predicciones")
-        table_data = df.sort_values("predicted_at", ascending=False).head(20).to_dict("records")
-
-        return total_card, pos_card, acc_card, update_card, cm_fig, age_fig, ts_fig, table_data
+        return total_card, pos_card, acc_card, update_card, data["cm_fig"], data["age_fig"], data["table"]
     except Exception as e:
         print(f"Error en update_dashboard: {str(e)}")
         total_card = [html.H4("Total"), html.H2("--")]
@@ -229,9 +269,26 @@ def update_dashboard(n):
         acc_card = [html.H4("Exactitud del modelo"), html.H2(f"{acc}%")]
         cm_fig = px.imshow([[0, 0], [0, 0]], text_auto=True, title="Error de conexión")
         age_fig = px.histogram([], title="Distribución de edades")
-        ts_fig = px.line([], title="Histórico de predicciones")
         table_data = []
-        return total_card, pos_card, acc_card, update_card, cm_fig, age_fig, ts_fig, table_data
+        return total_card, pos_card, acc_card, update_card, cm_fig, age_fig, table_data
+
+@app.callback(Output("ts-range", "data"), Input("ts-predictions", "relayoutData"))
+def update_ts_range(relayout):
+    return visible_range(relayout)
+
+@app.callback(
+    Output("ts-predictions", "figure"),
+    [Input("interval", "n_intervals"), Input("ts-range", "data")]
+)
+def update_ts_predictions(n, visible):
+    try:
+        # Un punto por intervalo agregado en SQL, no uno por predicción
+        start, end = (pd.Timestamp(t).to_pydatetime() for t in visible) if visible else (None, None)
+        key = f"ts-predictions:{start}:{end}"
+        return callback_cache.get_or_compute(key, lambda: series_figure(prediction_series(start, end)).to_dict())
+    except Exception as e:
+        print(f"Error en update_ts_predictions: {str(e)}")
+        return px.line([], title="Histórico de predicciones")
 
 # ✅ Mejora aplicada aquí
 @app.callback(
@@ -2,42 +2,20 @@
 # Archivo: /app/dashboards/db_utils.py
 # =============================================
 """
-Utilidades para consultar MySQL desde el dashboard.
-Encapsula la conexión y retorna DataFrame con las predicciones.
+Utilidades para consultar PostgreSQL desde el dashboard.
+Usa el pool de conexiones compartido con la API y retorna DataFrames.
 """
 
-import psycopg2
-from config import DB_CONFIG
-import threading
-
-# Almacenar conexiones activas
-_active_connections = []
-_connections_lock = threading.Lock()
-
-def get_connection():
-    """Obtiene una conexión y la registra para poder cerrarla después"""
-    conn = psycopg2.connect(
-        host=DB_CONFIG["host"],
-        user=DB_CONFIG["user"],
-        password=DB_CONFIG["password"],
-        dbname=DB_CONFIG["dbname"],
-        port=DB_CONFIG["port"]
-    )
-    with _connections_lock:
-        _active_connections.append(conn)
-    return conn
+import logging
+import pandas as pd
+from app.database.connection import connection, close_pool, get_pool
+
+log = logging.getLogger(__name__)
+
 
 def close_all_connections():
-    """Cierra todas las conexiones activas"""
-    with _connections_lock:
-        while _active_connections:
-            conn = _active_connections.pop()
-            try:
-                if not conn.closed:
-                    conn.close()
-            except:
-                pass
-import pandas as pd
+    """Cierra las conexiones del pool compartido (al detener el dashboard)"""
+    close_pool()
 
 
 def fetch_predictions(limit: int = None) -> pd.DataFrame:
@@ -45,64 +23,298 @@ def fetch_predictions(limit: int = None) -> pd.DataFrame:
     Trae las predicciones desde la tabla 'predictions' y retorna un DataFrame.
     :param limit: si es None trae todo, sino los últimos N registros.
     """
+    query = "SELECT id, age, job, marital, education, balance, result, predicted_at FROM predictions ORDER BY predicted_at DESC"
+    if isinstance(limit, int):
+        query = query + f" LIMIT {limit}"
+
     try:
-        conn = get_connection()
+        with connection() as conn:
+            df = pd.read_sql(query, conn)
     except Exception as e:
-        # Retorna DataFrame vacío en caso de error de conexión
-        print(f"⚠️ Error conexión BD en fetch_predictions: {e}")
+        # Retorna DataFrame vacío en caso de error de conexión o de consulta
+        log.warning("Error BD en fetch_predictions: %s", e, extra={"fields": {"error_type": type(e).__name__}})
         return pd.DataFrame()
 
-    try:
-        query = "SELECT id, age, job, marital, education, balance, result, predicted_at FROM predictions ORDER BY predicted_at DESC"
-        if isinstance(limit, int):
-            query = query + f" LIMIT {limit}"
+    # Asegurar tipos
+    if not df.empty:
+        df["predicted_at"] = pd.to_datetime(df["predicted_at"], format="%Y-%m-%d %H:%M:%S.%f")
+    return df
 
-        df = pd.read_sql(query, conn)
-        conn.close()
 
-        # Asegurar tipos
-        if not df.empty:
-            df["predicted_at"] = pd.to_datetime(df["predicted_at"], format="%Y-%m-%d %H:%M:%S.%f")
-        return df
+# Columnas de GET /api/dashboard/predictions, en el orden de las tuplas retornadas
+PAGE_COLUMNS = ("id", "age", "job", "marital", "education", "balance", "result", "predicted_at")
 
-    except Exception as e:
-        print(f"⚠️ Error ejecutando query en fetch_predictions: {e}")
-        try:
-            conn.close()
-        except:
-            pass
-        return pd.DataFrame()
+
+def _page_query(after) -> tuple:
+    """
+    SELECT en orden (predicted_at, id) descendente desde la marca 'after'
+    (predicted_at, id) de la última fila ya entregada. Usa el índice
+    idx_predictions_predicted_at_id. Las filas con predicted_at NULL van
+    primero, como en un ORDER BY ... DESC.
+    """
+    where, params = "", {}
+    if after is not None:
+        predicted_at, last_id = after
+        params["last_id"] = last_id
+        if predicted_at is None:
+            where = "WHERE (predicted_at IS NULL AND id < %(last_id)s) OR predicted_at IS NOT NULL "
+        else:
+            where = "WHERE (predicted_at, id) < (%(predicted_at)s, %(last_id)s) "
+            params["predicted_at"] = predicted_at
+    query = (
+        f"SELECT {', '.join(PAGE_COLUMNS)} FROM predictions {where}"
+        "ORDER BY predicted_at DESC, id DESC LIMIT %(limit)s"
+    )
+    return query, params
+
+
+def fetch_prediction_page(limit: int, after=None) -> list:
+    """
+    Hasta 'limit' predicciones siguientes a la marca 'after', como tuplas en
+    el orden de PAGE_COLUMNS. Los errores de BD se propagan.
+    """
+    query, params = _page_query(after)
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, {**params, "limit": limit})
+            return cursor.fetchall()
 
 
-def fetch_with_truth() -> pd.DataFrame:
+def iter_predictions(after=None, limit: int = None, batch_rows: int = 2000):
     """
-    Une predicciones con la tabla de clientes para obtener el valor real
-    :return: DataFrame con columnas ['predicted', 'actual'] donde ambas son 0/1
+    Itera bloques de hasta 'batch_rows' tuplas (orden de PAGE_COLUMNS) desde un
+    cursor del servidor: la memoria no depende del número de filas. La
+    conexión queda prestada hasta agotar o cerrar el iterador.
     """
+    query, params = _page_query(after)
+    pool = get_pool()
+    conn = pool.getconn()
     try:
-        conn = get_connection()
-    except Exception as e:
-        print(f"⚠️ Error conexión BD en fetch_with_truth: {e}")
-        return pd.DataFrame()
+        with conn.cursor(name="dashboard_predictions") as cursor:
+            cursor.itersize = batch_rows
+            cursor.execute(query, {**params, "limit": limit})
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                yield rows
+    finally:
+        # También si el iterador se cierra a mitad (cliente desconectado); putconn hace el rollback
+        pool.putconn(conn)
+
 
+def fetch_summary_metrics() -> dict:
+    """
+    Totales de la tabla prediction_summary (una fila por hora, la mantienen
+    triggers sobre predictions), sin leer las predicciones.
+    :return: dict con total, positive, labelled, hits y last_update; ceros si la BD falla
+    """
+    query = (
+        "SELECT COALESCE(sum(total), 0), COALESCE(sum(positive), 0), COALESCE(sum(labelled), 0), "
+        "COALESCE(sum(hits), 0), max(last_predicted_at) FROM prediction_summary"
+    )
     try:
+        with connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query)
+                total, positive, labelled, hits, last_update = cursor.fetchone()
+    except Exception as e:
+        log.warning("Error BD en fetch_summary_metrics: %s", e, extra={"fields": {"error_type": type(e).__name__}})
+        total, positive, labelled, hits, last_update = 0, 0, 0, 0, None
+    return {
+        "total": int(total),
+        "positive": int(positive),
+        "labelled": int(labelled),
+        "hits": int(hits),
+        "last_update": last_update,
+    }
+
+
+def fetch_truth_counts() -> tuple:
+    """
+    Celdas de la vista prediction_truth y su antigüedad.
+    :return: (dict (predicted, actual) -> n, segundos desde el último refresco). Los errores de BD se propagan.
+    """
+    query = (
+        "SELECT predicted, actual, n, EXTRACT(EPOCH FROM now() - refreshed_at) "
+        "FROM prediction_truth"
+    )
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            rows = cursor.fetchall()
+    cells = {(predicted, actual): int(n) for predicted, actual, n, _ in rows}
+    age = max((float(age) for *_, age in rows), default=None)
+    return cells, age
+
+
+# Clave del advisory lock que evita refrescos simultáneos de prediction_truth
+TRUTH_VIEW_LOCK_KEY = 0x7472757468
+
+
+def refresh_truth_view() -> bool:
+    """
+    REFRESH MATERIALIZED VIEW CONCURRENTLY prediction_truth. Si otro proceso
+    ya la está refrescando no espera y retorna False.
+    """
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (TRUTH_VIEW_LOCK_KEY,))
+            if not cursor.fetchone()[0]:
+                conn.rollback()
+                return False
+            cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY prediction_truth")
+        conn.commit()
+    return True
+
+
+def fetch_series_range() -> tuple:
+    """
+    (primera hora, última predicted_at) con predicciones según prediction_summary,
+    sin contar las de predicted_at NULL. (None, None) si no hay. Los errores de BD se propagan.
+    """
+    query = (
+        "SELECT min(hour), max(last_predicted_at) FROM prediction_summary "
+        "WHERE hour > '-infinity' AND total > 0"
+    )
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            return cursor.fetchone()
+
+
+def fetch_prediction_series(bucket: str, start, end) -> list:
+    """
+    Total y positivos por intervalo ('minute', 'hour' o 'day') de predicted_at
+    en [start, end), como tuplas (inicio del intervalo, total, positivos) en
+    orden. start y end deben estar alineados al intervalo.
+
+    Por hora y por día se suman las filas de prediction_summary; por minuto se
+    agrupa en predictions el rango del índice idx_predictions_predicted_at_id.
+    Los errores de BD se propagan.
+    """
+    if bucket == "minute":
+        query = (
+            "SELECT date_trunc('minute', predicted_at), count(*), COALESCE(sum(result), 0) FROM predictions "
+            "WHERE predicted_at >= %(start)s AND predicted_at < %(end)s GROUP BY 1 ORDER BY 1"
+        )
+    else:
         query = (
-            "SELECT p.result AS predicted, c.deposit AS actual "
-            "FROM predictions p JOIN clients c ON p.client_id = c.id"
+            "SELECT date_trunc(%(bucket)s, hour), sum(total), sum(positive) FROM prediction_summary "
+            "WHERE hour >= %(start)s AND hour < %(end)s AND total > 0 GROUP BY 1 ORDER BY 1"
         )
-        df = pd.read_sql(query, conn)
-        conn.close()
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, {"bucket": bucket, "start": start, "end": end})
+            return cursor.fetchall()
 
-        if not df.empty:
-            # Normalizar a 0/1
-            df['actual'] = df['actual'].map({'yes': 1, 'no': 0})
-            df['predicted'] = df['predicted'].astype(int)
-        return df
 
-    except Exception as e:
-        print(f"⚠️ Error ejecutando query en fetch_with_truth: {e}")
-        try:
-            conn.close()
-        except:
-            pass
-        return pd.DataFrame()
+# Columnas con distribución en GET /api/dashboard/distribution, por tabla
+NUMERIC_COLUMNS = {
+    "predictions": ("age", "balance"),
+    "clients": ("age", "balance", "day", "duration", "campaign", "pdays", "previous"),
+}
+CATEGORICAL_COLUMNS = {
+    "predictions": ("job", "marital", "education", "result", "model_version"),
+    "clients": ("job", "marital", "education", "default", "housing", "loan", "contact", "month",
+                "poutcome", "deposit"),
+}
+
+
+def fetch_histogram(table: str, column: str, bins: int) -> tuple:
+    """
+    Histograma de una columna numérica con width_bucket: 'bins' intervalos
+    iguales entre el mínimo y el máximo (el máximo cae en el último). Los NULL
+    no cuentan. Los errores de BD se propagan.
+
+    Los límites y los conteos salen de la misma foto de la tabla (transacción
+    REPEATABLE READ): una fila insertada entre las dos consultas no puede
+    quedar fuera de [mínimo, máximo] ni sumarse a un intervalo que no es el suyo.
+    predictions.age sale de prediction_age_summary, sin recorrer predictions.
+    :return: (mínimo, máximo, lista de 'bins' conteos); (None, None, []) si no hay valores
+    """
+    if column not in NUMERIC_COLUMNS.get(table, ()):
+        raise ValueError(f"Columna numérica no soportada: {table}.{column}")
+    if (table, column) == ("predictions", "age"):
+        return _age_histogram(bins)
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute(f'SELECT min("{column}")::float8, max("{column}")::float8 FROM {table}')
+            lo, hi = cursor.fetchone()
+            if lo is None:
+                return None, None, []
+            if hi > lo:
+                # width_bucket da bins + 1 para el máximo: va al último intervalo
+                bucket = (f'CASE WHEN "{column}"::float8 = %(hi)s THEN %(bins)s '
+                          f'ELSE width_bucket("{column}"::float8, %(lo)s, %(hi)s, %(bins)s) END')
+            else:
+                bucket = "1"
+            cursor.execute(
+                f'SELECT {bucket}, count(*) FROM {table} WHERE "{column}" IS NOT NULL GROUP BY 1',
+                {"lo": lo, "hi": hi, "bins": bins},
+            )
+            rows = cursor.fetchall()
+    counts = [0] * bins
+    for bucket, n in rows:
+        if not 1 <= bucket <= bins:
+            raise RuntimeError(f"Intervalo {bucket} fuera de 1..{bins} en el histograma de {table}.{column}")
+        counts[bucket - 1] = int(n)
+    return lo, hi, counts
+
+
+def _age_histogram(bins: int) -> tuple:
+    """
+    fetch_histogram de predictions.age a partir de los conteos por edad de
+    prediction_age_summary (una fila por edad, la mantienen los triggers).
+    Reparte cada edad como width_bucket de PostgreSQL.
+    """
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT age, total FROM prediction_age_summary WHERE total > 0 ORDER BY age")
+            rows = cursor.fetchall()
+    if not rows:
+        return None, None, []
+    lo, hi = float(rows[0][0]), float(rows[-1][0])
+    counts = [0] * bins
+    for age, n in rows:
+        # Como width_bucket: el cociente se trunca y el máximo va al último intervalo
+        bucket = min(int(bins * ((age - lo) / (hi - lo))), bins - 1) if hi > lo else 0
+        counts[bucket] += int(n)
+    return lo, hi, counts
+
+
+def fetch_category_counts(table: str, column: str) -> list:
+    """
+    Conteo por valor de una columna categórica, de mayor a menor, sin los
+    NULL. Los errores de BD se propagan.
+    :return: lista de tuplas (valor, conteo)
+    """
+    if column not in CATEGORICAL_COLUMNS.get(table, ()):
+        raise ValueError(f"Columna categórica no soportada: {table}.{column}")
+    query = (
+        f'SELECT "{column}", count(*) FROM {table} WHERE "{column}" IS NOT NULL '
+        f'GROUP BY 1 ORDER BY 2 DESC, 1'
+    )
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            return [(value, int(n)) for value, n in cursor.fetchall()]
+
+
+def fetch_data_version() -> str:
+    """
+    Versión de los datos del dashboard: cambia con cada predicción nueva
+    (max id), con borrados y cambios de hora (total de prediction_summary)
+    y con cada refresco de prediction_truth. Consulta índices y tablas
+    pequeñas, no predictions entera. Los errores de BD se propagan.
+    """
+    query = (
+        "SELECT (SELECT max(id) FROM predictions), (SELECT sum(total) FROM prediction_summary), "
+        "(SELECT max(refreshed_at) FROM prediction_truth)"
+    )
+    with connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            max_id, total, refreshed_at = cursor.fetchone()
+    return f"{max_id}:{total}:{refreshed_at.isoformat() if refreshed_at else None}"
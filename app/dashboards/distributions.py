@@ -0,0 +1,52 @@
+# =============================================
+# 📁 Archivo: /app/dashboards/distributions.py
+# =============================================
+"""
+Distribuciones de columnas de predictions y clients, contadas en SQL.
+
+Los histogramas del dashboard recibían el DataFrame completo y Plotly
+agrupaba las filas en el navegador. Ahora PostgreSQL devuelve los conteos y
+los componentes de app/dashboards/components/distribution_plots.py dibujan
+solo esos números:
+
+- Columnas numéricas: 'bins' intervalos iguales entre el mínimo y el máximo
+  con width_bucket
+- Columnas categóricas: conteo por valor, de mayor a menor
+
+Los NULL no se cuentan, como en px.histogram y value_counts.
+"""
+
+from app.config import DASHBOARD_HISTOGRAM_BINS, DASHBOARD_HISTOGRAM_MAX_BINS
+from app.dashboards.db_utils import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS, fetch_category_counts, fetch_histogram
+
+
+def distribution(column: str, source: str = "predictions", bins: int = DASHBOARD_HISTOGRAM_BINS,
+                 load_histogram=fetch_histogram, load_counts=fetch_category_counts) -> dict:
+    """
+    Distribución de 'column' en la tabla 'source' ('predictions' o 'clients').
+
+    :return: para columnas numéricas {"kind": "numeric", "edges": [bins + 1 bordes], "counts": [bins conteos]};
+        para categóricas {"kind": "categorical", "categories": [...], "counts": [...]}. Ambas con column,
+        source y total.
+    :raises ValueError: tabla o columna no soportada, o bins fuera de rango
+    """
+    if source not in NUMERIC_COLUMNS:
+        raise ValueError(f"Tabla no soportada: {source} (predictions o clients)")
+
+    if column in NUMERIC_COLUMNS[source]:
+        if not 1 <= bins <= DASHBOARD_HISTOGRAM_MAX_BINS:
+            raise ValueError(f"bins debe estar entre 1 y {DASHBOARD_HISTOGRAM_MAX_BINS}")
+        lo, hi, counts = load_histogram(source, column, bins)
+        width = (hi - lo) / bins if counts else 0
+        edges = [lo + i * width for i in range(bins)] + [hi] if counts else []
+        return {"column": column, "source": source, "kind": "numeric", "edges": edges, "counts": counts,
+                "total": sum(counts)}
+
+    if column in CATEGORICAL_COLUMNS[source]:
+        rows = load_counts(source, column)
+        return {"column": column, "source": source, "kind": "categorical",
+                "categories": [str(value) for value, _ in rows], "counts": [n for _, n in rows],
+                "total": sum(n for _, n in rows)}
+
+    columns = ", ".join(NUMERIC_COLUMNS[source] + CATEGORICAL_COLUMNS[source])
+    raise ValueError(f"Columna no soportada en {source}: {column} ({columns})")
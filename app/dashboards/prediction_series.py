@@ -0,0 +1,91 @@
+# =============================================
+# 📁 Archivo: /app/dashboards/prediction_series.py
+# =============================================
+"""
+Serie temporal de predicciones: total y tasa de positivos por intervalo.
+
+El histórico del dashboard dibujaba un punto por predicción (px.line sobre
+todas las filas). Ahora PostgreSQL agrupa por minuto, hora o día y se
+transfiere un punto por intervalo:
+
+- El intervalo es el más fino que deja el rango pedido en
+  DASHBOARD_SERIES_MAX_BUCKETS puntos o menos (minuto para unas horas, hora
+  para unas semanas, día para más)
+- Hora y día salen de la tabla prediction_summary; minuto, del índice
+  (predicted_at, id) de predictions, solo para rangos cortos
+- Los intervalos sin predicciones no se devuelven
+
+Las predicciones con predicted_at NULL no forman parte de la serie.
+"""
+
+from datetime import datetime, timedelta
+
+from app.config import DASHBOARD_SERIES_MAX_BUCKETS
+from app.dashboards.db_utils import fetch_prediction_series, fetch_series_range
+
+# Intervalos de más fino a más grueso
+BUCKETS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+
+def pick_bucket(start: datetime, end: datetime, max_buckets: int = DASHBOARD_SERIES_MAX_BUCKETS) -> str:
+    """El intervalo más fino con el que [start, end] queda en max_buckets puntos o menos."""
+    for bucket, step in BUCKETS.items():
+        if (end - start) / step <= max_buckets:
+            return bucket
+    return "day"
+
+
+def floor_to(ts: datetime, bucket: str) -> datetime:
+    """Inicio del intervalo que contiene ts."""
+    ts = ts.replace(second=0, microsecond=0)
+    if bucket in ("hour", "day"):
+        ts = ts.replace(minute=0)
+    if bucket == "day":
+        ts = ts.replace(hour=0)
+    return ts
+
+
+def prediction_series(start: datetime = None, end: datetime = None, bucket: str = None,
+                      max_buckets: int = DASHBOARD_SERIES_MAX_BUCKETS,
+                      load=fetch_prediction_series, load_range=fetch_series_range) -> dict:
+    """
+    Total, positivos y tasa de positivos (%) por intervalo entre start y end
+    (por defecto, de la primera a la última predicción). Los intervalos de
+    los extremos se cuentan enteros.
+
+    :param bucket: 'minute', 'hour' o 'day'; None lo elige según el rango
+    :return: dict con bucket, start, end (fin exclusivo) y points
+    :raises ValueError: intervalo desconocido, end anterior a start o un
+        intervalo que daría más de max_buckets puntos
+    """
+    if bucket is not None and bucket not in BUCKETS:
+        raise ValueError(f"Intervalo desconocido: {bucket} (minute, hour o day)")
+    if start is None or end is None:
+        first, last = load_range()
+        if first is None:
+            return {"bucket": bucket or "hour", "start": None, "end": None, "points": []}
+        start, end = start or first, end or last
+    if end < start:
+        raise ValueError("end es anterior a start")
+
+    auto = pick_bucket(start, end, max_buckets)
+    if bucket is None:
+        bucket = auto
+    elif list(BUCKETS).index(bucket) < list(BUCKETS).index(auto):
+        raise ValueError(f"El rango tiene más de {max_buckets} intervalos de '{bucket}'; use '{auto}'")
+
+    lo, hi = floor_to(start, bucket), floor_to(end, bucket) + BUCKETS[bucket]
+    points = []
+    for bucket_start, total, positive in load(bucket, lo, hi):
+        total, positive = int(total), int(positive)
+        points.append({
+            "bucket": bucket_start,
+            "total": total,
+            "positive": positive,
+            "positive_rate": round((positive / total) * 100, 2) if total > 0 else 0.0,
+        })
+    return {"bucket": bucket, "start": lo, "end": hi, "points": points}
@@ -0,0 +1,109 @@
+# =============================================
+# 📁 Archivo: /app/dashboards/truth_view.py
+# =============================================
+"""
+Matriz de confusión y accuracy de las predicciones vinculadas a un cliente.
+
+El cálculo anterior traía todas las filas de predictions ⋈ clients a pandas
+en cada llamada. Ahora el GROUP BY (predicted, actual) lo hace PostgreSQL en
+la vista materializada prediction_truth (cuatro filas), y tanto la API como
+el dashboard leen solo esas cuatro celdas:
+
+- Si al leer la vista tiene más de TRUTH_VIEW_MAX_AGE segundos, se lanza un
+  REFRESH ... CONCURRENTLY en un hilo y mientras tanto se sirve el contenido
+  actual (no se espera al refresco, que recorre el join completo)
+- Un advisory lock evita que varios procesos (workers de gunicorn, el
+  dashboard) la refresquen a la vez
+
+Solo cuentan las predicciones con cliente cuyo deposit es 'yes' o 'no'.
+"""
+
+import logging
+import threading
+from datetime import datetime
+
+from app.config import TRUTH_VIEW_MAX_AGE
+from app.dashboards.db_utils import fetch_truth_counts, refresh_truth_view
+
+log = logging.getLogger(__name__)
+
+
+def confusion_summary(cells: dict) -> dict:
+    """Matriz [[tn, fp], [fn, tp]] (filas: real, columnas: predicho), total y accuracy en %."""
+    matrix = [[cells.get((predicted, actual), 0) for predicted in (0, 1)] for actual in (0, 1)]
+    labelled = sum(sum(row) for row in matrix)
+    hits = matrix[0][0] + matrix[1][1]
+    accuracy = round((hits / labelled) * 100, 2) if labelled > 0 else 0
+    return {"matrix": matrix, "labelled": labelled, "accuracy": accuracy}
+
+
+class TruthView:
+    """Lectura de prediction_truth con refresco en segundo plano cuando está vieja."""
+
+    def __init__(self, max_age: float = 60.0, load=fetch_truth_counts, refresh=refresh_truth_view):
+        self.max_age = max_age
+        self._load = load
+        self._refresh = refresh
+        self._lock = threading.Lock()
+        self._thread = None
+        self.reads = 0
+        self.refreshes = 0
+        self.refresh_skipped = 0
+        self.refresh_errors = 0
+        self.last_refresh_at = None
+
+    def refresh(self) -> bool:
+        """Refresca la vista ahora. False si otro proceso la está refrescando."""
+        try:
+            done = self._refresh()
+        except Exception as e:
+            with self._lock:
+                self.refresh_errors += 1
+            log.warning("Error BD al refrescar prediction_truth: %s", e,
+                        extra={"fields": {"error_type": type(e).__name__}})
+            return False
+        with self._lock:
+            if done:
+                self.refreshes += 1
+                self.last_refresh_at = datetime.now()
+            else:
+                self.refresh_skipped += 1
+        return done
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self.refresh, name="truth-view-refresh", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: float = None):
+        """Espera al refresco en segundo plano en curso, si lo hay."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def summary(self) -> dict:
+        """Matriz, total y accuracy según el contenido actual de la vista, con su antigüedad en segundos."""
+        cells, age = self._load()
+        with self._lock:
+            self.reads += 1
+        if age is None or age > self.max_age:
+            self._refresh_in_background()
+        return {**confusion_summary(cells), "age_s": round(age, 1) if age is not None else None}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_age": self.max_age,
+                "reads": self.reads,
+                "refreshes": self.refreshes,
+                "refresh_skipped": self.refresh_skipped,
+                "refresh_errors": self.refresh_errors,
+                "refreshing": self._thread is not None and self._thread.is_alive(),
+                "last_refresh_at": self.last_refresh_at.isoformat() if self.last_refresh_at else None,
+            }
+
+
+# Compartida por las rutas de la API y los callbacks del dashboard de cada proceso
+truth_view = TruthView(TRUTH_VIEW_MAX_AGE)
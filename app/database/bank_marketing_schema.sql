@@ -35,6 +35,15 @@ CREATE TABLE IF NOT EXISTS clients (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Vinculación de predicciones con clientes (find_client_by_features y la carga
+-- de ClientIndex): última fila por (age, job, marital, education)
+CREATE INDEX IF NOT EXISTS idx_clients_linkage
+    ON clients (age, job, marital, education, created_at DESC NULLS LAST, id DESC);
+
+-- Actualización incremental de ClientIndex por marca (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_clients_created_at_id
+    ON clients (created_at, id);
+
 -- =============================================
 -- Tabla de predicciones
 -- =============================================
@@ -47,9 +56,211 @@ CREATE TABLE IF NOT EXISTS predictions (
     education VARCHAR(50),
     balance DOUBLE PRECISION,
     result INT,
+    model_version VARCHAR(40),
     predicted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Bases creadas antes de la recarga en caliente del modelo
+ALTER TABLE predictions ADD COLUMN IF NOT EXISTS model_version VARCHAR(40);
+
+-- Recuento por hora de prediction_summary tras borrados y cambios
+CREATE INDEX IF NOT EXISTS idx_predictions_predicted_at_id
+    ON predictions (predicted_at, id);
+
+-- =============================================
+-- Resumen por hora de las predicciones (GET /api/dashboard/metrics)
+-- =============================================
+-- Contadores por hora de predicted_at (predicted_at NULL va a la hora
+-- '-infinity'). 'labelled' son las predicciones vinculadas a un cliente con
+-- deposit 'yes' o 'no' (la misma población que prediction_truth) y 'hits' las
+-- que coinciden con su deposit. Lo mantienen los triggers de abajo:
+-- los INSERT (y COPY) suman sus filas por sentencia; UPDATE y DELETE de
+-- predicciones, y los cambios de deposit en clients, recuentan las horas
+-- afectadas.
+CREATE TABLE IF NOT EXISTS prediction_summary (
+    hour TIMESTAMP PRIMARY KEY,
+    total BIGINT NOT NULL DEFAULT 0,
+    positive BIGINT NOT NULL DEFAULT 0,
+    labelled BIGINT NOT NULL DEFAULT 0,
+    hits BIGINT NOT NULL DEFAULT 0,
+    last_predicted_at TIMESTAMP
+);
+
+-- Conteo de predicciones por edad (histograma de edades del dashboard, sin
+-- recorrer predictions). Lo mantienen los mismos triggers: INSERT suma,
+-- UPDATE y DELETE restan las filas viejas y suman las nuevas. Las edades NULL
+-- no se cuentan; las filas con total 0 se conservan. Cada trigger suma por
+-- sentencia y en orden de edad (las sesiones concurrentes bloquean las filas
+-- en el mismo orden).
+CREATE TABLE IF NOT EXISTS prediction_age_summary (
+    age INT PRIMARY KEY,
+    total BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION prediction_summary_hour(predicted_at TIMESTAMP) RETURNS TIMESTAMP AS $$
+    SELECT COALESCE(date_trunc('hour', predicted_at), '-infinity'::TIMESTAMP)
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Recalcula desde predictions las horas indicadas (NULL: todas)
+CREATE OR REPLACE FUNCTION prediction_summary_recount(hours TIMESTAMP[] DEFAULT NULL) RETURNS void AS $$
+BEGIN
+    IF hours IS NULL THEN
+        DELETE FROM prediction_summary;
+        INSERT INTO prediction_summary (hour, total, positive, labelled, hits, last_predicted_at)
+        SELECT prediction_summary_hour(p.predicted_at), count(*), COALESCE(sum(p.result), 0),
+               count(*) FILTER (WHERE c.deposit IN ('yes', 'no')),
+               count(*) FILTER (WHERE (c.deposit = 'yes' AND p.result = 1) OR (c.deposit = 'no' AND p.result = 0)),
+               max(p.predicted_at)
+        FROM predictions p LEFT JOIN clients c ON c.id = p.client_id
+        GROUP BY 1;
+        RETURN;
+    END IF;
+
+    DELETE FROM prediction_summary WHERE hour = ANY(hours);
+    INSERT INTO prediction_summary (hour, total, positive, labelled, hits, last_predicted_at)
+    SELECT h.hour, count(*), COALESCE(sum(p.result), 0),
+           count(*) FILTER (WHERE c.deposit IN ('yes', 'no')),
+           count(*) FILTER (WHERE (c.deposit = 'yes' AND p.result = 1) OR (c.deposit = 'no' AND p.result = 0)),
+           max(p.predicted_at)
+    FROM (SELECT DISTINCT unnest(hours) AS hour) h
+    JOIN predictions p
+      ON (p.predicted_at >= h.hour AND p.predicted_at < h.hour + INTERVAL '1 hour')
+      OR (h.hour = '-infinity' AND p.predicted_at IS NULL)
+    LEFT JOIN clients c ON c.id = p.client_id
+    GROUP BY h.hour
+    -- Una sesión concurrente pudo abrir la hora entre el DELETE y este INSERT;
+    -- su fila ya confirmada está incluida en este recuento
+    ON CONFLICT (hour) DO UPDATE SET
+        total = EXCLUDED.total, positive = EXCLUDED.positive, labelled = EXCLUDED.labelled,
+        hits = EXCLUDED.hits, last_predicted_at = EXCLUDED.last_predicted_at;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION prediction_summary_on_insert() RETURNS trigger AS $$
+BEGIN
+    -- ORDER BY: las sesiones concurrentes bloquean las horas en el mismo orden
+    INSERT INTO prediction_summary AS s (hour, total, positive, labelled, hits, last_predicted_at)
+    SELECT prediction_summary_hour(n.predicted_at), count(*), COALESCE(sum(n.result), 0),
+           count(*) FILTER (WHERE c.deposit IN ('yes', 'no')),
+           count(*) FILTER (WHERE (c.deposit = 'yes' AND n.result = 1) OR (c.deposit = 'no' AND n.result = 0)),
+           max(n.predicted_at)
+    FROM new_rows n LEFT JOIN clients c ON c.id = n.client_id
+    GROUP BY 1
+    ORDER BY 1
+    ON CONFLICT (hour) DO UPDATE SET
+        total = s.total + EXCLUDED.total,
+        positive = s.positive + EXCLUDED.positive,
+        labelled = s.labelled + EXCLUDED.labelled,
+        hits = s.hits + EXCLUDED.hits,
+        last_predicted_at = GREATEST(s.last_predicted_at, EXCLUDED.last_predicted_at);
+    INSERT INTO prediction_age_summary AS s (age, total)
+    SELECT age, count(*) FROM new_rows WHERE age IS NOT NULL GROUP BY 1 ORDER BY 1
+    ON CONFLICT (age) DO UPDATE SET total = s.total + EXCLUDED.total;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION prediction_summary_on_update() RETURNS trigger AS $$
+BEGIN
+    PERFORM prediction_summary_recount(ARRAY(
+        SELECT prediction_summary_hour(predicted_at) FROM old_rows
+        UNION SELECT prediction_summary_hour(predicted_at) FROM new_rows
+    ));
+    INSERT INTO prediction_age_summary AS s (age, total)
+    SELECT age, sum(delta) FROM (
+        SELECT age, -1 AS delta FROM old_rows UNION ALL SELECT age, 1 FROM new_rows
+    ) changed
+    WHERE age IS NOT NULL GROUP BY 1 ORDER BY 1
+    ON CONFLICT (age) DO UPDATE SET total = s.total + EXCLUDED.total;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION prediction_summary_on_delete() RETURNS trigger AS $$
+BEGIN
+    PERFORM prediction_summary_recount(ARRAY(SELECT DISTINCT prediction_summary_hour(predicted_at) FROM old_rows));
+    INSERT INTO prediction_age_summary AS s (age, total)
+    SELECT age, -count(*) FROM old_rows WHERE age IS NOT NULL GROUP BY 1 ORDER BY 1
+    ON CONFLICT (age) DO UPDATE SET total = s.total + EXCLUDED.total;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION prediction_summary_on_truncate() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM prediction_summary;
+    DELETE FROM prediction_age_summary;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Cambia el deposit de clientes ya vinculados: recontar las horas de sus predicciones
+CREATE OR REPLACE FUNCTION prediction_summary_on_client_update() RETURNS trigger AS $$
+BEGIN
+    PERFORM prediction_summary_recount(ARRAY(
+        SELECT DISTINCT prediction_summary_hour(p.predicted_at)
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id AND o.deposit IS DISTINCT FROM n.deposit
+        JOIN predictions p ON p.client_id = n.id
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_prediction_summary_insert ON predictions;
+CREATE TRIGGER trg_prediction_summary_insert
+    AFTER INSERT ON predictions REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION prediction_summary_on_insert();
+
+DROP TRIGGER IF EXISTS trg_prediction_summary_update ON predictions;
+CREATE TRIGGER trg_prediction_summary_update
+    AFTER UPDATE ON predictions REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION prediction_summary_on_update();
+
+DROP TRIGGER IF EXISTS trg_prediction_summary_delete ON predictions;
+CREATE TRIGGER trg_prediction_summary_delete
+    AFTER DELETE ON predictions REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION prediction_summary_on_delete();
+
+DROP TRIGGER IF EXISTS trg_prediction_summary_truncate ON predictions;
+CREATE TRIGGER trg_prediction_summary_truncate
+    AFTER TRUNCATE ON predictions
+    FOR EACH STATEMENT EXECUTE FUNCTION prediction_summary_on_truncate();
+
+DROP TRIGGER IF EXISTS trg_prediction_summary_client_update ON clients;
+CREATE TRIGGER trg_prediction_summary_client_update
+    AFTER UPDATE ON clients REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION prediction_summary_on_client_update();
+
+-- Bases con predicciones anteriores al resumen: cargarlo una vez
+SELECT prediction_summary_recount()
+WHERE NOT EXISTS (SELECT 1 FROM prediction_summary) AND EXISTS (SELECT 1 FROM predictions);
+
+INSERT INTO prediction_age_summary (age, total)
+SELECT age, count(*) FROM predictions
+WHERE age IS NOT NULL AND NOT EXISTS (SELECT 1 FROM prediction_age_summary)
+GROUP BY age;
+
+-- =============================================
+-- Matriz de confusión de las predicciones vinculadas (GET /api/dashboard/confusion-matrix)
+-- =============================================
+-- Una fila por celda (predicted, actual), siempre las cuatro, con 'actual' = 1/0
+-- según el deposit del cliente. La refresca app/dashboards/truth_view.py con
+-- REFRESH MATERIALIZED VIEW CONCURRENTLY (no bloquea las lecturas; requiere el
+-- índice único).
+CREATE MATERIALIZED VIEW IF NOT EXISTS prediction_truth AS
+SELECT cell.predicted, cell.actual, count(t.predicted) AS n, now() AS refreshed_at
+FROM (VALUES (0, 0), (0, 1), (1, 0), (1, 1)) AS cell (predicted, actual)
+LEFT JOIN (
+    SELECT p.result AS predicted, CASE c.deposit WHEN 'yes' THEN 1 WHEN 'no' THEN 0 END AS actual
+    FROM predictions p JOIN clients c ON c.id = p.client_id
+) t ON t.predicted = cell.predicted AND t.actual = cell.actual
+GROUP BY cell.predicted, cell.actual
+WITH DATA;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_prediction_truth_cell
+    ON prediction_truth (predicted, actual);
+
 -- =============================================
 -- Tabla opcional: métricas de rendimiento del modelo
 -- =============================================
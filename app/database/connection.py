@@ -0,0 +1,279 @@
+# =============================================
+# 📁 Archivo: /app/database/connection.py
+# =============================================
+"""
+Acceso a PostgreSQL compartido por la API y el dashboard.
+
+Todas las conexiones se abren a partir de un único DSN (DATABASE_URL en
+app/config.py) y se reutilizan desde un pool seguro entre hilos:
+
+- tamaño mínimo y máximo configurables (DB_POOL_MIN / DB_POOL_MAX)
+- si no hay conexiones libres, se espera hasta DB_POOL_TIMEOUT segundos
+- las conexiones que llevan más de DB_POOL_HEALTHCHECK segundos sin usarse se
+  verifican con `SELECT 1` antes de entregarse; si fallan se reemplazan
+- las conexiones ociosas por encima del mínimo se cierran tras
+  DB_POOL_IDLE_TIMEOUT segundos
+
+Uso:
+    from app.database.connection import connection
+
+    with connection() as conn:
+        cur = conn.cursor()
+        ...
+        conn.commit()
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+from app.config import (
+    DATABASE_URL,
+    DB_POOL_MIN,
+    DB_POOL_MAX,
+    DB_POOL_TIMEOUT,
+    DB_POOL_IDLE_TIMEOUT,
+    DB_POOL_HEALTHCHECK,
+)
+
+
+class PoolTimeout(Exception):
+    """No se obtuvo una conexión del pool en el tiempo de espera configurado."""
+
+
+class DatabaseNotConfigured(Exception):
+    """No hay DSN: ni DATABASE_URL ni DB_PASSWORD están definidos."""
+
+
+def _configured_dsn() -> str:
+    if not DATABASE_URL:
+        raise DatabaseNotConfigured(
+            "Base de datos sin configurar: define DATABASE_URL o DB_PASSWORD "
+            "(con DB_USER, DB_HOST, DB_PORT y DB_NAME)"
+        )
+    return DATABASE_URL
+
+
+def connect(dsn: str = None):
+    """Abre una conexión nueva (sin pool) a partir del DSN."""
+    return psycopg2.connect(dsn or _configured_dsn())
+
+
+class ConnectionPool:
+    """Pool de conexiones psycopg2 con espera acotada, chequeo de salud y reciclado de ociosas."""
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10, timeout: float = 30.0,
+                 idle_timeout: float = 300.0, healthcheck_after: float = 30.0, clock=time.monotonic):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Tamaños de pool inválidos: min={min_size}, max={max_size}")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.healthcheck_after = healthcheck_after
+        self._clock = clock
+        self._idle = []          # [(conexión, último uso)], la más reciente al final
+        self._open = 0           # conexiones abiertas (ociosas + prestadas)
+        self._closed = False
+        self._cond = threading.Condition()
+        self.created = 0
+        self.discarded = 0
+        self.recycled = 0
+
+    # -- conexiones individuales ------------------------------------------------
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        self.created += 1
+        return conn
+
+    def _is_healthy(self, conn, idle_for: float) -> bool:
+        if conn.closed:
+            return False
+        if idle_for < self.healthcheck_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # -- préstamo / devolución -------------------------------------------------
+
+    def getconn(self):
+        """Presta una conexión; espera hasta 'timeout' segundos si el pool está lleno."""
+        deadline = self._clock() + self.timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("El pool está cerrado")
+                self._recycle_idle()
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    idle_for = self._clock() - last_used
+                elif self._open < self.max_size:
+                    self._open += 1
+                    conn, idle_for = None, 0.0
+                else:
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"Sin conexiones libres tras {self.timeout}s (max={self.max_size})")
+                    self._cond.wait(remaining)
+                    continue
+
+            # Conexión y chequeo fuera del lock para no bloquear a otros hilos
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+            if self._is_healthy(conn, idle_for):
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn, close: bool = False):
+        """Devuelve una conexión al pool (o la cierra si 'close' o si quedó inservible)."""
+        if not close and not conn.closed:
+            try:
+                # Nunca devolver una transacción abierta o abortada al pool
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                close = True
+        if close or conn.closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, self._clock()))
+            self._cond.notify()
+
+    def _discard(self, conn):
+        self._close_quietly(conn)
+        with self._cond:
+            self._open -= 1
+            self.discarded += 1
+            self._cond.notify()
+
+    def _recycle_idle(self):
+        # Debe llamarse con el lock tomado. Cierra las ociosas más antiguas por encima del mínimo.
+        now = self._clock()
+        while self._idle and self._open > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.pop(0)
+            self._open -= 1
+            self.recycled += 1
+            self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        """Presta una conexión durante el bloque; si hay una excepción se hace rollback."""
+        conn = self.getconn()
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                pass
+            self.putconn(conn)
+            raise
+        self.putconn(conn)
+
+    # -- ciclo de vida ---------------------------------------------------------
+
+    def fill(self):
+        """Abre conexiones hasta llegar al tamaño mínimo."""
+        conns = [self.getconn() for _ in range(max(0, self.min_size - self.stats()["open"]))]
+        for conn in conns:
+            self.putconn(conn)
+
+    def close(self):
+        """Cierra las conexiones ociosas; las prestadas se cierran al devolverse."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "created": self.created,
+                "discarded": self.discarded,
+                "recycled": self.recycled,
+            }
+
+
+# Pool del proceso actual. Se crea al primer uso y se recrea tras un fork,
+# porque las conexiones de libpq no pueden compartirse entre procesos.
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(
+                _configured_dsn(),
+                min_size=DB_POOL_MIN,
+                max_size=DB_POOL_MAX,
+                timeout=DB_POOL_TIMEOUT,
+                idle_timeout=DB_POOL_IDLE_TIMEOUT,
+                healthcheck_after=DB_POOL_HEALTHCHECK,
+            )
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def set_pool(pool):
+    """Reemplaza el pool del proceso (p. ej. para apuntar a otra base de datos en tests)."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        old, _pool, _pool_pid = _pool, pool, os.getpid()
+    if old is not None and old is not pool:
+        old.close()
+
+
+def close_pool():
+    """Cierra el pool del proceso actual (al detener la API o el dashboard)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+@contextmanager
+def connection():
+    """Atajo para `get_pool().connection()`."""
+    with get_pool().connection() as conn:
+        yield conn
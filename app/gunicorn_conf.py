@@ -0,0 +1,83 @@
+# =============================================
+# 📁 Archivo: /app/gunicorn_conf.py
+# =============================================
+"""
+Configuración de gunicorn para producción: N workers de uvicorn preforkeados.
+
+    gunicorn -c app/gunicorn_conf.py
+
+- preload_app: el maestro importa app.main una sola vez, y con ello carga el
+  bundle del modelo, los encoders y las librerías (numpy, sklearn, pandas),
+  antes de crear los workers. Los workers comparten esas páginas por
+  copy-on-write. gc.freeze() en el maestro saca esos objetos de las pasadas
+  del recolector de basura de los workers, que de otro modo escribiría en sus
+  cabeceras y forzaría la copia de las páginas
+- Cada worker ejecuta el lifespan de la API tras el fork: calentamiento del
+  modelo (warm_up_worker), índice de clientes, vigilancia del bundle, pools de
+  hilos y de conexiones propios
+- Reciclado: cada worker se reemplaza tras GUNICORN_MAX_REQUESTS solicitudes
+  (+ jitter), sin cortar las que tiene en curso
+
+Variables (app/config.py): WEB_CONCURRENCY (workers; por defecto uno por
+núcleo), GUNICORN_BIND, GUNICORN_PRELOAD, GUNICORN_MAX_REQUESTS,
+GUNICORN_MAX_REQUESTS_JITTER, GUNICORN_TIMEOUT y GUNICORN_GRACEFUL_TIMEOUT.
+
+Una recarga del modelo (POST /api/admin/model/reload o cambio del bundle) se
+aplica en cada worker por separado. Los arrays del árbol siguen compartidos
+porque el bundle está mapeado en memoria (caché de páginas). Los encoders y
+demás objetos de Python quedan duplicados en cada worker hasta que se
+reinicia el maestro. `kill -HUP` no basta: con preload_app, gunicorn no
+vuelve a importar la app.
+"""
+
+import gc
+import os
+
+from app.config import (
+    GUNICORN_BIND,
+    GUNICORN_GRACEFUL_TIMEOUT,
+    GUNICORN_MAX_REQUESTS,
+    GUNICORN_MAX_REQUESTS_JITTER,
+    GUNICORN_PRELOAD,
+    GUNICORN_TIMEOUT,
+    GUNICORN_WORKERS,
+)
+
+try:
+    import uvicorn_worker  # noqa: F401
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:
+    # Worker incluido en uvicorn (obsoleto, mismo comportamiento)
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+wsgi_app = "app.main:app"
+bind = GUNICORN_BIND
+workers = GUNICORN_WORKERS
+preload_app = GUNICORN_PRELOAD
+max_requests = GUNICORN_MAX_REQUESTS
+max_requests_jitter = GUNICORN_MAX_REQUESTS_JITTER
+timeout = GUNICORN_TIMEOUT
+graceful_timeout = GUNICORN_GRACEFUL_TIMEOUT
+keepalive = 5
+accesslog = None
+
+
+def when_ready(server):
+    """Maestro con la app ya importada: congelar el heap antes del primer fork."""
+    if not preload_app:
+        return
+    from app.controllers.predict_controller import model_load_report, model_registry
+
+    gc.collect()
+    gc.freeze()
+    server.log.info(
+        "Modelo precargado en el maestro (pid %s): versión %s, %s MB de RSS; %s objetos congelados",
+        os.getpid(),
+        model_registry.current.version if model_registry.current else None,
+        model_load_report["rss_mb"],
+        gc.get_freeze_count(),
+    )
+
+
+def post_worker_init(worker):
+    worker.log.info("Worker %s listo (máximo %s solicitudes)", worker.pid, worker.max_requests)
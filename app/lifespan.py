@@ -0,0 +1,41 @@
+# =============================================
+# 📁 Archivo: /app/lifespan.py
+# =============================================
+"""
+Ciclo de vida compartido por app/main.py y app/server.py:
+recursos que se crean al arrancar la API y se liberan al detenerla.
+"""
+
+from contextlib import asynccontextmanager
+
+from app.controllers.predict_controller import (
+    close_prediction_sink,
+    start_client_index,
+    stop_client_index,
+    start_model_watcher,
+    stop_model_watcher,
+    warm_up_worker,
+)
+from app.database.connection import close_pool
+from app.services.executors import run_cpu, run_io, shutdown_executors
+from app.services.structured_logging import flush_logging
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Calentar el modelo en el pool de CPU (con gunicorn, en cada worker tras el fork)
+    await run_cpu(warm_up_worker)
+    # Carga inicial del índice de clientes (consulta bloqueante, fuera del event loop)
+    await run_io(start_client_index)
+    # Recarga del modelo cuando cambia el bundle en disco (si MODEL_WATCH_INTERVAL > 0)
+    start_model_watcher()
+    yield
+    stop_model_watcher()
+    stop_client_index()
+    # Esperar a que terminen las tareas en curso de los pools de CPU y E/S
+    shutdown_executors(wait=True)
+    # Escribir las predicciones aún en cola antes de cerrar las conexiones
+    close_prediction_sink()
+    close_pool()
+    # Escribir los logs aún en cola
+    flush_logging()
@@ -9,8 +9,17 @@ Monta las rutas y lanza la aplicación.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.services.structured_logging import RequestContextMiddleware, configure_logging
+
+# Logs JSON por cola antes de importar las rutas (el controlador registra la carga del modelo)
+configure_logging()
+
 from app.routes.predict_routes import router as predict_router
 from app.routes.dashboard_routes import router as dashboard_router
+from app.routes.admin_routes import router as admin_router
+from app.routes.metrics_routes import router as metrics_router
+from app.services.metrics import HTTP_LATENCY, HTTP_REQUESTS, MetricsMiddleware
+from app.lifespan import lifespan
 
 
 # Crear aplicación FastAPI con metadatos
@@ -22,6 +31,7 @@ app = FastAPI(
     ),
     version="1.0.0",
     contact={"name": "Equipo de ML", "url": "https://github.com/yourusername/bank_marketing_local"},
+    lifespan=lifespan,
 )
 
 # Orígenes permitidos para CORS (ej. Dash en 8050)
@@ -30,6 +40,11 @@ origins = [
     "http://127.0.0.1:8050",
 ]
 
+# Conteo y duración de cada solicitud HTTP (expuestos en /metrics)
+app.add_middleware(MetricsMiddleware, requests=HTTP_REQUESTS, latency=HTTP_LATENCY)
+# request_id de cada solicitud para los logs (cabecera X-Request-ID)
+app.add_middleware(RequestContextMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -41,6 +56,8 @@ app.add_middleware(
 # Incluir rutas
 app.include_router(predict_router)
 app.include_router(dashboard_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
 
 
 @app.get("/", tags=["Inicio"], summary="Endpoint de bienvenida")
@@ -11,16 +11,41 @@ class DashboardMetrics(BaseModel):
     last_update: Optional[datetime] = None
 
 class PredictionRecord(BaseModel):
-    """Registro individual de predicción para el dashboard"""
+    """Registro individual de predicción para el dashboard (las columnas admiten NULL en la tabla)"""
     id: int
-    age: int
-    job: str
-    marital: str
-    education: str
-    balance: float
-    result: int
-    predicted_at: datetime
+    age: Optional[int] = None
+    job: Optional[str] = None
+    marital: Optional[str] = None
+    education: Optional[str] = None
+    balance: Optional[float] = None
+    result: Optional[int] = None
+    predicted_at: Optional[datetime] = None
 
 class PredictionsList(BaseModel):
-    """Lista de predicciones para el dashboard"""
-    predictions: List[PredictionRecord]
\ No newline at end of file
+    """Página de predicciones para el dashboard, de la más reciente a la más antigua"""
+    predictions: List[PredictionRecord]
+    next_cursor: Optional[str] = None  # None en la última página
+
+class SeriesPoint(BaseModel):
+    """Predicciones de un intervalo de la serie temporal"""
+    bucket: datetime      # inicio del intervalo
+    total: int
+    positive: int
+    positive_rate: float
+
+class PredictionSeries(BaseModel):
+    """Serie temporal de predicciones por minuto, hora o día"""
+    bucket: str
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None    # exclusivo
+    points: List[SeriesPoint]
+
+class Distribution(BaseModel):
+    """Distribución de una columna contada en SQL: histograma (numeric) o conteo por valor (categorical)"""
+    column: str
+    source: str
+    kind: str
+    total: int
+    counts: List[int]
+    edges: Optional[List[float]] = None        # bins + 1 bordes, solo numeric
+    categories: Optional[List[str]] = None     # solo categorical
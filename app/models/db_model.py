@@ -3,51 +3,85 @@
 # =============================================
 
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+import io
+import logging
+from psycopg2.extras import RealDictCursor, execute_values
 from datetime import datetime
-from config import DB_CONFIG
+from app.database.connection import connect, connection
 
-def get_connection():
-    return psycopg2.connect(
-        host=DB_CONFIG["host"],
-        user=DB_CONFIG["user"],
-        password=DB_CONFIG["password"],
-        dbname=DB_CONFIG["dbname"],
-        port=DB_CONFIG["port"]
-    )
+log = logging.getLogger(__name__)
 
 
+def get_connection():
+    """
+    Conexión nueva (sin pool) a partir de DATABASE_URL.
+    Las funciones de este módulo usan el pool compartido; esta función queda
+    para scripts y pruebas de conectividad que cierran la conexión ellos mismos.
+    """
+    return connect()
+
 
 def find_client_by_features(data):
     """
     Busca un cliente existente en la tabla 'clients' basado en coincidencias simples.
     Retorna su id o None si no se encuentra.
     """
-    conn = get_connection()
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
     query = """
         SELECT id FROM clients
         WHERE age = %s AND job = %s AND marital = %s AND education = %s
-        ORDER BY created_at DESC LIMIT 1
+        ORDER BY created_at DESC NULLS LAST, id DESC LIMIT 1
     """
     values = (data["age"], data["job"], data["marital"], data["education"])
-    cursor.execute(query, values)
-    row = cursor.fetchone()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute(query, values)
+        row = cursor.fetchone()
     return row["id"] if row else None
 
 
-def save_prediction(data, prediction, client_id=None):
+def fetch_latest_clients():
     """
-    Guarda una predicción en la tabla 'predictions', vinculada con client_id si existe.
+    Último cliente (mayor created_at, id) de cada combinación
+    (age, job, marital, education), para la carga inicial de ClientIndex.
+    Retorna filas (id, age, job, marital, education, created_at).
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    query = """
+        SELECT DISTINCT ON (age, job, marital, education) id, age, job, marital, education, created_at
+        FROM clients
+        ORDER BY age, job, marital, education, created_at DESC NULLS LAST, id DESC
+    """
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query)
+        return cursor.fetchall()
 
+
+def fetch_clients_since(created_at, client_id):
+    """
+    Clientes posteriores a la marca (created_at, id), en orden ascendente,
+    para la actualización incremental de ClientIndex.
+    Retorna filas (id, age, job, marital, education, created_at).
+    """
     query = """
-        INSERT INTO predictions (client_id, age, job, marital, education, balance, result, predicted_at)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        SELECT id, age, job, marital, education, created_at
+        FROM clients
+        WHERE (created_at, id) > (%s, %s)
+        ORDER BY created_at, id
+    """
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, (created_at, client_id))
+        return cursor.fetchall()
+
+
+def save_prediction(data, prediction, client_id=None, model_version=None):
+    """
+    Guarda una predicción en la tabla 'predictions', vinculada con client_id si existe.
+    'model_version' es la versión del bundle que la calculó.
+    """
+    query = """
+        INSERT INTO predictions (client_id, age, job, marital, education, balance, result, model_version, predicted_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
     """
 
     values = (
@@ -58,10 +92,124 @@ def save_prediction(data, prediction, client_id=None):
         data.get("education"),
         data.get("balance"),
         prediction,
+        model_version,
         datetime.now(),
     )
 
-    cursor.execute(query, values)
-    conn.commit()
-    conn.close()
-    print(f"💾 Predicción guardada (client_id={client_id}) resultado={prediction}")
+    with connection() as conn:
+        conn.cursor().execute(query, values)
+        conn.commit()
+    log.debug("Predicción guardada", extra={"fields": {"client_id": client_id, "result": prediction}})
+
+
+def find_clients_by_features(records):
+    """
+    Versión por lotes de find_client_by_features: resuelve todos los registros
+    con una sola consulta (VALUES + DISTINCT ON) en lugar de una por registro.
+    Retorna una lista de ids (o None) en el mismo orden que 'records'.
+    """
+    if not records:
+        return []
+
+    query = """
+        SELECT DISTINCT ON (v.idx) v.idx, c.id
+        FROM (VALUES %s) AS v(idx, age, job, marital, education)
+        JOIN clients c
+          ON c.age = v.age AND c.job = v.job AND c.marital = v.marital AND c.education = v.education
+        ORDER BY v.idx, c.created_at DESC NULLS LAST, c.id DESC
+    """
+    values = [
+        (i, r["age"], r["job"], r["marital"], r["education"])
+        for i, r in enumerate(records)
+    ]
+    with connection() as conn:
+        rows = execute_values(conn.cursor(), query, values, fetch=True)
+
+    client_ids = [None] * len(records)
+    for idx, client_id in rows:
+        client_ids[idx] = client_id
+    return client_ids
+
+
+# Columnas de 'predictions' que escriben save_predictions y el PredictionSink
+# predicted_at va siempre al final (el spool de prediction_sink lo decodifica por posición)
+PREDICTION_COLUMNS = (
+    "client_id", "age", "job", "marital", "education", "balance", "result", "model_version", "predicted_at",
+)
+
+
+def prediction_row(data, prediction, client_id=None, predicted_at=None, model_version=None):
+    """Tupla con los valores de una predicción, en el orden de PREDICTION_COLUMNS."""
+    return (
+        client_id,
+        data.get("age"),
+        data.get("job"),
+        data.get("marital"),
+        data.get("education"),
+        data.get("balance"),
+        prediction,
+        model_version,
+        predicted_at or datetime.now(),
+    )
+
+
+def insert_prediction_rows(rows):
+    """
+    Inserta filas ya armadas con prediction_row en un único INSERT multi-fila
+    y un solo commit.
+    """
+    if not rows:
+        return
+    # Filas del spool escritas antes de existir model_version: se guardan sin versión
+    rows = [row if len(row) == len(PREDICTION_COLUMNS) else (*row[:-1], None, row[-1]) for row in rows]
+    query = f"INSERT INTO predictions ({', '.join(PREDICTION_COLUMNS)}) VALUES %s"
+    with connection() as conn:
+        execute_values(conn.cursor(), query, rows, page_size=1000)
+        conn.commit()
+
+
+def save_predictions(records, predictions, client_ids=None, model_version=None):
+    """
+    Guarda varias predicciones con un único INSERT multi-fila y un solo commit.
+    """
+    if not records:
+        return
+    if client_ids is None:
+        client_ids = [None] * len(records)
+
+    now = datetime.now()
+    rows = [
+        prediction_row(data, prediction, client_id, now, model_version)
+        for data, prediction, client_id in zip(records, predictions, client_ids)
+    ]
+    insert_prediction_rows(rows)
+    log.debug("Predicciones guardadas en lote", extra={"fields": {"rows": len(rows)}})
+
+
+# Tablas que admite copy_into
+COPY_TABLES = ("clients", "predictions")
+
+
+def copy_into(frames, table: str, conn=None) -> int:
+    """
+    Carga DataFrames con COPY ... FROM STDIN (CSV), un commit por DataFrame.
+    Las columnas de cada DataFrame deben existir en la tabla. Usa el pool
+    compartido si no se pasa 'conn'. Retorna las filas cargadas.
+    """
+    if table not in COPY_TABLES:
+        raise ValueError(f"Tabla no soportada: {table}")
+    if conn is None:
+        with connection() as pooled:
+            return copy_into(frames, table, pooled)
+
+    rows = 0
+    cursor = conn.cursor()
+    for frame in frames:
+        columns = ", ".join(f'"{c}"' for c in frame.columns)
+        buffer = io.StringIO()
+        frame.to_csv(buffer, header=False, index=False)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        conn.commit()
+        rows += len(frame)
+    return rows
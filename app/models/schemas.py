@@ -7,7 +7,7 @@ en endpoints de la API.
 """
 
 from enum import Enum
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field, conint, confloat
 
 class JobType(str, Enum):
@@ -122,4 +122,35 @@ class PredictionResponse(BaseModel):
     prediction: str = Field(..., description="Predicción ('yes': acepta, 'no': no acepta)")
     message: str = Field(..., description="Mensaje explicativo de la predicción")
     linked_client_id: Optional[int] = Field(None, description="ID del cliente si existe en BD")
-    probability: float = Field(..., description="Probabilidad de aceptación")
\ No newline at end of file
+    probability: float = Field(..., description="Probabilidad de aceptación")
+    model_version: Optional[str] = Field(None, description="Versión del bundle del modelo que la calculó")
+
+class BatchPredictionRequest(BaseModel):
+    """
+    Solicitud de predicción por lotes.
+    Cada registro se valida por separado contra PredictionRequest, de modo que
+    un registro inválido no rechaza el lote completo.
+    """
+    records: List[Dict[str, Any]] = Field(..., min_length=1, description="Registros con la forma de PredictionRequest")
+
+class BatchPredictionResult(BaseModel):
+    """Resultado de un registro del lote."""
+    index: int = Field(..., description="Posición del registro en la solicitud")
+    prediction: str = Field(..., description="Predicción ('yes': acepta, 'no': no acepta)")
+    probability: float = Field(..., description="Probabilidad de aceptación")
+    message: str = Field(..., description="Mensaje explicativo de la predicción")
+    linked_client_id: Optional[int] = Field(None, description="ID del cliente si existe en BD")
+    model_version: Optional[str] = Field(None, description="Versión del bundle del modelo que la calculó")
+
+class BatchPredictionError(BaseModel):
+    """Error de validación o predicción de un registro del lote."""
+    index: int = Field(..., description="Posición del registro en la solicitud")
+    detail: str = Field(..., description="Descripción del error")
+
+class BatchPredictionResponse(BaseModel):
+    """Respuesta de predicción por lotes."""
+    total: int = Field(..., description="Registros recibidos")
+    succeeded: int = Field(..., description="Registros predichos correctamente")
+    failed: int = Field(..., description="Registros con error")
+    results: List[BatchPredictionResult]
+    errors: List[BatchPredictionError]
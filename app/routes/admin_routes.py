@@ -0,0 +1,58 @@
+# =============================================
+# 📁 Archivo: /app/routes/admin_routes.py
+# =============================================
+"""
+Define las rutas (endpoints) de administración de la API.
+Todas exigen la cabecera X-Admin-Token con el valor de ADMIN_TOKEN; si
+ADMIN_TOKEN no está definido, responden 403 a cualquiera.
+"""
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from app.config import ADMIN_TOKEN
+from app.controllers.predict_controller import get_model_info, reload_model
+from app.services.executors import run_io
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    # Sin token configurado las rutas quedan cerradas, no abiertas
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Rutas de administración deshabilitadas (ADMIN_TOKEN no definido)")
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Token de administración inválido")
+
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["administración"],
+    dependencies=[Depends(require_admin_token)],
+    responses={403: {"description": "Token de administración inválido o ADMIN_TOKEN no definido"}},
+)
+
+
+@router.post("/model/reload",
+    summary="Recarga el bundle del modelo sin reiniciar",
+    description="""
+    Carga el bundle de MODEL_BUNDLE_PATH, lo calienta y lo activa con un cambio atómico.
+    Las solicitudes en curso terminan con el modelo anterior.
+
+    - status "loaded": hay un modelo nuevo activo
+    - status "unchanged": el fichero tiene la misma versión que el activo (usar force=true para recargar igual)
+    - status "failed": el bundle nuevo no es válido y sigue activo el anterior (409 Conflict)
+    """
+)
+async def model_reload(force: bool = False):
+    # Leer y verificar el bundle es E/S bloqueante: fuera del event loop
+    result = await run_io(reload_model, force)
+    if result["status"] == "failed":
+        raise HTTPException(status_code=409, detail=result)
+    return result
+
+
+@router.get("/model",
+    summary="Modelo activo e historial de recargas",
+    description="Retorna la versión activa, si se vigila el fichero del bundle y las últimas recargas con su resultado"
+)
+async def model_status():
+    return get_model_info()
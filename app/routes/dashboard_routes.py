@@ -4,11 +4,22 @@
 """
 Define las rutas (endpoints) de la API para el dashboard.
 """
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
-import pandas as pd
-from app.dashboards.db_utils import fetch_predictions, fetch_with_truth
-from app.models.dashboard_schemas import DashboardMetrics, PredictionsList
+import base64
+import json
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
+from app.config import (
+    DASHBOARD_HISTOGRAM_BINS, DASHBOARD_HISTOGRAM_MAX_BINS, DASHBOARD_PAGE_MAX, DASHBOARD_PAGE_SIZE,
+    DASHBOARD_SERIES_MAX_BUCKETS, DASHBOARD_STREAM_BATCH_ROWS,
+)
+from app.dashboards.db_utils import PAGE_COLUMNS, fetch_prediction_page, fetch_summary_metrics, iter_predictions
+from app.dashboards.distributions import distribution
+from app.dashboards.prediction_series import prediction_series
+from app.dashboards.truth_view import truth_view
+from app.models.dashboard_schemas import DashboardMetrics, Distribution, PredictionSeries, PredictionsList
+from app.services.executors import run_io
 
 router = APIRouter(
     prefix="/api/dashboard",
@@ -16,6 +27,80 @@ router = APIRouter(
     responses={404: {"description": "No encontrado"}},
 )
 
+def _compute_metrics() -> dict:
+    # Agregados de prediction_summary: el costo no depende del tamaño de predictions
+    summary = fetch_summary_metrics()
+    total, positive = summary["total"], summary["positive"]
+    positive_rate = round((positive / total) * 100, 2) if total > 0 else 0.0
+
+    # Accuracy sobre las predicciones vinculadas a un cliente
+    labelled = summary["labelled"]
+    accuracy = round((summary["hits"] / labelled) * 100, 2) if labelled > 0 else 0
+
+    return {
+        "total": total,
+        "positive": positive,
+        "positive_rate": positive_rate,
+        "accuracy": accuracy,
+        "last_update": summary["last_update"]
+    }
+
+
+def _encode_cursor(row) -> str:
+    """Cursor opaco con la marca (predicted_at, id) de la última fila de una página."""
+    predicted_at, prediction_id = row[-1], row[0]
+    mark = f"{predicted_at.isoformat() if predicted_at else ''}|{prediction_id}"
+    return base64.urlsafe_b64encode(mark.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """(predicted_at, id) de un cursor de _encode_cursor; ValueError si no es válido."""
+    try:
+        mark = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        predicted_at, prediction_id = mark.split("|")
+        return (datetime.fromisoformat(predicted_at) if predicted_at else None), int(prediction_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+
+
+def _fetch_prediction_page(limit: int, after=None) -> dict:
+    # Una fila de más indica si hay página siguiente
+    rows = fetch_prediction_page(limit + 1, after)
+    page = rows[:limit]
+    return {
+        "predictions": [dict(zip(PAGE_COLUMNS, row)) for row in page],
+        "next_cursor": _encode_cursor(page[-1]) if len(rows) > limit else None,
+    }
+
+
+def _ndjson(rows) -> bytes:
+    lines = []
+    for row in rows:
+        record = dict(zip(PAGE_COLUMNS, row))
+        record["predicted_at"] = record["predicted_at"].isoformat() if record["predicted_at"] else None
+        lines.append(json.dumps(record))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _ndjson_stream(first, batches):
+    if first is not None:
+        yield _ndjson(first)
+    for rows in batches:
+        yield _ndjson(rows)
+
+
+def _naive(ts: Optional[datetime]) -> Optional[datetime]:
+    # predicted_at es TIMESTAMP sin zona: una fecha con zona se pasa a la hora local
+    if ts is not None and ts.tzinfo is not None:
+        return ts.astimezone().replace(tzinfo=None)
+    return ts
+
+
+def _compute_confusion_matrix() -> dict:
+    # Cuatro celdas agregadas en la vista materializada prediction_truth
+    return truth_view.summary()
+
+
 @router.get("/metrics", 
     response_model=DashboardMetrics,
     summary="Obtiene métricas generales del dashboard",
@@ -23,25 +108,8 @@ router = APIRouter(
 )
 async def get_metrics() -> DashboardMetrics:
     try:
-        df = fetch_predictions()
-        total = int(df.shape[0]) if not df.empty else 0
-        positive = int(df["result"].sum()) if not df.empty else 0
-        positive_rate = round((positive / total) * 100, 2) if total > 0 else 0.0
-        last_update = df["predicted_at"].max() if not df.empty else None
-        
-        # Calcular accuracy
-        df_truth = fetch_with_truth()
-        accuracy = 0
-        if not df_truth.empty:
-            accuracy = round((df_truth["predicted"] == df_truth["actual"]).mean() * 100, 2)
-        
-        return {
-            "total": total,
-            "positive": positive,
-            "positive_rate": positive_rate,
-            "accuracy": accuracy,
-            "last_update": last_update
-        }
+        # Consultas y pandas son bloqueantes: se ejecutan en el pool de E/S
+        return await run_io(_compute_metrics)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -51,13 +119,29 @@ async def get_metrics() -> DashboardMetrics:
 @router.get("/predictions", 
     response_model=PredictionsList,
     summary="Obtiene lista de predicciones",
-    description="Retorna las últimas predicciones realizadas con sus detalles"
+    description=f"""
+    Retorna las predicciones de la más reciente a la más antigua (predicted_at, id), por páginas.
+
+    - `limit`: filas por página (por defecto {DASHBOARD_PAGE_SIZE}, máximo {DASHBOARD_PAGE_MAX})
+    - `cursor`: el `next_cursor` de la página anterior; `next_cursor` es null en la última
+    - `stream=true`: todas las filas desde `cursor` (hasta `limit`, si se indica) como NDJSON,
+      leídas de un cursor del servidor sin armar la lista completa
+    """
 )
-async def get_predictions(limit: int = None) -> PredictionsList:
+async def get_predictions(limit: Optional[int] = Query(None, ge=1), cursor: Optional[str] = None,
+                          stream: bool = False) -> PredictionsList:
     try:
-        df = fetch_predictions(limit)
-        predictions = df.to_dict('records') if not df.empty else []
-        return {"predictions": predictions}
+        after = _decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        if stream:
+            batches = iter_predictions(after, limit, DASHBOARD_STREAM_BATCH_ROWS)
+            # El primer bloque se lee antes de responder: un error de BD todavía puede ser un 500
+            first = await run_io(next, batches, None)
+            return StreamingResponse(_ndjson_stream(first, batches), media_type="application/x-ndjson")
+        return await run_io(_fetch_prediction_page, min(limit or DASHBOARD_PAGE_SIZE, DASHBOARD_PAGE_MAX), after)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -66,24 +150,62 @@ async def get_predictions(limit: int = None) -> PredictionsList:
 
 @router.get("/confusion-matrix",
     summary="Obtiene datos para la matriz de confusión",
-    description="Retorna los datos necesarios para generar la matriz de confusión"
+    description="Retorna la matriz de confusión [[tn, fp], [fn, tp]] (filas: real, columnas: predicho), "
+                "el total de predicciones vinculadas, la accuracy y la antigüedad de la vista en segundos"
 )
 async def get_confusion_matrix():
     try:
-        df_truth = fetch_with_truth()
-        if df_truth.empty:
-            return {"matrix": [[0, 0], [0, 0]]}
-            
-        confusion_data = pd.crosstab(
-            df_truth["actual"], 
-            df_truth["predicted"],
-            rownames=["Actual"],
-            colnames=["Predicho"]
-        ).values.tolist()
-        
-        return {"matrix": confusion_data}
+        return await run_io(_compute_confusion_matrix)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error al obtener matriz de confusión: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/series",
+    response_model=PredictionSeries,
+    summary="Obtiene la serie temporal de predicciones",
+    description=f"""
+    Retorna total, positivos y tasa de positivos por intervalo de predicted_at, agregados en SQL.
+
+    - `start`, `end`: rango a mostrar (por defecto, de la primera a la última predicción)
+    - `bucket`: `minute`, `hour` o `day`; si se omite, el más fino que deja el rango en
+      {DASHBOARD_SERIES_MAX_BUCKETS} puntos o menos
+    """
+)
+async def get_series(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     bucket: Optional[str] = None) -> PredictionSeries:
+    try:
+        return await run_io(prediction_series, _naive(start), _naive(end), bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al obtener la serie de predicciones: {str(e)}"
+        )
+
+
+@router.get("/distribution/{column}",
+    response_model=Distribution,
+    summary="Obtiene la distribución de una columna",
+    description=f"""
+    Retorna la distribución de una columna de `predictions` o `clients`, contada en SQL.
+
+    - Columnas numéricas (age, balance, duration, ...): `bins` intervalos iguales entre el mínimo
+      y el máximo (width_bucket), por defecto {DASHBOARD_HISTOGRAM_BINS}, hasta {DASHBOARD_HISTOGRAM_MAX_BINS}
+    - Columnas categóricas (job, education, ...): conteo por valor, de mayor a menor
+    - `source`: `predictions` (por defecto) o `clients`
+    """
+)
+async def get_distribution(column: str, source: str = "predictions",
+                           bins: int = DASHBOARD_HISTOGRAM_BINS) -> Distribution:
+    try:
+        return await run_io(distribution, column, source, bins)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al obtener la distribución: {str(e)}"
+        )
@@ -0,0 +1,20 @@
+# =============================================
+# 📁 Archivo: /app/routes/metrics_routes.py
+# =============================================
+"""
+Expone las métricas del proceso en formato de texto de Prometheus.
+"""
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.services.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter(tags=["métricas"])
+
+
+@router.get("/metrics",
+    summary="Métricas en formato Prometheus",
+    description="Latencia por etapa de la predicción, solicitudes HTTP, errores por tipo y estado de caché, sink e índice de clientes de este worker",
+    include_in_schema=True,
+)
+def metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -4,9 +4,28 @@
 """
 Define las rutas (endpoints) de la API para las predicciones.
 """
-from fastapi import APIRouter, HTTPException
-from app.controllers.predict_controller import make_prediction
-from app.models.schemas import PredictionRequest, PredictionResponse
+import json
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from app.config import PREDICT_BATCH_MAX_RECORDS, PREDICT_STREAM_BATCH_SIZE, PREDICT_STREAM_MAX_LINE_BYTES
+from app.controllers.predict_controller import (
+    make_prediction_async,
+    make_batch_prediction,
+    ensure_model_loaded,
+    get_prediction_cache_stats,
+    get_prediction_sink_stats,
+    get_client_index_stats,
+    get_model_info,
+)
+from app.services.executors import run_cpu
+from app.models.schemas import (
+    PredictionRequest,
+    PredictionResponse,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+)
 
 router = APIRouter(
     prefix="/api",
@@ -41,11 +60,215 @@ async def predict(data: PredictionRequest) -> PredictionResponse:
         HTTPException: Si hay error al predecir o procesar datos
     """
     try:
-        # PredictionRequest ya validó tipos/rangos; convertir a dict para procesar
-        result = make_prediction(data.model_dump())
+        # PredictionRequest ya validó tipos/rangos; convertir a dict para procesar.
+        # Inferencia y base de datos se ejecutan en pools para no bloquear el event loop.
+        result = await make_prediction_async(data.model_dump())
         return PredictionResponse(**result)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error al procesar predicción: {str(e)}"
         )
+
+
+def _validate_records(records: list) -> tuple:
+    """Valida cada registro contra PredictionRequest; retorna (índices, registros válidos, errores)."""
+    valid_indices, valid_records, errors = [], [], []
+    for index, record in enumerate(records):
+        try:
+            valid_records.append(PredictionRequest.model_validate(record).model_dump())
+            valid_indices.append(index)
+        except ValidationError as e:
+            errors.append({"index": index, "detail": str(e.errors(include_url=False))})
+    return valid_indices, valid_records, errors
+
+
+@router.post("/predict/batch",
+    response_model=BatchPredictionResponse,
+    summary="Predice un lote de clientes en una sola llamada",
+    description=f"""
+    Versión por lotes de /api/predict para listas de campaña.
+
+    - Cada registro se valida por separado; los inválidos aparecen en `errors` con su índice
+    - Los registros válidos se codifican en bloque, se predicen con una sola llamada al modelo
+      y se guardan con un único INSERT
+    - Máximo {PREDICT_BATCH_MAX_RECORDS} registros por solicitud (413 si se supera)
+    """,
+    response_description="Resultados y errores por registro"
+)
+async def predict_batch(batch: BatchPredictionRequest) -> BatchPredictionResponse:
+    """
+    Endpoint de predicción por lotes.
+
+    Args:
+        batch: Lista de registros con la forma de PredictionRequest
+
+    Returns:
+        BatchPredictionResponse con un resultado o un error por registro
+
+    Raises:
+        HTTPException: Si el lote supera el máximo o falla la predicción del bloque
+    """
+    if len(batch.records) > PREDICT_BATCH_MAX_RECORDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"El lote supera el máximo de {PREDICT_BATCH_MAX_RECORDS} registros",
+        )
+
+    valid_indices, valid_records, errors = await run_cpu(_validate_records, batch.records)
+
+    try:
+        predictions = await run_cpu(make_batch_prediction, valid_records)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al procesar predicción por lotes: {str(e)}"
+        )
+
+    results = [{"index": index, **result} for index, result in zip(valid_indices, predictions)]
+    return BatchPredictionResponse(
+        total=len(batch.records),
+        succeeded=len(results),
+        failed=len(errors),
+        results=results,
+        errors=errors,
+    )
+
+
+def _score_lines(lines: list, first_index: int) -> bytes:
+    """
+    Valida y predice un micro-lote de líneas NDJSON. Retorna una línea de
+    resultado por línea de entrada: {"index", ...resultado} o {"index", "error"}.
+    """
+    records, errors = [], {}
+    for offset, line in enumerate(lines):
+        try:
+            records.append(json.loads(line))
+        except ValueError as e:
+            errors[offset] = f"JSON inválido: {e}"
+            records.append(None)
+    parsed = [offset for offset, record in enumerate(records) if offset not in errors]
+    valid_positions, valid_records, validation_errors = _validate_records([records[i] for i in parsed])
+    for error in validation_errors:
+        errors[parsed[error["index"]]] = error["detail"]
+
+    try:
+        predictions = make_batch_prediction(valid_records)
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        predictions = None
+        for position in valid_positions:
+            errors[parsed[position]] = detail
+    results = {}
+    if predictions is not None:
+        results = {parsed[position]: result for position, result in zip(valid_positions, predictions)}
+
+    out = []
+    for offset in range(len(lines)):
+        index = first_index + offset
+        body = {"index": index, **results[offset]} if offset in results else {"index": index, "error": errors[offset]}
+        out.append(json.dumps(body, ensure_ascii=False))
+    return ("\n".join(out) + "\n").encode("utf-8")
+
+
+async def _stream_predictions(request: Request):
+    """
+    Lee el cuerpo por trozos y responde cada micro-lote en cuanto se predice.
+    No se lee más cuerpo hasta que el resultado anterior fue entregado al
+    servidor: si el cliente lee despacio, send() espera y la lectura se
+    detiene (contrapresión), así que en memoria solo hay un micro-lote.
+    """
+    pending, index = b"", 0
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        # Una línea sin fin (o demasiado larga) no puede acumularse en memoria
+        oversized = len(pending) > PREDICT_STREAM_MAX_LINE_BYTES
+        for position, line in enumerate(lines):
+            if len(line) > PREDICT_STREAM_MAX_LINE_BYTES:
+                lines, oversized = lines[:position], True
+                break
+        lines = [line for line in lines if line.strip()]
+        for start in range(0, len(lines), PREDICT_STREAM_BATCH_SIZE):
+            batch = lines[start:start + PREDICT_STREAM_BATCH_SIZE]
+            yield await run_cpu(_score_lines, batch, index)
+            index += len(batch)
+        if oversized:
+            error = f"Línea de más de {PREDICT_STREAM_MAX_LINE_BYTES} bytes; se interrumpe el stream"
+            yield (json.dumps({"index": index, "error": error}, ensure_ascii=False) + "\n").encode("utf-8")
+            return
+    if pending.strip():
+        yield await run_cpu(_score_lines, [pending], index)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse que no escucha desconexiones en paralelo: esa tarea
+    consumiría los mensajes del cuerpo que la respuesta todavía está leyendo.
+    Una desconexión del cliente termina el stream desde request.stream().
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+@router.post("/predict/stream",
+    summary="Predicción en streaming de registros NDJSON",
+    description=f"""
+    Para trabajos de scoring muy grandes: el cuerpo es NDJSON (un objeto con la forma de
+    PredictionRequest por línea, puede enviarse por trozos) y la respuesta es NDJSON con un
+    resultado por línea, en el mismo orden.
+
+    - Las líneas se predicen en micro-lotes de hasta {PREDICT_STREAM_BATCH_SIZE} a medida que llegan
+    - Cada línea de respuesta lleva `index` (posición del registro, sin contar líneas vacías) y el
+      resultado de /api/predict/batch o un `error`
+    - La memoria no depende del número de líneas; si el cliente lee despacio, se deja de leer
+      el cuerpo hasta que consume los resultados
+    - Una línea de más de {PREDICT_STREAM_MAX_LINE_BYTES} bytes interrumpe el stream con un error
+    """,
+    response_class=NDJSONStreamingResponse,
+    response_description="Un resultado JSON por línea",
+    openapi_extra={"requestBody": {"required": True, "content": {"application/x-ndjson": {
+        "schema": {"type": "string", "description": "Un PredictionRequest JSON por línea"},
+    }}}},
+)
+async def predict_stream(request: Request):
+    # Sin modelo se responde 500 antes de empezar el stream
+    ensure_model_loaded()
+    return NDJSONStreamingResponse(_stream_predictions(request))
+
+
+@router.get("/predict/cache/stats",
+    summary="Estadísticas de la caché de predicciones",
+    description="Retorna tamaño, aciertos, fallos, expulsiones e invalidaciones de la caché de resultados"
+)
+async def prediction_cache_stats():
+    return get_prediction_cache_stats()
+
+
+@router.get("/predict/sink/stats",
+    summary="Estado del registro diferido de predicciones",
+    description="Retorna la profundidad de la cola, filas escritas o enviadas al spool y la latencia de escritura por lote"
+)
+async def prediction_sink_stats():
+    return get_prediction_sink_stats()
+
+
+@router.get("/predict/client-index/stats",
+    summary="Estado del índice de clientes en memoria",
+    description="Retorna tamaño, búsquedas, aciertos y marca (created_at, id) de la última actualización del índice"
+)
+async def client_index_stats():
+    return get_client_index_stats()
+
+
+@router.get("/predict/model",
+    summary="Bundle del modelo cargado",
+    description="Retorna la versión y métricas del bundle del modelo, el evaluador en uso y el tiempo de carga y la memoria (RSS) de este worker"
+)
+async def model_info():
+    return get_model_info()
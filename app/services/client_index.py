@@ -0,0 +1,181 @@
+# =============================================
+# 📁 Archivo: /app/services/client_index.py
+# =============================================
+"""
+Índice en memoria para vincular predicciones con clientes.
+
+find_client_by_features consulta `clients` en cada predicción. ClientIndex
+guarda en un dict el último cliente de cada combinación
+(age, job, marital, education), de modo que la vinculación es una búsqueda en
+memoria sin ir a la base de datos.
+
+- Carga completa al arrancar la API (una fila por combinación, con DISTINCT ON)
+- Actualización incremental cada CLIENT_INDEX_REFRESH_INTERVAL segundos: solo
+  se leen los clientes posteriores a la marca (created_at, id) de la última
+  lectura. La marca se retrasa CLIENT_INDEX_REFRESH_OVERLAP segundos para no
+  perder filas cuya transacción confirmó después de la lectura anterior;
+  releer una fila no cambia el resultado
+- Mientras el índice no está cargado (BD caída al arrancar), el controlador
+  usa la consulta SQL (apoyada en idx_clients_linkage del schema)
+
+"Último" significa mayor (created_at, id), igual que el ORDER BY de
+find_client_by_features. Borrados y cambios de clientes existentes no se
+reflejan hasta la siguiente carga completa (reload()).
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+from app.models.db_model import fetch_latest_clients, fetch_clients_since
+
+log = logging.getLogger(__name__)
+
+# created_at NULL ordena antes que cualquier fecha (NULLS LAST en orden descendente)
+_NO_DATE = datetime.min
+
+
+def client_key(record: dict) -> tuple:
+    """Clave de vinculación de un registro ya normalizado."""
+    return (record.get("age"), record.get("job"), record.get("marital"), record.get("education"))
+
+
+class ClientIndex:
+    """Dict (age, job, marital, education) -> (created_at, id) del último cliente, seguro entre hilos."""
+
+    def __init__(self, refresh_interval: float = 30.0, overlap_seconds: float = 5.0,
+                 load_all=fetch_latest_clients, load_since=fetch_clients_since):
+        self.refresh_interval = refresh_interval
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self._load_all = load_all
+        self._load_since = load_since
+        self._entries = {}
+        self._watermark = None          # mayor (created_at, id) leído
+        self._ready = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self.lookups = 0
+        self.hits = 0
+        self.full_loads = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.rows_applied = 0
+        self.last_refresh_at = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _apply(self, rows) -> int:
+        # Debe llamarse con el lock tomado. Conserva el mayor (created_at, id) por clave.
+        changed = 0
+        entries = self._entries
+        for client_id, age, job, marital, education, created_at in rows:
+            stamp = (created_at or _NO_DATE, client_id)
+            key = (age, job, marital, education)
+            current = entries.get(key)
+            if current is None or stamp > current:
+                entries[key] = stamp
+                changed += 1
+            if self._watermark is None or stamp > self._watermark:
+                self._watermark = stamp
+        return changed
+
+    def reload(self):
+        """Carga completa: reemplaza el contenido del índice."""
+        rows = self._load_all()
+        with self._refresh_lock, self._lock:
+            self._entries = {}
+            self._watermark = None
+            self._apply(rows)
+            self._ready = True
+            self.full_loads += 1
+            self.last_refresh_at = datetime.now()
+        log.info("Índice de clientes cargado", extra={"fields": {"entries": len(self._entries)}})
+
+    def refresh(self) -> int:
+        """Lee los clientes nuevos desde la marca; si no hay carga previa, hace una completa."""
+        if not self._ready:
+            self.reload()
+            return len(self._entries)
+        with self._refresh_lock:
+            created_at, client_id = self._watermark or (_NO_DATE, 0)
+            since = created_at - self.overlap if created_at > _NO_DATE + self.overlap else _NO_DATE
+            rows = self._load_since(since, 0 if since < created_at else client_id)
+            with self._lock:
+                changed = self._apply(rows)
+                self.refreshes += 1
+                self.rows_applied += changed
+                self.last_refresh_at = datetime.now()
+        return changed
+
+    def lookup(self, record: dict):
+        """Id del último cliente con las mismas características, o None."""
+        stamp = self._entries.get(client_key(record))
+        with self._lock:
+            self.lookups += 1
+            self.hits += stamp is not None
+        return stamp[1] if stamp else None
+
+    # -- actualización en segundo plano --------------------------------------
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                with self._lock:
+                    self.refresh_errors += 1
+                log.warning("No se pudo actualizar el índice de clientes: %s", e,
+                            extra={"fields": {"error_type": type(e).__name__}})
+
+    def start(self):
+        """Carga el índice (si la BD responde) y arranca la actualización periódica."""
+        try:
+            self.reload()
+        except Exception as e:
+            with self._lock:
+                self.refresh_errors += 1
+            log.warning("Índice de clientes no disponible, se usará la consulta SQL: %s", e,
+                        extra={"fields": {"error_type": type(e).__name__}})
+        with self._lock:
+            if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="client-index", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and self._thread_pid == os.getpid():
+            thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._lock:
+            watermark = self._watermark
+            return {
+                "ready": self._ready,
+                "size": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "full_loads": self.full_loads,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "rows_applied": self.rows_applied,
+                "refresh_interval": self.refresh_interval,
+                "watermark": {
+                    "created_at": watermark[0].isoformat() if watermark and watermark[0] > _NO_DATE else None,
+                    "id": watermark[1] if watermark else None,
+                },
+                "last_refresh_at": self.last_refresh_at.isoformat() if self.last_refresh_at else None,
+            }
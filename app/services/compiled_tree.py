@@ -0,0 +1,121 @@
+# =============================================
+# 📁 Archivo: /app/services/compiled_tree.py
+# =============================================
+"""
+Evaluador compilado para el DecisionTreeClassifier entrenado.
+
+sklearn valida la entrada, la convierte a float32 y reserva arrays en cada
+llamada a predict/predict_proba, lo que cuesta mucho más que recorrer un árbol
+de profundidad 5. CompiledTree copia los arrays de `model.tree_` a listas planas
+de Python y obtiene la clase y la probabilidad positiva en un único recorrido.
+
+La semántica es la misma que la de sklearn:
+- en cada nodo se va a la izquierda si x[feature] <= threshold, comparando el
+  valor redondeado a float32 (sklearn convierte X a float32 antes de recorrer)
+- la probabilidad es la distribución normalizada de clases de la hoja
+- la clase es classes_[argmax(probabilidades)]
+"""
+
+import numpy as np
+
+# Valor que sklearn usa en children_left/right para marcar una hoja
+TREE_LEAF = -1
+
+
+class CompiledTree:
+    """Árbol de decisión en arrays planos, listo para inferencia fila a fila o por lotes."""
+
+    def __init__(self, children_left, children_right, feature, threshold, value, classes, positive_class=1):
+        value = np.asarray(value, dtype=np.float64)
+        if value.ndim == 3:
+            value = value[:, 0, :]  # (n_nodes, n_outputs, n_classes) -> una salida
+        totals = value.sum(axis=1, keepdims=True)
+        proba = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+
+        classes = np.asarray(classes)
+        positive_idx = int(np.flatnonzero(classes == positive_class)[0]) if positive_class in classes else len(classes) - 1
+
+        # Arrays NumPy para la ruta vectorizada
+        self.children_left = np.asarray(children_left, dtype=np.int64)
+        self.children_right = np.asarray(children_right, dtype=np.int64)
+        self.feature = np.asarray(feature, dtype=np.int64)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.leaf_class = classes.take(np.argmax(proba, axis=1))
+        self.leaf_proba = proba[:, positive_idx]
+        self.classes = classes
+
+        # Variante para apply(): las hojas se apuntan a sí mismas y usan la columna 0
+        nodes = np.arange(len(self.children_left))
+        is_leaf = self.children_left == TREE_LEAF
+        self._left_loop = np.where(is_leaf, nodes, self.children_left)
+        self._right_loop = np.where(is_leaf, nodes, self.children_right)
+        self._feature_safe = np.where(is_leaf, 0, self.feature)
+        self._depth = self._max_depth(is_leaf)
+
+        # Listas de Python para la ruta de una sola fila (indexar listas es más
+        # rápido que indexar arrays NumPy elemento a elemento)
+        self._left = self.children_left.tolist()
+        self._right = self.children_right.tolist()
+        self._feature = self.feature.tolist()
+        self._threshold = self.threshold.tolist()
+        self._leaf_class = [int(c) for c in self.leaf_class]
+        self._leaf_proba = self.leaf_proba.tolist()
+
+    def _max_depth(self, is_leaf) -> int:
+        depth, frontier = 0, [0]
+        while frontier:
+            frontier = [c for n in frontier if not is_leaf[n] for c in (self.children_left[n], self.children_right[n])]
+            depth += 1 if frontier else 0
+        return depth
+
+    @classmethod
+    def from_sklearn(cls, model, positive_class=1):
+        """Compila un DecisionTreeClassifier ya entrenado."""
+        tree = model.tree_
+        return cls(
+            tree.children_left,
+            tree.children_right,
+            tree.feature,
+            tree.threshold,
+            tree.value,
+            model.classes_,
+            positive_class,
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self._left)
+
+    def predict_one(self, row) -> tuple:
+        """
+        Retorna (clase, probabilidad de la clase positiva) para una fila.
+        'row' es una secuencia o array 1-D con las características en el orden del modelo.
+        """
+        x = np.asarray(row, dtype=np.float32).tolist()
+        left, right, feature, threshold = self._left, self._right, self._feature, self._threshold
+        node = 0
+        while left[node] != TREE_LEAF:
+            if x[feature[node]] <= threshold[node]:
+                node = left[node]
+            else:
+                node = right[node]
+        return self._leaf_class[node], self._leaf_proba[node]
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Índice de la hoja para cada fila de X.
+        Todas las filas avanzan un nivel por iteración; en las hojas ambos hijos
+        apuntan a la propia hoja, así que basta con iterar 'depth' veces sin máscaras.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])
+        node = np.zeros(X.shape[0], dtype=np.int64)
+        for _ in range(self._depth):
+            go_left = X[rows, self._feature_safe[node]] <= self.threshold[node]
+            node = np.where(go_left, self._left_loop[node], self._right_loop[node])
+        return node
+
+    def predict_many(self, X) -> tuple:
+        """Retorna (clases, probabilidades positivas) como arrays para una matriz X."""
+        leaves = self.apply(X)
+        return self.leaf_class[leaves], self.leaf_proba[leaves]
@@ -14,7 +14,6 @@ para asegurar consistencia entre entrenamiento y predicción.
 import pandas as pd
 import pickle
 import os
-from sklearn.preprocessing import LabelEncoder
 
 # Valores por defecto para campos faltantes
 DEFAULT_VALUES = {
@@ -76,6 +75,10 @@ def encode_categorical(df: pd.DataFrame):
       - label_encoders: dict de LabelEncoder por columna
       - default_values: dict con el valor codificado más frecuente por columna (usado en inferencia para valores desconocidos)
     """
+    # Import diferido: la API solo necesita DEFAULT_VALUES de este módulo y así
+    # no carga sklearn al arrancar (el modelo se evalúa con CompiledTree)
+    from sklearn.preprocessing import LabelEncoder
+
     df = df.copy()
     label_encoders = {}
     default_values = {}
@@ -0,0 +1,88 @@
+# =============================================
+# 📁 Archivo: /app/services/executors.py
+# =============================================
+"""
+Ejecutores acotados para sacar el trabajo síncrono del event loop.
+
+Los handlers de FastAPI son `async def`, pero el controlador de predicción
+(numpy/sklearn) y el acceso a base de datos (psycopg2, pd.read_sql) son
+bloqueantes. Ejecutarlos directamente en el handler detiene el event loop y,
+con él, todas las solicitudes del worker.
+
+- run_cpu: inferencia y trabajo de CPU, en un pool pequeño (API_CPU_WORKERS)
+- run_io: consultas a base de datos, en un pool más grande (API_IO_WORKERS)
+
+Cada pool limita además cuántas tareas pueden esperar en cola
+(API_EXECUTOR_QUEUE); por encima de ese límite los handlers esperan su turno
+en el event loop en lugar de acumular trabajo ilimitado en el pool.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import API_CPU_WORKERS, API_IO_WORKERS, API_EXECUTOR_QUEUE
+
+
+class BoundedExecutor:
+    """ThreadPoolExecutor con un máximo de tareas en vuelo (ejecutando + en cola)."""
+
+    def __init__(self, max_workers: int, max_pending: int, name: str):
+        self.max_workers = max_workers
+        self.max_in_flight = max_workers + max_pending
+        self.name = name
+        self._pool = None
+        self._lock = threading.Lock()
+        # Un semáforo por event loop (asyncio.Semaphore queda ligado a su loop)
+        self._slots = weakref.WeakKeyDictionary()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            return self._pool
+
+    def _semaphore(self, loop) -> asyncio.Semaphore:
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.max_in_flight)
+        return slots
+
+    async def run(self, func, *args, **kwargs):
+        """Ejecuta func(*args, **kwargs) en el pool y espera su resultado sin bloquear el loop."""
+        loop = asyncio.get_running_loop()
+        # Copiar el contexto (request_id de los logs) al hilo del pool, como asyncio.to_thread
+        context = contextvars.copy_context()
+        async with self._semaphore(loop):
+            return await loop.run_in_executor(
+                self._get_pool(), functools.partial(context.run, func, *args, **kwargs)
+            )
+
+    def shutdown(self, wait: bool = True):
+        """Cierra el pool actual; si se vuelve a usar, se crea uno nuevo."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+CPU_EXECUTOR = BoundedExecutor(API_CPU_WORKERS, API_EXECUTOR_QUEUE, "cpu")
+IO_EXECUTOR = BoundedExecutor(API_IO_WORKERS, API_EXECUTOR_QUEUE, "io")
+
+
+async def run_cpu(func, *args, **kwargs):
+    """Ejecuta trabajo de CPU (inferencia) fuera del event loop."""
+    return await CPU_EXECUTOR.run(func, *args, **kwargs)
+
+
+async def run_io(func, *args, **kwargs):
+    """Ejecuta acceso bloqueante a base de datos fuera del event loop."""
+    return await IO_EXECUTOR.run(func, *args, **kwargs)
+
+
+def shutdown_executors(wait: bool = True):
+    CPU_EXECUTOR.shutdown(wait=wait)
+    IO_EXECUTOR.shutdown(wait=wait)
@@ -0,0 +1,123 @@
+# =============================================
+# 📁 Archivo: /app/services/feature_vector.py
+# =============================================
+"""
+Construcción de vectores de características para inferencia sin pandas.
+
+FeatureVectorBuilder se compila una sola vez a partir de los artefactos del
+entrenamiento (encoders, feature_names y DEFAULT_VALUES) y convierte cada
+registro en una fila NumPy con búsquedas en diccionarios, en el mismo orden de
+columnas que vio el modelo al entrenar.
+
+Es equivalente a la ruta anterior del controlador (DataFrame de una fila +
+LabelEncoder.transform por columna + reindex), incluida la regla de que una
+categoría desconocida se codifica como 0 (UNKNOWN_CODE).
+"""
+
+import threading
+from enum import Enum
+
+import numpy as np
+
+from app.services.data_preprocessing import DEFAULT_VALUES
+
+# Código usado para categorías que el encoder no vio en entrenamiento
+UNKNOWN_CODE = 0
+
+# Columnas que no forman parte de las características del modelo
+TARGET_COLUMN = "deposit"
+
+
+def _raw_value(value):
+    """Valor plano de un campo: los enums de los schemas se reducen a su valor."""
+    return value.value if isinstance(value, Enum) else value
+
+
+def normalize_record(data: dict) -> dict:
+    """
+    Convierte enums a strings y completa valores faltantes con DEFAULT_VALUES.
+    Paso previo a build_row / build_matrix en la API y en el scoring masivo.
+    """
+    processed_data = {}
+    for key, value in data.items():
+        processed_data[key] = str(value.value) if hasattr(value, 'value') else value
+    for col in DEFAULT_VALUES:
+        if col not in processed_data or processed_data[col] is None:
+            processed_data[col] = DEFAULT_VALUES[col]
+    return processed_data
+
+
+class FeatureVectorBuilder:
+    """
+    Codificador precompilado de registros a vectores de características.
+
+    - categorical: por columna, dict categoría -> código del LabelEncoder
+    - feature_cols: orden de columnas del modelo (sin la columna objetivo)
+    - defaults: valor usado cuando el campo falta o es None
+    """
+
+    def __init__(self, categories: dict, feature_names: list, default_values: dict = None):
+        default_values = DEFAULT_VALUES if default_values is None else default_values
+        self.feature_cols = [col for col in feature_names if col != TARGET_COLUMN]
+        self.categorical = {
+            col: {str(c): code for code, c in enumerate(classes)}
+            for col, classes in categories.items()
+            if col in self.feature_cols
+        }
+        # (columna, mapping o None si es numérica, valor por defecto) en el orden del modelo
+        self._slots = [
+            (col, self.categorical.get(col), default_values.get(col, 0))
+            for col in self.feature_cols
+        ]
+        self._local = threading.local()
+
+    @classmethod
+    def from_encoders(cls, label_encoders: dict, feature_names: list, default_values: dict = None):
+        """Crea el builder a partir de los LabelEncoder entrenados (encoders.pkl)."""
+        categories = {col: list(le.classes_) for col, le in label_encoders.items()}
+        return cls(categories, feature_names, default_values)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_cols)
+
+    def _encode(self, data: dict, out: np.ndarray, unknown: list = None):
+        for j, (col, mapping, default) in enumerate(self._slots):
+            value = data.get(col)
+            if value is None:
+                value = default
+            value = _raw_value(value)
+            if mapping is None:
+                out[j] = value
+            else:
+                code = mapping.get(str(value))
+                if code is None:
+                    code = UNKNOWN_CODE
+                    if unknown is not None:
+                        unknown.append(col)
+                out[j] = code
+
+    def build_row(self, data: dict, unknown: list = None) -> np.ndarray:
+        """
+        Codifica un registro en una matriz (1, n_features).
+
+        La fila se escribe en un buffer preasignado por hilo, de modo que el
+        resultado solo es válido hasta la siguiente llamada en el mismo hilo.
+        Si se pasa 'unknown', se le agregan las columnas con categorías desconocidas.
+        """
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.empty((1, self.n_features), dtype=np.float64)
+        self._encode(data, row[0], unknown)
+        return row
+
+    def build_matrix(self, records: list) -> np.ndarray:
+        """Codifica una lista de registros en una matriz nueva (len(records), n_features)."""
+        X = np.empty((len(records), self.n_features), dtype=np.float64)
+        for j, (col, mapping, default) in enumerate(self._slots):
+            values = [_raw_value(default if r.get(col) is None else r.get(col)) for r in records]
+            if mapping is None:
+                X[:, j] = values
+            else:
+                X[:, j] = [mapping.get(str(v), UNKNOWN_CODE) for v in values]
+        return X
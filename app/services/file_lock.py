@@ -0,0 +1,36 @@
+# =============================================
+# 📁 Archivo: /app/services/file_lock.py
+# =============================================
+"""
+Bloqueo exclusivo entre procesos con flock sobre un fichero auxiliar.
+
+Lo usan el spool del registro diferido de predicciones y la caché de los
+callbacks del dashboard. El fichero del lock no se borra mientras pueda
+usarse: otro proceso que lo abriera después tomaría un inodo nuevo y el
+bloqueo dejaría de ser exclusivo.
+"""
+
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos (un solo proceso por fichero)
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """flock exclusivo sobre 'path'. Sin bloqueo, cede False si otro proceso lo tiene."""
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,272 @@
+# =============================================
+# 📁 Archivo: /app/services/metrics.py
+# =============================================
+"""
+Métricas de la API en formato de texto de Prometheus (GET /metrics).
+
+- Counter: contadores monótonos (solicitudes, errores por tipo)
+- Histogram: latencias en buckets fijos; observe() solo busca el bucket con
+  bisect y suma bajo un lock, ~1 µs por observación
+- callback(): valores leídos al momento del scrape de los stats() que ya
+  exponen la caché, el sink y el índice de clientes, sin costo en la solicitud
+
+Cada proceso tiene su propio registro: con varios workers, cada uno expone
+sus métricas y Prometheus las agrega por instancia.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from app.config import METRICS_ENABLED
+
+log = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Buckets en segundos: desde las etapas en memoria (µs) hasta consultas lentas a la BD
+LATENCY_BUCKETS = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labels, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador con etiquetas; inc() recibe los valores de las etiquetas en orden."""
+
+    kind = "counter"
+
+    def __init__(self, registry, name: str, documentation: str, labelnames=()):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        if not self._registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram, labels):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._started, *self._labels)
+        return False
+
+
+class Histogram:
+    """Histograma de buckets fijos (límite superior inclusivo, como Prometheus)."""
+
+    kind = "histogram"
+
+    def __init__(self, registry, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # etiquetas -> [conteo por bucket (+Inf al final), suma, total]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        if not self._registry.enabled:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels) -> _Timer:
+        """Context manager que observa la duración del bloque en segundos."""
+        return _Timer(self, labels)
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return series[2] if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = (("le", _format_value(float(bound))),)
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, le), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), count
+
+
+class _Callback:
+    """Métrica calculada en el scrape: 'func' retorna un número o {etiquetas: valor}."""
+
+    def __init__(self, name: str, documentation: str, kind: str, func, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._func = func
+
+    def samples(self):
+        value = self._func()
+        if value is None:
+            return
+        if not isinstance(value, dict):
+            value = {(): value}
+        for labels, sample in sorted(value.items()):
+            if sample is not None:
+                yield self.name, _format_labels(self.labelnames, labels), sample
+
+
+class MetricsRegistry:
+    """Conjunto de métricas de un proceso y su exposición en texto."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, func, kind: str = "gauge", labelnames=()):
+        """Registra (o reemplaza) una métrica leída al momento del scrape."""
+        metric = _Callback(name, documentation, kind, func, labelnames)
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                log.warning("No se pudo leer la métrica %s: %s", metric.name, e,
+                            extra={"fields": {"error_type": type(e).__name__}})
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: cuenta las solicitudes HTTP por ruta, método y código de
+    estado y mide su duración. Usa la plantilla de la ruta (/api/predict), no
+    la URL, para que las etiquetas no crezcan sin límite.
+    """
+
+    def __init__(self, app, requests: Counter, latency: Histogram):
+        self.app = app
+        self.requests = requests
+        self.latency = latency
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            self.requests.inc(scope["method"], path, str(status[0]))
+            self.latency.observe(time.perf_counter() - started, path)
+
+
+# Registro del proceso y métricas de la API
+REGISTRY = MetricsRegistry(METRICS_ENABLED)
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "bank_http_requests_total", "Solicitudes HTTP por método, ruta y código de estado",
+    ("method", "route", "status"),
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "bank_http_request_duration_seconds", "Duración de las solicitudes HTTP por ruta", ("route",),
+)
+PREDICT_STAGE_SECONDS = REGISTRY.histogram(
+    "bank_predict_stage_seconds",
+    "Duración de cada etapa de la predicción (normalize, cache_lookup, encode, predict, "
+    "predict_proba, link_client, save, total)",
+    ("stage", "path"),
+)
+PREDICT_REQUESTS = REGISTRY.counter(
+    "bank_predict_requests_total", "Predicciones por ruta (single/batch) y resultado (ok/cached/error)",
+    ("path", "outcome"),
+)
+PREDICT_ERRORS = REGISTRY.counter(
+    "bank_predict_errors_total",
+    "Fallos en la ruta de predicción por tipo (unknown_category, invalid_input, db_link, db_save, "
+    "model_not_loaded)",
+    ("type",),
+)
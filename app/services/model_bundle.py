@@ -0,0 +1,244 @@
+# =============================================
+# 📁 Archivo: /app/services/model_bundle.py
+# =============================================
+"""
+Paquete único y versionado con todos los artefactos del modelo.
+
+Antes el entrenamiento dejaba cuatro .pkl (modelo, encoders, nombres de
+columnas y default_values) que la API leía por separado y que podían quedar
+desincronizados. train_model.py escribe ahora un solo fichero:
+
+    cabecera | manifiesto JSON | arrays del árbol (alineados a 64 bytes)
+
+- cabecera: BUNDLE_MAGIC, versión de formato y longitud del manifiesto
+- manifiesto: versión del bundle, columnas, categorías de cada encoder,
+  DEFAULT_VALUES, clases, métricas del entrenamiento, ubicación y dtype de
+  cada array y el checksum SHA-256 del manifiesto + arrays
+- arrays: children_left, children_right, feature, threshold y value del
+  árbol, más el DecisionTreeClassifier serializado (solo se deserializa si
+  se desactiva el evaluador compilado)
+
+load_bundle() abre el fichero con mmap de solo lectura: los arrays son vistas
+sobre el mapeo, no copias, así que todos los workers que cargan el mismo
+bundle comparten esas páginas a través de la caché de páginas del sistema.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from app.services.compiled_tree import CompiledTree
+from app.services.data_preprocessing import DEFAULT_VALUES
+from app.services.feature_vector import FeatureVectorBuilder, TARGET_COLUMN
+
+BUNDLE_MAGIC = b"BMBUNDLE"
+BUNDLE_FORMAT = 1
+
+# magic (8 bytes) | formato (uint32) | longitud del manifiesto (uint64)
+_HEADER = struct.Struct("<8sIQ")
+_ALIGN = 64
+
+# Array con el DecisionTreeClassifier serializado con pickle
+SKLEARN_BLOB = "sklearn_model"
+
+
+class BundleError(Exception):
+    """El fichero no es un bundle válido (formato desconocido o checksum incorrecto)."""
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _canonical(manifest: dict) -> bytes:
+    return json.dumps(manifest, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _checksum(manifest: dict, payload) -> str:
+    # Cubre el manifiesto (sin el propio checksum) y todos los arrays
+    unsigned = {k: v for k, v in manifest.items() if k != "checksum"}
+    digest = hashlib.sha256(_canonical(unsigned))
+    digest.update(payload)
+    return digest.hexdigest()
+
+
+def _tree_arrays(model) -> dict:
+    tree = model.tree_
+    value = np.asarray(tree.value, dtype="<f8")
+    if value.ndim == 3:
+        value = value[:, 0, :]
+    return {
+        "children_left": np.ascontiguousarray(tree.children_left, dtype="<i8"),
+        "children_right": np.ascontiguousarray(tree.children_right, dtype="<i8"),
+        "feature": np.ascontiguousarray(tree.feature, dtype="<i8"),
+        "threshold": np.ascontiguousarray(tree.threshold, dtype="<f8"),
+        "value": np.ascontiguousarray(value),
+        SKLEARN_BLOB: np.frombuffer(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL), dtype="u1"),
+    }
+
+
+def save_bundle(path: str, model, label_encoders: dict, feature_names: list, default_values: dict = None,
+                metrics: dict = None, training: dict = None) -> dict:
+    """
+    Escribe el bundle de un DecisionTreeClassifier entrenado y retorna su manifiesto.
+    La escritura es atómica: se escribe un temporal y se renombra.
+    """
+    arrays = _tree_arrays(model)
+    specs, chunks, offset = {}, [], 0
+    for name, array in arrays.items():
+        data = array.tobytes()
+        padding = _aligned(len(data)) - len(data)
+        specs[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        chunks.append(data + b"\0" * padding)
+        offset += len(data) + padding
+    payload = b"".join(chunks)
+
+    created_at = datetime.now()
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "model_type": type(model).__name__,
+        "params": {k: v for k, v in model.get_params().items() if isinstance(v, (int, float, str, bool, type(None)))},
+        "classes": [c.item() if hasattr(c, "item") else c for c in model.classes_],
+        "positive_class": 1,
+        "feature_names": [c for c in feature_names if c != TARGET_COLUMN],
+        "categories": {col: [str(c) for c in le.classes_] for col, le in label_encoders.items()},
+        "default_values": dict(DEFAULT_VALUES if default_values is None else default_values),
+        "metrics": metrics or {},
+        "training": training or {},
+        "environment": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "sklearn": _sklearn_version(),
+        },
+        "arrays": specs,
+    }
+    digest = _checksum(manifest, payload)
+    manifest["version"] = f"{created_at:%Y%m%d-%H%M%S}-{digest[:8]}"
+    manifest["checksum"] = {"algorithm": "sha256", "value": _checksum(manifest, payload)}
+
+    header_bytes = _canonical(manifest)
+    head = _HEADER.pack(BUNDLE_MAGIC, BUNDLE_FORMAT, len(header_bytes)) + header_bytes
+    head += b"\0" * (_aligned(len(head)) - len(head))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(head)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def _sklearn_version():
+    try:
+        import sklearn
+        return sklearn.__version__
+    except ImportError:
+        return None
+
+
+class ModelBundle:
+    """Bundle cargado: manifiesto + arrays mapeados en memoria."""
+
+    def __init__(self, manifest: dict, arrays: dict, path: str = None, size_bytes: int = 0, load_ms: float = None):
+        self.manifest = manifest
+        self.arrays = arrays
+        self.path = path
+        self.size_bytes = size_bytes
+        self.load_ms = load_ms
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    @property
+    def feature_names(self) -> list:
+        return self.manifest["feature_names"]
+
+    def feature_builder(self) -> FeatureVectorBuilder:
+        return FeatureVectorBuilder(self.manifest["categories"], self.feature_names, self.manifest["default_values"])
+
+    def compiled_tree(self) -> CompiledTree:
+        a = self.arrays
+        return CompiledTree(
+            a["children_left"], a["children_right"], a["feature"], a["threshold"], a["value"],
+            np.asarray(self.manifest["classes"]), self.manifest["positive_class"],
+        )
+
+    def sklearn_model(self):
+        """Deserializa el DecisionTreeClassifier original (solo para la ruta sin compilar)."""
+        return pickle.loads(self.arrays[SKLEARN_BLOB].tobytes())
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "size_bytes": self.size_bytes,
+            "created_at": self.manifest["created_at"],
+            "model_type": self.manifest["model_type"],
+            "n_features": len(self.feature_names),
+            "metrics": self.manifest["metrics"],
+            "load_ms": round(self.load_ms, 3) if self.load_ms is not None else None,
+        }
+
+
+def load_bundle(path: str, verify: bool = True) -> ModelBundle:
+    """
+    Abre el bundle con mmap de solo lectura. Con 'verify' se recalcula el
+    checksum antes de usarlo (BundleError si no coincide).
+    """
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _HEADER.size:
+            raise BundleError(f"{path}: fichero demasiado corto")
+        # El mapeo sigue vivo aunque se cierre el descriptor
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, fmt, manifest_len = _HEADER.unpack_from(mapped, 0)
+    if magic != BUNDLE_MAGIC:
+        raise BundleError(f"{path}: no es un bundle de modelo")
+    if fmt != BUNDLE_FORMAT:
+        raise BundleError(f"{path}: formato {fmt} no soportado (se espera {BUNDLE_FORMAT})")
+    try:
+        manifest = json.loads(mapped[_HEADER.size:_HEADER.size + manifest_len].decode("utf-8"))
+    except ValueError as e:
+        raise BundleError(f"{path}: manifiesto ilegible ({e})")
+    payload_start = _aligned(_HEADER.size + manifest_len)
+
+    view = memoryview(mapped)
+    if verify and _checksum(manifest, view[payload_start:]) != manifest.get("checksum", {}).get("value"):
+        raise BundleError(f"{path}: checksum incorrecto, el bundle está corrupto o incompleto")
+
+    arrays = {}
+    for name, spec in manifest["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        array = np.frombuffer(view, dtype=dtype, count=count, offset=payload_start + spec["offset"])
+        arrays[name] = array.reshape(spec["shape"])
+    return ModelBundle(manifest, arrays, path, size, (time.perf_counter() - started) * 1000)
+
+
+def rss_mb() -> float:
+    """Memoria residente actual del proceso en MB (pico si no hay /proc)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
@@ -0,0 +1,209 @@
+# =============================================
+# 📁 Archivo: /app/services/model_registry.py
+# =============================================
+"""
+Registro del modelo en uso, con recarga en caliente.
+
+El modelo activo es un LoadedModel inmutable (bundle + codificador +
+evaluador). Cada solicitud lee `registry.current` una sola vez y usa ese
+objeto de principio a fin, así que nunca mezcla el codificador de una versión
+con el árbol de otra.
+
+reload() carga el bundle nuevo y lo calienta (una predicción de prueba, que
+además trae a memoria las páginas mapeadas) fuera de la ruta de las
+solicitudes, y solo entonces reemplaza la referencia. Reasignar un atributo es
+atómico en CPython, por lo que leer el modelo activo no toma ningún lock; el
+lock solo serializa recargas concurrentes. Si el bundle nuevo no carga o no
+pasa el calentamiento, sigue activo el anterior.
+
+La recarga se dispara desde POST /api/admin/model/reload o, con
+MODEL_WATCH_INTERVAL > 0, cuando cambia el fichero del bundle. train_model.py
+lo reemplaza con os.replace, de modo que los mapeos del bundle anterior siguen
+siendo válidos mientras haya solicitudes usándolo.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from app.services.data_preprocessing import DEFAULT_VALUES
+from app.services.model_bundle import load_bundle
+
+log = logging.getLogger(__name__)
+
+
+class LoadedModel:
+    """Versión del modelo lista para inferencia. No se modifica una vez creada."""
+
+    __slots__ = ("version", "feature_builder", "compiled_model", "model", "bundle", "loaded_at", "load_ms")
+
+    def __init__(self, version, feature_builder, compiled_model=None, model=None, bundle=None, load_ms=None):
+        self.version = version
+        self.feature_builder = feature_builder
+        self.compiled_model = compiled_model
+        self.model = model
+        self.bundle = bundle
+        self.loaded_at = datetime.now()
+        self.load_ms = load_ms
+
+    @classmethod
+    def from_bundle(cls, bundle, use_compiled: bool = True):
+        compiled_model = bundle.compiled_tree() if use_compiled else None
+        # El DecisionTreeClassifier solo se deserializa si no se usa el evaluador compilado
+        model = bundle.sklearn_model() if compiled_model is None else None
+        return cls(bundle.version, bundle.feature_builder(), compiled_model, model, bundle, bundle.load_ms)
+
+    @property
+    def evaluator(self) -> str:
+        return "compiled" if self.compiled_model is not None else "sklearn"
+
+    def warm_up(self):
+        """Predicción de prueba con DEFAULT_VALUES por las rutas de una fila y por lotes."""
+        row = self.feature_builder.build_row(DEFAULT_VALUES)
+        X = self.feature_builder.build_matrix([DEFAULT_VALUES] * 4)
+        if self.compiled_model is not None:
+            single = self.compiled_model.predict_one(row[0])
+            batch = self.compiled_model.predict_many(X)
+        else:
+            single = (int(self.model.predict(row)[0]), float(self.model.predict_proba(row)[0][1]))
+            batch = (self.model.predict(X), self.model.predict_proba(X)[:, 1])
+        if not 0.0 <= single[1] <= 1.0 or not np.all(batch[0] == single[0]):
+            raise ValueError(f"Calentamiento inconsistente del modelo {self.version}")
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "evaluator": self.evaluator,
+            "loaded_at": self.loaded_at.isoformat(timespec="seconds"),
+            "bundle": self.bundle.info() if self.bundle else None,
+        }
+
+
+class ModelRegistry:
+    """Modelo activo + recarga en segundo plano desde MODEL_BUNDLE_PATH."""
+
+    def __init__(self, path: str, use_compiled: bool = True, watch_interval: float = 0.0, loader=load_bundle):
+        self.path = path
+        self.use_compiled = use_compiled
+        self.watch_interval = watch_interval
+        self._loader = loader
+        self._current = None
+        self._reload_lock = threading.Lock()
+        self._file_state = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self.history = deque(maxlen=20)   # recargas recientes (versión, resultado, momento)
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_error = None
+
+    @property
+    def current(self):
+        """Modelo activo (LoadedModel) o None. Lectura sin lock."""
+        return self._current
+
+    def install(self, loaded: LoadedModel):
+        """Activa un modelo ya construido (p. ej. entrenado en memoria en tests)."""
+        self._current = loaded
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def reload(self, force: bool = False) -> dict:
+        """
+        Carga el bundle, lo calienta y lo activa. Sin 'force' no hace nada si la
+        versión del fichero es la misma que la activa.
+        Retorna {"status": "loaded" | "unchanged" | "failed", ...}.
+        """
+        with self._reload_lock:
+            previous = self._current
+            state = self._stat()
+            started = time.perf_counter()
+            try:
+                bundle = self._loader(self.path)
+                if previous is not None and bundle.version == previous.version and not force:
+                    self._file_state = state
+                    return {"status": "unchanged", "version": previous.version}
+                loaded = LoadedModel.from_bundle(bundle, self.use_compiled)
+                loaded.warm_up()
+            except Exception as e:
+                self.failed_reloads += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                # No volver a intentar con el mismo fichero hasta que cambie
+                self._file_state = state
+                self.history.append({"version": None, "status": "failed", "error": self.last_error,
+                                     "at": datetime.now().isoformat(timespec="seconds")})
+                log.warning("No se pudo cargar el modelo desde %s: %s", self.path, e,
+                            extra={"fields": {"error_type": type(e).__name__}})
+                return {"status": "failed", "error": self.last_error,
+                        "version": previous.version if previous else None}
+
+            self._current = loaded   # cambio atómico: las solicitudes en curso terminan con el anterior
+            self._file_state = state
+            self.reloads += 1
+            self.last_error = None
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.history.append({"version": loaded.version, "status": "loaded", "ms": elapsed_ms,
+                                 "at": datetime.now().isoformat(timespec="seconds")})
+            log.info("Modelo activo", extra={"fields": {
+                "model_version": loaded.version, "previous_version": previous.version if previous else None,
+                "ms": elapsed_ms,
+            }})
+            return {"status": "loaded", "version": loaded.version,
+                    "previous_version": previous.version if previous else None, "ms": elapsed_ms}
+
+    def check_for_update(self) -> dict:
+        """Recarga si el fichero del bundle cambió desde la última carga."""
+        state = self._stat()
+        if state is None or state == self._file_state:
+            return None
+        return self.reload()
+
+    # -- vigilancia del fichero -------------------------------------------
+
+    def _watch(self):
+        while not self._stop.wait(self.watch_interval):
+            try:
+                self.check_for_update()
+            except Exception as e:
+                log.warning("Error vigilando el bundle del modelo: %s", e,
+                            extra={"fields": {"error_type": type(e).__name__}})
+
+    def start_watching(self):
+        if self.watch_interval <= 0:
+            return
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._thread_pid = os.getpid()
+        self._thread.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and self._thread_pid == os.getpid():
+            thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        current = self._current
+        return {
+            "path": self.path,
+            "current": current.info() if current else None,
+            "watching": self._thread is not None and self._thread.is_alive(),
+            "watch_interval": self.watch_interval,
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads,
+            "last_error": self.last_error,
+            "history": list(self.history),
+        }
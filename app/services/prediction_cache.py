@@ -0,0 +1,113 @@
+# =============================================
+# 📁 Archivo: /app/services/prediction_cache.py
+# =============================================
+"""
+Caché LRU con expiración (TTL) para resultados de predicción.
+
+La clave es la tupla canónica de las 16 características ya normalizadas
+(enums convertidos y DEFAULT_VALUES aplicados), de modo que dos solicitudes
+que describen el mismo perfil de cliente comparten entrada.
+
+Cada entrada pertenece a una versión del modelo: cuando cambia la versión de
+los artefactos cargados (modelo o encoders), la caché se vacía entera en la
+siguiente consulta.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from app.services.data_preprocessing import DEFAULT_VALUES
+
+# Orden fijo de las características en la clave
+CACHE_KEY_FIELDS = tuple(DEFAULT_VALUES)
+
+
+def cache_key(processed_data: dict) -> tuple:
+    """Tupla canónica de un registro ya normalizado con _normalize_record."""
+    return tuple(processed_data.get(col) for col in CACHE_KEY_FIELDS)
+
+
+class PredictionCache:
+    """
+    Caché acotada por tamaño (LRU) y por antigüedad (TTL), segura entre hilos.
+
+    max_size <= 0 desactiva la caché (get siempre falla y put no guarda nada).
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()  # clave -> (expira_en, valor)
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def _check_version(self, version):
+        # Debe llamarse con el lock tomado
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """Retorna el valor guardado o None; vacía la caché si 'version' cambió."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "version": self._version,
+            }
@@ -0,0 +1,329 @@
+# =============================================
+# 📁 Archivo: /app/services/prediction_sink.py
+# =============================================
+"""
+Registro diferido (write-behind) de predicciones.
+
+Las solicitudes ya no esperan al INSERT: encolan la fila de la predicción y
+responden. Un hilo en segundo plano agrupa las filas y las escribe con un
+único INSERT multi-fila cuando se juntan PREDICTION_SINK_BATCH_SIZE filas o
+pasan PREDICTION_SINK_FLUSH_INTERVAL segundos, lo que ocurra primero.
+
+Si la base de datos no responde, el lote se agrega a un fichero local de solo
+anexado (spool, una fila JSON por línea) y se reintenta cada
+PREDICTION_SINK_RETRY_INTERVAL segundos. Cuando la escritura vuelve a
+funcionar, el spool se reproduce por lotes y se borra. Las filas que quedan
+en el spool sobreviven a un reinicio del proceso. La entrega es "al menos una
+vez": si un lote falla después de llegar a la base de datos puede repetirse.
+
+Al detener la API, close() vacía la cola antes de terminar; lo que no pueda
+escribirse va al spool.
+
+Varios procesos (workers de gunicorn) pueden compartir el mismo spool: la
+escritura y la rotación se protegen con un flock sobre "<spool>.lock", y solo
+un proceso a la vez reproduce el fichero rotado ("<spool>.replay.lock").
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from app.services.file_lock import file_lock
+
+log = logging.getLogger(__name__)
+
+# Marca de fin enviada por close() al hilo escritor
+_STOP = object()
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _decode_row(row: list) -> tuple:
+    # La última columna (predicted_at) se guarda como ISO 8601
+    *values, predicted_at = row
+    return (*values, datetime.fromisoformat(predicted_at) if predicted_at else None)
+
+
+class PredictionSink:
+    """
+    Cola + hilo escritor + spool local.
+
+    'writer' recibe una lista de filas (tuplas de db_model.prediction_row) y
+    debe lanzar una excepción si no pudo guardarlas.
+    """
+
+    def __init__(self, writer, spool_path: str, batch_size: int = 500, flush_interval: float = 1.0,
+                 max_queue: int = 100000, retry_interval: float = 5.0, clock=time.monotonic):
+        self.writer = writer
+        self.spool_path = spool_path
+        self.replay_path = spool_path + ".replay"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self._clock = clock
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._max_queue = max_queue
+        self._thread = None
+        self._thread_pid = None
+        self._closed = False
+        self._lock = threading.Lock()         # arranque / cierre y contadores
+        self._spool_lock = threading.Lock()   # escritura y rotación del spool
+        self._failed_at = None                # momento del último fallo de escritura
+        self._flush_ms = deque(maxlen=1000)   # latencias recientes de escritura
+        self.enqueued = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.overflowed = 0
+
+    # -- productor ----------------------------------------------------------
+
+    def _ensure_started(self):
+        # Crea el hilo al primer uso, y de nuevo tras un fork (los hilos no se heredan)
+        if self._thread is not None and self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name="prediction-sink", daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def submit(self, row):
+        """Encola una fila sin bloquear; si la cola está llena va directo al spool."""
+        self.submit_many([row])
+
+    def submit_many(self, rows):
+        if self._closed:
+            self._spool(rows)
+            return
+        self._ensure_started()
+        overflow = []
+        for row in rows:
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                overflow.append(row)
+        with self._lock:
+            self.enqueued += len(rows) - len(overflow)
+            self.overflowed += len(overflow)
+        if overflow:
+            self._spool(overflow)
+
+    # -- hilo escritor ------------------------------------------------------
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                self._flush(batch)
+                self._done(len(batch))
+            if stop:
+                break
+            self._maybe_replay()
+        # Filas encoladas justo antes de cerrar
+        leftovers = self._drain_nowait()
+        if leftovers:
+            self._flush(leftovers)
+            self._done(len(leftovers))
+        # Último intento al cerrar, aunque no haya vencido retry_interval
+        self._maybe_replay(force=True)
+
+    def _done(self, n: int):
+        for _ in range(n):
+            self._queue.task_done()
+
+    def _next_batch(self) -> tuple:
+        """Espera hasta juntar batch_size filas o hasta que venza flush_interval."""
+        batch = []
+        deadline = self._clock() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - self._clock()
+            if remaining <= 0 and batch:
+                break
+            try:
+                item = self._queue.get(timeout=max(remaining, 0.001) if batch else self.flush_interval)
+            except queue.Empty:
+                if batch or self._spool_pending():
+                    break
+                deadline = self._clock() + self.flush_interval
+                continue
+            if item is _STOP:
+                self._queue.task_done()
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _drain_nowait(self) -> list:
+        rows = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if item is _STOP:
+                self._queue.task_done()
+            else:
+                rows.append(item)
+
+    def _db_backoff(self) -> bool:
+        """True mientras no haya pasado retry_interval desde el último fallo."""
+        return self._failed_at is not None and self._clock() - self._failed_at < self.retry_interval
+
+    def _write(self, rows) -> bool:
+        started = self._clock()
+        try:
+            self.writer(rows)
+        except Exception as e:
+            self._failed_at = self._clock()
+            with self._lock:
+                self.failed_flushes += 1
+            log.warning("No se pudieron guardar las predicciones, se envían al spool: %s", e,
+                        extra={"fields": {"error_type": type(e).__name__, "rows": len(rows)}})
+            return False
+        self._failed_at = None
+        elapsed_ms = (self._clock() - started) * 1000
+        with self._lock:
+            self.flushes += 1
+            self.written += len(rows)
+            self._flush_ms.append(elapsed_ms)
+        return True
+
+    def _flush(self, batch):
+        if self._db_backoff() or not self._write(batch):
+            self._spool(batch)
+
+    # -- spool --------------------------------------------------------------
+
+    def _spool(self, rows):
+        directory = os.path.dirname(self.spool_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        lines = "".join(json.dumps(list(row), default=_encode_value) + "\n" for row in rows)
+        with self._spool_lock, file_lock(self.spool_path + ".lock"):
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        with self._lock:
+            self.spooled += len(rows)
+
+    def _spool_pending(self) -> bool:
+        return os.path.exists(self.replay_path) or os.path.exists(self.spool_path)
+
+    def _read_replay(self) -> list:
+        rows = []
+        with open(self.replay_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(_decode_row(json.loads(line)))
+                except (ValueError, TypeError):
+                    # Línea truncada por una caída a mitad de escritura
+                    log.warning("Línea inválida en el spool de predicciones, se descarta",
+                                extra={"fields": {"spool": self.replay_path}})
+        return rows
+
+    def _maybe_replay(self, force: bool = False):
+        """Reescribe en la base de datos las filas del spool, si las hay y la BD responde."""
+        if (self._db_backoff() and not force) or not self._spool_pending():
+            return
+        with file_lock(self.replay_path + ".lock", blocking=False) as acquired:
+            # Si no se obtiene, otro proceso ya está reproduciendo el spool
+            if acquired:
+                self._replay()
+
+    def _replay(self):
+        with self._spool_lock, file_lock(self.spool_path + ".lock"):
+            # Rotar el spool: las filas nuevas siguen llegando al fichero principal
+            if not os.path.exists(self.replay_path) and os.path.exists(self.spool_path):
+                os.replace(self.spool_path, self.replay_path)
+        if not os.path.exists(self.replay_path):
+            return
+
+        rows = self._read_replay()
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start:start + self.batch_size]
+            if not self._write(chunk):
+                # Conservar solo lo que falta por escribir
+                tmp_path = self.replay_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for row in rows[start:]:
+                        f.write(json.dumps(list(row), default=_encode_value) + "\n")
+                os.replace(tmp_path, self.replay_path)
+                return
+            with self._lock:
+                self.replayed += len(chunk)
+        os.remove(self.replay_path)
+        if rows:
+            log.info("Predicciones recuperadas del spool", extra={"fields": {"rows": len(rows)}})
+
+    # -- ciclo de vida ------------------------------------------------------
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Espera a que todas las filas encoladas se hayan escrito o enviado al spool."""
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 30.0):
+        """
+        Vacía la cola y detiene el hilo escritor. Mientras cierra, las filas
+        nuevas van al spool; si el sink se vuelve a usar, arranca otro hilo.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread if self._thread_pid == os.getpid() else None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        # Si el hilo no terminó a tiempo (o nunca arrancó), lo pendiente va al spool
+        leftovers = self._drain_nowait()
+        if leftovers:
+            self._spool(leftovers)
+            self._done(len(leftovers))
+        if thread is None or not thread.is_alive():
+            with self._lock:
+                self._thread = None
+                self._closed = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._flush_ms)
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "queue_depth": self._queue.qsize(),
+                "max_queue": self._max_queue,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "spooled": self.spooled,
+                "replayed": self.replayed,
+                "overflowed": self.overflowed,
+                "spool_bytes": sum(
+                    os.path.getsize(p) for p in (self.spool_path, self.replay_path) if os.path.exists(p)
+                ),
+                "flush_latency_ms": {
+                    "last": round(self._flush_ms[-1], 3) if latencies else None,
+                    "avg": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                    "p95": round(latencies[int(0.95 * (len(latencies) - 1))], 3) if latencies else None,
+                    "max": round(latencies[-1], 3) if latencies else None,
+                },
+            }
@@ -0,0 +1,224 @@
+# =============================================
+# 📁 Archivo: /app/services/score_batch.py
+# =============================================
+"""
+Scoring masivo de ficheros de campaña sin pasar por HTTP.
+
+    python -m app.services.score_batch campaña.csv --output scores.csv
+    python -m app.services.score_batch campaña.parquet --output scores.parquet --workers 8
+    python -m app.services.score_batch campaña.csv --output scores.csv --link-clients --save
+
+- Lee la entrada (CSV o Parquet, con las columnas de bank.csv) por bloques de
+  --chunk-rows filas; la memoria no depende del tamaño del fichero
+- Cada bloque pasa por el mismo preprocesamiento que la API
+  (normalize_record + FeatureVectorBuilder.build_matrix) y se predice en un
+  pool de --workers procesos. Cada proceso abre el bundle del modelo (mmap)
+  una vez al arrancar. Hay como máximo 2 bloques por proceso en vuelo
+- La salida conserva las columnas de entrada y agrega prediction,
+  probability y model_version (y linked_client_id con --link-clients), en el
+  mismo orden que la entrada
+- --link-clients: vincula con 'clients' con una consulta por bloque
+  (find_clients_by_features)
+- --save: guarda las predicciones en 'predictions' con un COPY por bloque
+
+Al terminar imprime un reporte JSON con filas/s y la memoria máxima del
+proceso principal y de los workers. Los registros no se validan como en la
+API: los campos faltantes toman DEFAULT_VALUES y las categorías desconocidas
+el código 0, igual que en FeatureVectorBuilder.
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.config import MODEL_BUNDLE_PATH, USE_COMPILED_TREE
+from app.models.db_model import PREDICTION_COLUMNS, copy_into, find_clients_by_features, prediction_row
+from app.services.data_preprocessing import DEFAULT_VALUES
+from app.services.feature_vector import normalize_record
+from app.services.model_bundle import load_bundle
+from app.services.model_registry import LoadedModel
+from app.services.tabular_io import read_frames, write_frames
+
+CHUNK_ROWS = 50_000
+
+# Campos de los registros normalizados que usan la vinculación
+# (find_clients_by_features) y el guardado (prediction_row)
+RECORD_FIELDS = ("age", "job", "marital", "education", "balance")
+
+# Tipos de Parquet de las columnas de bank.csv y de las que agrega el scoring: el
+# esquema del fichero no depende de lo que pandas infiera en el primer bloque
+# (p. ej. poutcome vacío en todo el bloque se lee como float)
+PARQUET_TYPES = {
+    **{column: "string" if isinstance(value, str) else "int64" for column, value in DEFAULT_VALUES.items()},
+    "balance": "float64",
+    "deposit": "string",
+    "prediction": "string",
+    "probability": "float64",
+    "model_version": "string",
+    "linked_client_id": "int64",
+}
+
+# Modelo del proceso actual (worker del pool o el principal con --workers 0)
+_model = None
+
+
+def _load_model(bundle_path: str, use_compiled: bool = USE_COMPILED_TREE):
+    global _model
+    _model = LoadedModel.from_bundle(load_bundle(bundle_path), use_compiled)
+    _model.warm_up()
+
+
+def records_from_frame(frame: pd.DataFrame) -> list:
+    """Filas del DataFrame como dicts normalizados; los NaN cuentan como campos faltantes."""
+    frame = frame.astype(object).where(frame.notna(), None)
+    return [normalize_record(record) for record in frame.to_dict("records")]
+
+
+def score_frame(frame: pd.DataFrame, keep_records: bool = False) -> tuple:
+    """
+    Retorna (predicciones 0/1, probabilidades, versión, registros) de un bloque
+    con el modelo del proceso. Con keep_records, 'registros' son los dicts
+    normalizados reducidos a RECORD_FIELDS (para vincular y guardar sin
+    normalizar otra vez en el proceso principal); si no, None.
+    """
+    records = records_from_frame(frame)
+    X = _model.feature_builder.build_matrix(records)
+    if _model.compiled_model is not None:
+        predicted, probabilities = _model.compiled_model.predict_many(X)
+    else:
+        proba = _model.model.predict_proba(X)
+        predicted = _model.model.classes_.take(np.argmax(proba, axis=1))
+        probabilities = proba[:, 1]
+    kept = [{field: record[field] for field in RECORD_FIELDS} for record in records] if keep_records else None
+    return (np.asarray(predicted, dtype=np.int64), np.asarray(probabilities, dtype=np.float64), _model.version,
+            kept)
+
+
+def _scored_chunks(chunks, workers: int, bundle_path: str, keep_records: bool = False):
+    """Itera (bloque, predicciones, probabilidades, versión, registros) en el orden de entrada."""
+    if workers == 0:
+        _load_model(bundle_path)
+        for frame in chunks:
+            yield (frame, *score_frame(frame, keep_records))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_model, initargs=(bundle_path,)) as pool:
+        in_flight = deque()
+        for frame in chunks:
+            in_flight.append((frame, pool.submit(score_frame, frame, keep_records)))
+            # Contrapresión: no leer más entrada de la que los workers pueden procesar
+            if len(in_flight) >= 2 * workers:
+                frame, future = in_flight.popleft()
+                yield (frame, *future.result())
+        while in_flight:
+            frame, future = in_flight.popleft()
+            yield (frame, *future.result())
+
+
+def _prediction_frame(records: list, predicted, client_ids, version: str, predicted_at) -> pd.DataFrame:
+    """Filas de 'predictions' (PREDICTION_COLUMNS) para COPY, armadas con prediction_row como en la API."""
+    frame = pd.DataFrame(
+        [prediction_row(data, int(prediction), client_id, predicted_at, version)
+         for data, prediction, client_id in zip(records, predicted, client_ids)],
+        columns=list(PREDICTION_COLUMNS),
+    )
+    # Sin esto una columna con None y enteros pasa a float ("12.0") y COPY la rechaza
+    frame["client_id"] = frame["client_id"].astype("Int64")
+    return frame
+
+
+def score_file(input_path: str, output_path: str, workers: int = None, chunk_rows: int = CHUNK_ROWS,
+               bundle_path: str = MODEL_BUNDLE_PATH, link_clients: bool = False, save: bool = False,
+               input_format: str = None, output_format: str = None) -> dict:
+    """Puntúa 'input_path' y escribe 'output_path'. Retorna el reporte."""
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    started = time.perf_counter()
+    totals = {"rows": 0, "positive": 0, "linked": 0, "saved": 0, "chunks": 0}
+    predicted_at = datetime.now()
+
+    def output_frames():
+        chunks = read_frames(input_path, chunk_rows, input_format)
+        scored = _scored_chunks(chunks, workers, bundle_path, keep_records=link_clients or save)
+        for frame, predicted, probabilities, version, records in scored:
+            out = frame.reset_index(drop=True)
+            out["prediction"] = np.where(predicted == 1, "yes", "no")
+            out["probability"] = probabilities
+            out["model_version"] = version
+            client_ids = [None] * len(out)
+            if link_clients:
+                client_ids = find_clients_by_features(records)
+                out["linked_client_id"] = pd.array(client_ids, dtype="Int64")
+                totals["linked"] += sum(client_id is not None for client_id in client_ids)
+            if save:
+                totals["saved"] += copy_into(
+                    [_prediction_frame(records, predicted, client_ids, version, predicted_at)], "predictions")
+            totals["rows"] += len(out)
+            totals["positive"] += int(predicted.sum())
+            totals["chunks"] += 1
+            yield out
+
+    write_frames(output_frames(), output_path, output_format, types=PARQUET_TYPES)
+    elapsed = time.perf_counter() - started
+    return {
+        "input": input_path,
+        "output": output_path,
+        "workers": workers,
+        "chunk_rows": chunk_rows,
+        **totals,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_s": round(totals["rows"] / elapsed, 1) if elapsed else None,
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+        "worker_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if workers else None,
+    }
+
+
+def _peak_rss_mb(who) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Scoring masivo de un fichero CSV/Parquet con el modelo del bundle")
+    parser.add_argument("input", help="CSV o Parquet con las columnas de bank.csv")
+    parser.add_argument("--output", required=True, help="Fichero de resultados (.csv o .parquet)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos del pool (por defecto, uno por núcleo; 0 = en el proceso actual)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--bundle", default=MODEL_BUNDLE_PATH, help="Bundle del modelo")
+    parser.add_argument("--input-format", choices=("csv", "parquet"), help="Por defecto, según la extensión")
+    parser.add_argument("--output-format", choices=("csv", "parquet"), help="Por defecto, según la extensión")
+    parser.add_argument("--link-clients", action="store_true", help="Vincular con la tabla clients")
+    parser.add_argument("--save", action="store_true", help="Guardar las predicciones en la tabla predictions")
+    parser.add_argument("--report", help="Fichero donde escribir además el reporte JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = _parse_args(argv)
+    if not os.path.exists(args.bundle):
+        sys.exit(f"❌ Bundle no encontrado: {args.bundle} (genera uno con: python -m app.services.train_model)")
+
+    report = score_file(
+        args.input, args.output, workers=args.workers, chunk_rows=args.chunk_rows, bundle_path=args.bundle,
+        link_clients=args.link_clients, save=args.save,
+        input_format=args.input_format, output_format=args.output_format,
+    )
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# =============================================
+# 📁 Archivo: /app/services/structured_logging.py
+# =============================================
+"""
+Logs estructurados (JSON lines) sin E/S en el hilo de la solicitud.
+
+Los módulos usan `logging.getLogger(__name__)` como siempre. configure_logging()
+conecta el logger "app" a un QueueHandler: la solicitud solo encola el
+LogRecord y un hilo (QueueListener) lo serializa y escribe. Si la cola está
+llena el registro se descarta y se cuenta, en lugar de frenar la solicitud.
+
+Cada línea lleva ts, level, logger, msg, pid y el request_id de la solicitud
+(cabecera X-Request-ID o uno generado por RequestContextMiddleware), más los
+campos pasados con `extra={"fields": {...}}`.
+
+Los payloads de depuración (registro recibido, vector codificado) solo se
+registran para una fracción LOG_DEBUG_SAMPLE_RATE de las solicitudes, y solo
+con LOG_LEVEL=DEBUG: ver payload_sampled().
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from app.config import LOG_DEBUG_SAMPLE_RATE, LOG_LEVEL, LOG_QUEUE_SIZE
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Solicitud en curso; se propaga a los pools de hilos (ver executors.py)
+request_id_var = contextvars.ContextVar("request_id", default=None)
+_sampled_var = contextvars.ContextVar("debug_sampled", default=None)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def payload_sampled() -> bool:
+    """
+    True si esta solicitud registra payloads de depuración. La decisión se
+    toma una vez por solicitud; fuera de una solicitud, en cada llamada.
+    """
+    sampled = _sampled_var.get()
+    if sampled is None:
+        sampled = random.random() < LOG_DEBUG_SAMPLE_RATE
+    return sampled
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "item"):     # escalares de numpy
+        return value.item()
+    if hasattr(value, "value"):    # enums de los esquemas
+        return value.value
+    return str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro."""
+
+    def format(self, record) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "pid": record.process,
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=_json_default)
+
+
+class _RequestIdFilter(logging.Filter):
+    def filter(self, record) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Con la cola llena, put_nowait fallaría: esperar a que el hilo libere espacio
+        self.queue.put(self._sentinel)
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler acotado: formatea y escribe en el hilo del QueueListener.
+    Si la cola está llena descarta el registro (contador 'dropped').
+    El listener se vuelve a crear si el proceso hizo fork (workers de gunicorn).
+    """
+
+    def __init__(self, target: logging.Handler, maxsize: int = 10000):
+        super().__init__(queue.Queue(maxsize))
+        self.target = target
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self.addFilter(_RequestIdFilter())
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Tras un fork la cola heredada puede tener registros del padre
+            self.queue = queue.Queue(self.queue.maxsize)
+            self._listener = _Listener(self.queue, self.target, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Sin formatear aquí: msg/args y 'fields' se serializan en el listener
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """Escribe lo que quede en la cola y detiene el listener."""
+        listener, self._listener = self._listener, None
+        if listener is not None and self._pid == os.getpid():
+            listener.stop()
+        self._pid = None
+
+
+_handler = None
+
+
+def configure_logging(stream=None, level: str = None) -> AsyncQueueHandler:
+    """Conecta el logger "app" al handler asíncrono JSON (idempotente)."""
+    global _handler
+    if _handler is not None and stream is None:
+        return _handler
+    target = logging.StreamHandler(stream or sys.stdout)
+    target.setFormatter(JsonFormatter())
+
+    logger = logging.getLogger("app")
+    if _handler is not None:
+        logger.removeHandler(_handler)
+        _handler.stop()
+    _handler = AsyncQueueHandler(target, LOG_QUEUE_SIZE)
+    logger.addHandler(_handler)
+    logger.setLevel(level or LOG_LEVEL)
+    logger.propagate = False
+    return _handler
+
+
+def flush_logging():
+    """Vacía la cola de logs (al detener la API o el proceso)."""
+    if _handler is not None:
+        _handler.stop()
+
+
+atexit.register(flush_logging)
+
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI: asigna un request_id a cada solicitud (el de la cabecera
+    X-Request-ID si viene, uno nuevo si no), lo devuelve en la respuesta y
+    decide si la solicitud registra payloads de depuración.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER.encode():
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or new_request_id()
+        id_token = request_id_var.set(request_id)
+        sampled_token = _sampled_var.set(random.random() < LOG_DEBUG_SAMPLE_RATE)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((REQUEST_ID_HEADER.encode(), request_id.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(id_token)
+            _sampled_var.reset(sampled_token)
@@ -0,0 +1,209 @@
+# =============================================
+# 📁 Archivo: /app/services/synthetic_data.py
+# =============================================
+"""
+Generador sintético del dataset Bank Marketing para pruebas de escala.
+
+SyntheticModel.fit aprende de bank.csv:
+- La distribución conjunta del estrato (deposit, poutcome)
+- Dentro de cada estrato, la conjunta de cada bloque de categóricas
+  relacionadas: (job, marital, education), (default, housing, loan),
+  (contact, month)
+- Dentro de cada estrato, los cuantiles de cada columna numérica (rango y
+  forma). pdays y previous comparten el cuantil sorteado, así que
+  "pdays = -1 ⇔ previous = 0" se mantiene como en los datos reales
+
+generate() produce las filas por bloques de BLOCK_ROWS con memoria constante.
+Cada bloque tiene su propio generador derivado de (seed, número de bloque):
+con la misma semilla, las primeras N filas son idénticas sea cual sea el
+total pedido.
+
+    python -m app.services.synthetic_data --rows 10000000 --format csv --output bank_10m.csv
+    python -m app.services.synthetic_data --rows 1000000 --format parquet --output bank_1m.parquet
+    python -m app.services.synthetic_data --rows 20000000 --format copy --table predictions
+
+La salida Parquet necesita pyarrow (dependencia opcional).
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.models.db_model import COPY_TABLES as TABLES, PREDICTION_COLUMNS, copy_into
+from app.services.tabular_io import write_csv, write_parquet
+
+DATA_PATH = "app/data/raw/bank.csv"
+
+STRATUM = ("deposit", "poutcome")
+CATEGORICAL_BLOCKS = (("job", "marital", "education"), ("default", "housing", "loan"), ("contact", "month"))
+NUMERIC_COLUMNS = ("age", "balance", "day", "duration", "campaign", "pdays", "previous")
+# Columnas que reutilizan el cuantil sorteado para otra (conserva su dependencia)
+COUPLED = {"previous": "pdays"}
+
+BLOCK_ROWS = 50_000
+QUANTILES = np.linspace(0.0, 1.0, 1001)
+
+
+class _Discrete:
+    """Distribución discreta sobre tuplas de valores de varias columnas."""
+
+    def __init__(self, columns: tuple, values: np.ndarray, probs: np.ndarray):
+        self.columns = columns
+        self.values = values
+        self.probs = probs
+
+    @classmethod
+    def fit(cls, frame: pd.DataFrame, columns: tuple) -> "_Discrete":
+        counts = frame[list(columns)].value_counts().sort_index()
+        values = np.empty((len(counts), len(columns)), dtype=object)
+        for i, combination in enumerate(counts.index):
+            values[i] = combination
+        return cls(columns, values, counts.to_numpy(dtype=float) / counts.sum())
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """Índices de 'values' sorteados."""
+        return rng.choice(len(self.probs), size=size, p=self.probs)
+
+
+class SyntheticModel:
+    """Distribuciones aprendidas de bank.csv; ver el docstring del módulo."""
+
+    def __init__(self, columns: list, strata: _Discrete, blocks: list, quantiles: list, integer_columns: set):
+        self.columns = columns
+        self.strata = strata
+        self.blocks = blocks            # por estrato: lista de _Discrete
+        self.quantiles = quantiles      # por estrato: {columna: cuantiles}
+        self.integer_columns = integer_columns
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame) -> "SyntheticModel":
+        df = df.dropna()
+        modeled = set(STRATUM) | {c for block in CATEGORICAL_BLOCKS for c in block} | set(NUMERIC_COLUMNS)
+        missing = modeled - set(df.columns)
+        if missing:
+            raise ValueError(f"Faltan columnas en los datos de origen: {sorted(missing)}")
+
+        strata = _Discrete.fit(df, STRATUM)
+        blocks, quantiles = [], []
+        for combination in strata.values:
+            mask = np.logical_and.reduce([df[c].to_numpy() == v for c, v in zip(STRATUM, combination)])
+            subset = df[mask]
+            blocks.append([_Discrete.fit(subset, block) for block in CATEGORICAL_BLOCKS])
+            quantiles.append({c: np.quantile(subset[c].to_numpy(dtype=float), QUANTILES) for c in NUMERIC_COLUMNS})
+
+        columns = [c for c in df.columns if c in modeled]
+        integer_columns = {c for c in NUMERIC_COLUMNS if pd.api.types.is_integer_dtype(df[c])}
+        return cls(columns, strata, blocks, quantiles, integer_columns)
+
+    @classmethod
+    def from_csv(cls, path: str = DATA_PATH) -> "SyntheticModel":
+        return cls.fit(pd.read_csv(path))
+
+    def sample(self, size: int, rng: np.random.Generator) -> pd.DataFrame:
+        """'size' filas sintéticas con las columnas de bank.csv."""
+        stratum = self.strata.sample(size, rng)
+        data = {c: self.strata.values[stratum, j] for j, c in enumerate(self.strata.columns)}
+        for block in CATEGORICAL_BLOCKS:
+            data.update({c: np.empty(size, dtype=object) for c in block})
+        data.update({c: np.empty(size, dtype=float) for c in NUMERIC_COLUMNS})
+
+        for s in range(len(self.strata.probs)):
+            rows = np.flatnonzero(stratum == s)
+            if not rows.size:
+                continue
+            for block in self.blocks[s]:
+                picked = block.values[block.sample(rows.size, rng)]
+                for j, c in enumerate(block.columns):
+                    data[c][rows] = picked[:, j]
+            draws = {}
+            for c in NUMERIC_COLUMNS:
+                draws[c] = draws[COUPLED[c]] if c in COUPLED else rng.random(rows.size)
+                data[c][rows] = np.interp(draws[c], QUANTILES, self.quantiles[s][c])
+
+        for c in self.integer_columns:
+            data[c] = np.rint(data[c]).astype(np.int64)
+        return pd.DataFrame(data, columns=self.columns)
+
+    def generate(self, n_rows: int, seed: int = 0, block_rows: int = BLOCK_ROWS):
+        """Itera DataFrames de hasta 'block_rows' filas que suman 'n_rows'."""
+        for index, offset in enumerate(range(0, n_rows, block_rows)):
+            rng = np.random.default_rng((seed, index))
+            frame = self.sample(block_rows, rng)    # bloque completo: el prefijo no depende de n_rows
+            yield frame if offset + block_rows <= n_rows else frame.iloc[:n_rows - offset]
+
+
+def to_predictions(frames, n_rows: int, seed: int = 0, start: datetime = datetime(2025, 1, 1),
+                   days: float = 365.0, model_version: str = "synthetic"):
+    """
+    Convierte los bloques de generate() en filas de 'predictions'
+    (PREDICTION_COLUMNS): result = deposit, predicted_at repartido en orden
+    creciente entre 'start' y 'start + days' y client_id NULL.
+    """
+    span = timedelta(days=days).total_seconds()
+    offset = 0
+    for index, frame in enumerate(frames):
+        rng = np.random.default_rng((seed, index, 1))
+        positions = np.arange(offset, offset + len(frame)) + rng.random(len(frame))
+        micros = (positions * (span * 1e6 / n_rows)).astype(np.int64)
+        offset += len(frame)
+        yield pd.DataFrame({
+            "client_id": pd.array([None] * len(frame), dtype="Int64"),
+            "age": frame["age"],
+            "job": frame["job"],
+            "marital": frame["marital"],
+            "education": frame["education"],
+            "balance": frame["balance"].astype(float),
+            "result": (frame["deposit"] == "yes").astype(np.int64),
+            "model_version": model_version,
+            "predicted_at": pd.Timestamp(start) + pd.to_timedelta(micros, unit="us"),
+        }, columns=list(PREDICTION_COLUMNS))
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generador sintético del dataset Bank Marketing")
+    parser.add_argument("--rows", type=int, required=True, help="Filas a generar")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=("csv", "parquet", "copy"), default="csv")
+    parser.add_argument("--output", default="-", help="Fichero de salida para csv/parquet ('-' = stdout en csv)")
+    parser.add_argument("--table", choices=TABLES, default="clients",
+                        help="clients: columnas de bank.csv; predictions: filas de la tabla predictions")
+    parser.add_argument("--source", default=DATA_PATH, help="CSV del que se aprenden las distribuciones")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=datetime(2025, 1, 1),
+                        help="Inicio de predicted_at (--table predictions)")
+    parser.add_argument("--days", type=float, default=365.0, help="Días que abarca predicted_at")
+    parser.add_argument("--model-version", default="synthetic")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    if args.format == "parquet" and args.output == "-":
+        sys.exit("❌ --format parquet necesita --output")
+
+    started = time.perf_counter()
+    model = SyntheticModel.from_csv(args.source)
+    frames = model.generate(args.rows, seed=args.seed)
+    if args.table == "predictions":
+        frames = to_predictions(frames, args.rows, seed=args.seed, start=args.start, days=args.days,
+                                model_version=args.model_version)
+
+    if args.format == "csv":
+        rows = write_csv(frames, args.output)
+    elif args.format == "parquet":
+        rows = write_parquet(frames, args.output)
+    else:
+        rows = copy_into(frames, args.table)
+
+    elapsed = time.perf_counter() - started
+    target = args.table if args.format == "copy" else args.output
+    print(f"✅ {rows:,} filas sintéticas ({args.table}) → {target} en {elapsed:.1f} s "
+          f"({rows / elapsed:,.0f} filas/s)", file=sys.stderr)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
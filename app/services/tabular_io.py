@@ -0,0 +1,88 @@
+# =============================================
+# 📁 Archivo: /app/services/tabular_io.py
+# =============================================
+"""
+Lectura y escritura por bloques de CSV y Parquet, con memoria constante.
+Las usan el generador sintético (synthetic_data.py) y el scoring masivo
+(score_batch.py). Parquet requiere pyarrow (dependencia opcional).
+"""
+
+import sys
+
+import pandas as pd
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet requiere pyarrow: pip install pyarrow")
+    return pa, pq
+
+
+def file_format(path: str, fmt: str = None) -> str:
+    """'csv' o 'parquet': el indicado, o según la extensión del fichero."""
+    if fmt:
+        return fmt
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def read_frames(path: str, chunk_rows: int, fmt: str = None):
+    """Itera DataFrames de hasta 'chunk_rows' filas de un CSV o Parquet."""
+    if file_format(path, fmt) == "parquet":
+        _, pq = _pyarrow()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+        return
+    yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+def write_csv(frames, path: str) -> int:
+    """CSV con cabecera; '-' escribe en stdout. Retorna las filas escritas."""
+    rows = 0
+    f = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+    try:
+        for frame in frames:
+            frame.to_csv(f, header=rows == 0, index=False)
+            rows += len(frame)
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    return rows
+
+
+def write_parquet(frames, path: str, types: dict = None) -> int:
+    """
+    Parquet con un row group por bloque. Retorna las filas escritas.
+
+    El esquema se fija con el primer bloque: las columnas de 'types' toman ese
+    tipo de Arrow ('int64', 'float64', 'string'...) y las demás el inferido.
+    Cada bloque se convierte a ese esquema, así que un bloque cuya columna
+    quedó toda en NaN (float para pandas) no rompe el fichero a mitad de camino.
+    """
+    pa, pq = _pyarrow()
+    types = types or {}
+    rows, writer = 0, None
+    try:
+        for frame in frames:
+            if writer is None:
+                inferred = pa.Schema.from_pandas(frame, preserve_index=False)
+                schema = pa.schema([
+                    pa.field(field.name, pa.type_for_alias(types[field.name]) if field.name in types else field.type)
+                    for field in inferred
+                ])
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(pa.Table.from_pandas(frame, schema=writer.schema, preserve_index=False))
+            rows += len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def write_frames(frames, path: str, fmt: str = None, types: dict = None) -> int:
+    """Escribe en CSV o Parquet según 'fmt' o la extensión de 'path' ('types': ver write_parquet)."""
+    if file_format(path, fmt) == "parquet":
+        return write_parquet(frames, path, types)
+    return write_csv(frames, path)
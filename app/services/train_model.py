@@ -3,10 +3,11 @@
 # =============================================
 """
 Entrenamiento del modelo de Árbol de Decisión.
-Incluye división del dataset, evaluación y guardado del modelo.
+Incluye división del dataset, evaluación y guardado del modelo en un único
+bundle versionado (app/services/model_bundle.py) junto con los encoders,
+el orden de columnas y los valores por defecto.
 """
 
-import pickle
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeClassifier
@@ -14,16 +15,17 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 from datetime import datetime
 import os
 
-from app.services.data_preprocessing import preprocess_data
+from app.config import MODEL_BUNDLE_PATH
+from app.services.data_preprocessing import preprocess_data, DEFAULT_VALUES
+from app.services.model_bundle import save_bundle
 
 LOG_PATH = "logs/training.log"
-MODEL_PATH = "app/models/model_dt.pkl"
 
 
 def train_and_evaluate(df: pd.DataFrame):
     """
-    Entrena y evalúa un modelo de Árbol de Decisión.
-    Guarda el modelo y registra métricas.
+    Entrena y evalúa un modelo de Árbol de Decisión y registra métricas.
+    Retorna (modelo, métricas).
     """
     # Separar características (X) y etiqueta (y)
     X = df.drop("deposit", axis=1)
@@ -52,13 +54,9 @@ def train_and_evaluate(df: pd.DataFrame):
         log.write(f"Registros totales: {len(df)}\n")
         log.write(f"Accuracy: {acc:.4f}\nPrecision: {prec:.4f}\nRecall: {rec:.4f}\nF1: {f1:.4f}\n")
 
-    # Guardar modelo entrenado
-    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-    with open(MODEL_PATH, "wb") as f:
-        pickle.dump(model, f)
-
-    print("✅ Modelo entrenado y guardado en:", MODEL_PATH)
     print(f"📊 Métricas -> Accuracy: {acc:.3f} | Precision: {prec:.3f} | Recall: {rec:.3f} | F1: {f1:.3f}")
+    metrics = {"accuracy": float(acc), "precision": float(prec), "recall": float(rec), "f1": float(f1)}
+    return model, metrics
 
 
 if __name__ == "__main__":
@@ -83,19 +81,17 @@ if __name__ == "__main__":
         print("  python -m app.services.train_model data/raw/bank.csv")
         sys.exit(1)
 
-    df, label_encoders, default_values, feature_names = preprocess_data(data_path)
-    # Guardar artefactos de preprocesado para inferencia
-    try:
-        import pickle
-        os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-        with open("app/models/encoders.pkl", "wb") as f:
-            pickle.dump(label_encoders, f)
-        with open("app/models/default_values.pkl", "wb") as f:
-            pickle.dump(default_values, f)
-        with open("app/models/feature_names.pkl", "wb") as f:
-            pickle.dump(feature_names, f)
-        print("✅ Artefactos de preprocesado guardados en app/models/")
-    except Exception as e:
-        print("❌ No se pudieron guardar artefactos de preprocesado:", e)
-
-    train_and_evaluate(df)
+    df, label_encoders, _, feature_names = preprocess_data(data_path)
+    model, metrics = train_and_evaluate(df)
+
+    # Modelo, encoders, orden de columnas y DEFAULT_VALUES (los que usa la API) en un solo fichero
+    manifest = save_bundle(
+        MODEL_BUNDLE_PATH,
+        model,
+        label_encoders,
+        feature_names,
+        DEFAULT_VALUES,
+        metrics=metrics,
+        training={"data_path": data_path, "rows": len(df), "test_size": 0.2, "random_state": 42},
+    )
+    print(f"✅ Bundle del modelo guardado en {MODEL_BUNDLE_PATH} (versión {manifest['version']})")
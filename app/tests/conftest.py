@@ -0,0 +1,170 @@
+# =============================================
+# 📁 Archivo: /app/tests/conftest.py
+# =============================================
+"""
+Fixtures compartidas por los tests de la API.
+
+Entrena un árbol de decisión en memoria sobre app/data/raw/bank.csv (igual que
+train_model.py, sin escribir ficheros) para que los tests no dependan de los
+.pkl generados localmente ni de una base de datos.
+
+Los tests que sí necesitan PostgreSQL usan la fixture `test_db`: con
+TEST_DATABASE_URL se usa ese servidor; si no, se arranca uno temporal con los
+binarios de PostgreSQL (PG_BIN o `pg_ctl` en el PATH). Sin ninguno de los dos
+esos tests se omiten.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import uuid
+
+import psycopg2
+import pytest
+from psycopg2.extensions import make_dsn
+from sklearn.tree import DecisionTreeClassifier
+
+from app.database.connection import ConnectionPool, set_pool, close_pool
+
+from app.services.compiled_tree import CompiledTree
+from app.services.data_preprocessing import preprocess_data
+from app.services.feature_vector import FeatureVectorBuilder
+from app.services.model_registry import LoadedModel, ModelRegistry
+from app.services.prediction_cache import PredictionCache
+
+DATA_PATH = "app/data/raw/bank.csv"
+SCHEMA_PATH = "app/database/bank_marketing_schema.sql"
+
+
+@pytest.fixture(scope="session")
+def bank_artifacts():
+    """Retorna (df codificado, label_encoders, default_values, feature_names)."""
+    return preprocess_data(DATA_PATH)
+
+
+@pytest.fixture(scope="session")
+def trained_model(bank_artifacts):
+    df = bank_artifacts[0]
+    model = DecisionTreeClassifier(max_depth=5, random_state=42)
+    model.fit(df.drop("deposit", axis=1), df["deposit"])
+    return model
+
+
+@pytest.fixture
+def loaded_controller(monkeypatch, bank_artifacts, trained_model):
+    """
+    Activa el modelo entrenado en memoria (versión "test") en predict_controller y sustituye el acceso
+    a base de datos por dobles en memoria. Retorna la lista de filas guardadas.
+    """
+    from app.controllers import predict_controller
+
+    _, label_encoders, _, feature_names = bank_artifacts
+    registry = ModelRegistry(None)
+    registry.install(LoadedModel(
+        "test",
+        FeatureVectorBuilder.from_encoders(label_encoders, feature_names),
+        CompiledTree.from_sklearn(trained_model),
+        trained_model,
+    ))
+    monkeypatch.setattr(predict_controller, "model_registry", registry)
+    monkeypatch.setattr(predict_controller, "prediction_cache", PredictionCache())
+    monkeypatch.setattr(predict_controller, "prediction_sink", None)
+    monkeypatch.setattr(predict_controller, "client_index", None)
+
+    saved = []
+    monkeypatch.setattr(predict_controller, "find_client_by_features", lambda data: None)
+    monkeypatch.setattr(predict_controller, "find_clients_by_features", lambda records: [None] * len(records))
+    monkeypatch.setattr(
+        predict_controller, "save_prediction",
+        lambda data, prediction, client_id=None, model_version=None: saved.append((data, prediction, client_id)),
+    )
+    monkeypatch.setattr(
+        predict_controller, "save_predictions",
+        lambda records, predictions, client_ids=None, model_version=None: saved.extend(
+            zip(records, predictions, client_ids)
+        ),
+    )
+    return saved
+
+
+def schema_sql() -> str:
+    """Schema del proyecto sin CREATE DATABASE ni \\c (se ejecuta sobre una BD ya creada)."""
+    with open(SCHEMA_PATH, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    return "\n".join(
+        line for line in lines
+        if not line.strip().startswith("\\c") and not line.strip().upper().startswith("CREATE DATABASE")
+    )
+
+
+def _pg_bin():
+    if os.getenv("PG_BIN"):
+        return os.getenv("PG_BIN")
+    pg_ctl = shutil.which("pg_ctl")
+    return os.path.dirname(pg_ctl) if pg_ctl else None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def postgres_server(tmp_path_factory):
+    """DSN de la base 'postgres' de un servidor de pruebas."""
+    if os.getenv("TEST_DATABASE_URL"):
+        yield os.getenv("TEST_DATABASE_URL")
+        return
+
+    pg_bin = _pg_bin()
+    if pg_bin is None:
+        pytest.skip("PostgreSQL no disponible: define TEST_DATABASE_URL o PG_BIN")
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        pytest.skip("initdb no puede ejecutarse como root: define TEST_DATABASE_URL")
+
+    datadir = tmp_path_factory.mktemp("pgdata")
+    port = _free_port()
+    subprocess.run(
+        [os.path.join(pg_bin, "initdb"), "-D", str(datadir), "-U", "postgres", "-A", "trust"],
+        check=True, capture_output=True,
+    )
+    subprocess.run(
+        [os.path.join(pg_bin, "pg_ctl"), "-D", str(datadir), "-l", str(datadir / "server.log"), "-w",
+         "-o", f"-p {port} -k {datadir} -c listen_addresses=127.0.0.1", "start"],
+        check=True, capture_output=True,
+    )
+    try:
+        yield f"postgresql://postgres@127.0.0.1:{port}/postgres"
+    finally:
+        subprocess.run(
+            [os.path.join(pg_bin, "pg_ctl"), "-D", str(datadir), "-m", "immediate", "stop"],
+            capture_output=True,
+        )
+
+
+@pytest.fixture
+def test_db(postgres_server):
+    """
+    Base de datos nueva con el schema del proyecto. El pool compartido del
+    proceso apunta a ella durante el test. Retorna su DSN.
+    """
+    name = f"bank_test_{uuid.uuid4().hex[:10]}"
+    admin = psycopg2.connect(postgres_server)
+    admin.autocommit = True
+    admin.cursor().execute(f"CREATE DATABASE {name} ENCODING 'UTF8' TEMPLATE template0")
+    dsn = make_dsn(postgres_server, dbname=name)
+
+    conn = psycopg2.connect(dsn)
+    conn.cursor().execute(schema_sql())
+    conn.commit()
+    conn.close()
+
+    set_pool(ConnectionPool(dsn, min_size=1, max_size=5))
+    try:
+        yield dsn
+    finally:
+        close_pool()
+        admin.cursor().execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        admin.close()
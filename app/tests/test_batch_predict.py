@@ -0,0 +1,62 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_batch_predict.py
+# =============================================
+"""
+Pruebas del endpoint /api/predict/batch.
+Verifica que el lote coincide con /api/predict registro a registro
+y que los errores se reportan por índice.
+"""
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+DATA_PATH = "app/data/raw/bank.csv"
+
+client = TestClient(app)
+
+
+def _sample_records(n):
+    df = pd.read_csv(DATA_PATH).drop(columns=["deposit"]).sample(n, random_state=0)
+    return df.to_dict("records")
+
+
+def test_batch_matches_single_predictions(loaded_controller):
+    records = _sample_records(50)
+
+    response = client.post("/api/predict/batch", json={"records": records})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == body["succeeded"] == 50
+    assert body["errors"] == []
+
+    for record, result in zip(records, body["results"]):
+        single = client.post("/api/predict", json=record).json()
+        assert result["prediction"] == single["prediction"]
+        assert abs(result["probability"] - single["probability"]) < 1e-9
+
+    # 50 del lote (un solo INSERT) + 50 individuales
+    assert len(loaded_controller) == 100
+
+
+def test_batch_reports_invalid_records_by_index(loaded_controller):
+    records = _sample_records(3)
+    records[1]["age"] = -1
+    records[2]["job"] = "astronaut"
+
+    response = client.post("/api/predict/batch", json={"records": records})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["succeeded"] == 1
+    assert [r["index"] for r in body["results"]] == [0]
+    assert [e["index"] for e in body["errors"]] == [1, 2]
+    assert "age" in body["errors"][0]["detail"]
+
+
+def test_batch_rejects_oversized_payload(loaded_controller, monkeypatch):
+    from app.routes import predict_routes
+
+    monkeypatch.setattr(predict_routes, "PREDICT_BATCH_MAX_RECORDS", 2)
+    response = client.post("/api/predict/batch", json={"records": _sample_records(3)})
+    assert response.status_code == 413
@@ -0,0 +1,67 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_bench_regression.py
+# =============================================
+"""
+Pruebas de la puerta de regresión de los micro-benchmarks
+(app/benchmarks/regression.py).
+"""
+
+import time
+
+from app.benchmarks import regression
+
+
+def _baselines():
+    return {
+        "tolerance": 0.25,
+        "benchmarks": {
+            "encode": {"min_s": 0.01, "median_s": 0.011, "normalized": 0.5},
+            "train": {"min_s": 0.1, "median_s": 0.12, "normalized": 5.0, "tolerance": 1.0},
+        },
+    }
+
+
+def test_check_against_baseline(monkeypatch):
+    monkeypatch.delenv("BENCH_TOLERANCE", raising=False)
+    baselines = _baselines()
+    assert regression.check("encode", 0.6, baselines)["status"] == "ok"          # +20%
+    result = regression.check("encode", 0.65, baselines)                        # +30%
+    assert result == {"status": "regressed", "ratio": 1.3, "tolerance": 0.25}
+    assert regression.check("train", 9.0, baselines)["status"] == "ok"          # tolerancia propia
+    assert regression.check("nuevo", 1.0, baselines)["status"] == "new"
+
+
+def test_tolerance_from_environment(monkeypatch):
+    monkeypatch.setenv("BENCH_TOLERANCE", "0.5")
+    baselines = _baselines()
+    assert regression.check("encode", 0.65, baselines)["status"] == "ok"
+    assert regression.tolerance_for("train", baselines) == 1.0
+
+
+def test_measure_and_round_trip(tmp_path):
+    calls, references = [], []
+    result = regression.measure(lambda: calls.append(1), number=3, repeat=4, warmup=1,
+                                reference=lambda: references.append(1))
+    # Una referencia antes de cada muestra (y otra en el calentamiento)
+    assert len(calls) == 1 + 3 * 4 and len(references) == 1 + 4
+    assert 0 <= result["min_s"] <= result["median_s"]
+    assert result["normalized"] > 0
+
+    path = str(tmp_path / "baselines.json")
+    regression.save_baselines(_baselines(), path)
+    loaded = regression.load_baselines(path)
+    assert loaded["benchmarks"]["train"]["tolerance"] == 1.0
+    assert list(loaded["benchmarks"]) == ["encode", "train"] and "machine" in loaded
+    assert regression.load_baselines(str(tmp_path / "no_existe.json")) == {"benchmarks": {}}
+
+
+def test_short_samples_are_lengthened_and_low_percentile_is_kept():
+    calls = []
+    result = regression.measure(lambda: calls.append(time.sleep(0.001)), number=1, repeat=5, warmup=1,
+                                reference=lambda: time.sleep(0.002), min_sample_s=0.01)
+    # Cada muestra dura al menos ~10 ms: number pasa de 1 a ~10
+    assert 5 <= result["number"] <= 10 and len(calls) == 1 + 5 * result["number"]
+
+    # Una interrupción en 3 de 9 muestras no mueve el valor comparado
+    assert regression.low_percentile([1.0, 1.1, 1.05, 3.0, 1.02, 2.5, 1.08, 4.0, 1.01]) == 1.01
+    assert regression.low_percentile([2.0]) == 2.0
@@ -0,0 +1,153 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_callback_cache.py
+# =============================================
+"""
+Pruebas de la caché de callbacks del dashboard: entradas por versión de los
+datos, un solo cálculo entre hilos y entre procesos, y update_dashboard
+sirviendo el resultado guardado hasta que llega una predicción nueva.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.dashboards.callback_cache import LOCK_STRIPES, CallbackCache
+
+
+def test_entries_follow_data_version(tmp_path):
+    version, now, calls = ["v1"], [1000.0], []
+
+    def compute():
+        calls.append(version[0])
+        return {"figure": len(calls)}
+
+    cache = CallbackCache(str(tmp_path), ttl=60, version=lambda: version[0], clock=lambda: now[0])
+    assert cache.get_or_compute("k", compute) == {"figure": 1}
+    assert cache.get_or_compute("k", compute) == {"figure": 1}
+    assert cache.get_or_compute("otra", compute) == {"figure": 2}
+
+    version[0] = "v2"                        # predicción nueva
+    assert cache.get_or_compute("k", compute) == {"figure": 3}
+    now[0] += 61                             # misma versión, pero la entrada venció
+    assert cache.get_or_compute("k", compute) == {"figure": 4}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 4
+
+
+def test_prune_keeps_lock_files(tmp_path):
+    cache = CallbackCache(str(tmp_path), ttl=0.3, version=lambda: "v1")
+    cache.get_or_compute("ts-predictions:zoom", lambda: "viejo")
+    locks = {p.name for p in tmp_path.iterdir() if p.name.startswith("lock-")}
+    assert len(locks) == 1
+
+    time.sleep(0.35)                         # la entrada del zoom vence; se poda al siguiente cálculo
+    cache.get_or_compute("update_dashboard", lambda: "nuevo")
+    names = {p.name for p in tmp_path.iterdir()}
+    assert os.path.basename(cache._path("ts-predictions:zoom")) not in names
+    assert os.path.basename(cache._path("update_dashboard")) in names
+    # Los locks siguen en su sitio: otro proceso podría tener un flock sobre ellos
+    assert locks <= names and all(n.endswith(".pkl") or n.startswith("lock-") for n in names)
+
+
+def test_locks_do_not_grow_with_keys(tmp_path):
+    cache = CallbackCache(str(tmp_path), ttl=60, version=lambda: "v1")
+    for n in range(500):                     # p. ej. un rango de zoom distinto por llamada
+        cache.get_or_compute(f"ts-predictions:zoom-{n}", lambda: n)
+    assert len(cache._key_locks) == LOCK_STRIPES
+    assert len([p for p in tmp_path.iterdir() if p.name.startswith("lock-")]) <= LOCK_STRIPES
+    # El lock de hilos y el flock de una clave son de la misma franja
+    key = "ts-predictions:zoom-7"
+    assert cache._lock_path(key).endswith(f"lock-{cache._key_locks.index(cache._key_lock(key))}")
+
+
+def test_errors_are_not_cached(tmp_path):
+    cache = CallbackCache(str(tmp_path), ttl=60, version=lambda: "v1")
+    with pytest.raises(ZeroDivisionError):
+        cache.get_or_compute("k", lambda: 1 / 0)
+    assert cache.get_or_compute("k", lambda: "ok") == "ok" and cache.stats()["errors"] == 1
+
+    # Sin versión (BD caída) se calcula cada vez, sin guardar
+    down = CallbackCache(str(tmp_path), ttl=60, version=lambda: 1 / 0)
+    assert [down.get_or_compute("k", lambda: n) for n in range(2)] == [0, 1]
+    assert down.stats()["uncached"] == 2
+
+    disabled = CallbackCache(str(tmp_path), ttl=0, version=lambda: "v1")
+    assert disabled.get_or_compute("k", lambda: "fresco") == "fresco"
+
+
+def test_concurrent_threads_compute_once(tmp_path):
+    cache = CallbackCache(str(tmp_path), ttl=60, version=lambda: "v1")
+    calls, results = [], []
+    start = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "figuras"
+
+    def tab():
+        start.wait()
+        results.append(cache.get_or_compute("update_dashboard", compute))
+
+    threads = [threading.Thread(target=tab) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1 and results == ["figuras"] * 8
+    assert cache.stats()["waits"] + cache.stats()["hits"] == 7
+
+
+def _worker(directory, log_path, start, out):
+    # Otro proceso del dashboard: su propia instancia sobre el mismo directorio
+    def compute():
+        with open(log_path, "a") as f:
+            f.write("calculo\n")
+        time.sleep(0.3)
+        return {"pid": multiprocessing.current_process().pid}
+
+    cache = CallbackCache(directory, ttl=60, version=lambda: "v1")
+    start.wait()
+    out.put(cache.get_or_compute("update_dashboard", compute))
+
+
+def test_processes_share_one_computation(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    start, out = ctx.Barrier(4), ctx.Queue()
+    log_path = tmp_path / "calculos.txt"
+    procs = [ctx.Process(target=_worker, args=(str(tmp_path / "cache"), str(log_path), start, out))
+             for _ in range(4)]
+    for p in procs:
+        p.start()
+    results = [out.get(timeout=20) for _ in procs]
+    for p in procs:
+        p.join(10)
+
+    assert log_path.read_text().count("calculo") == 1
+    assert len({r["pid"] for r in results}) == 1      # todos leen el resultado del mismo proceso
+
+
+def test_update_dashboard_is_served_from_cache(test_db, tmp_path, monkeypatch):
+    from app.dashboards import dashboard
+    from app.models.db_model import insert_prediction_rows, prediction_row
+
+    row = lambda i: prediction_row({"age": 30 + i}, i % 2, None, datetime(2024, 7, 1, 10, i), "v1")
+    insert_prediction_rows([row(i) for i in range(10)])
+    cache = CallbackCache(str(tmp_path), ttl=300)
+    monkeypatch.setattr(dashboard, "callback_cache", cache)
+    calls = []
+    compute = dashboard.dashboard_data
+    monkeypatch.setattr(dashboard, "dashboard_data", lambda: calls.append(1) or compute())
+
+    first = dashboard.update_dashboard(0)
+    for n in range(1, 5):                     # otras pestañas, mismos datos
+        assert dashboard.update_dashboard(n)[4] == first[4]
+    assert len(calls) == 1 and first[0][1].children == 10
+    assert isinstance(first[5], dict) and first[6][0]["age"] == 39
+
+    insert_prediction_rows([row(10)])          # nueva versión: max id cambia
+    assert dashboard.update_dashboard(5)[0][1].children == 11 and len(calls) == 2
@@ -0,0 +1,148 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_client_index.py
+# =============================================
+"""
+Pruebas del índice de clientes en memoria: carga completa, actualización
+incremental por marca (created_at, id) y equivalencia con la consulta SQL.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import psycopg2
+
+from app.models import db_model
+from app.services.client_index import ClientIndex
+
+T0 = datetime(2024, 1, 1, 12)
+
+
+class FakeClients:
+    """Tabla 'clients' en memoria con las mismas consultas que db_model."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.since_calls = []
+
+    def load_all(self):
+        return list(self.rows)
+
+    def load_since(self, created_at, client_id):
+        self.since_calls.append((created_at, client_id))
+        return sorted(r for r in self.rows if (r[5], r[0]) > (created_at, client_id))
+
+
+def _client(client_id, age, job, seconds):
+    return (client_id, age, job, "married", "tertiary", T0 + timedelta(seconds=seconds))
+
+
+def _record(age, job):
+    return {"age": age, "job": job, "marital": "married", "education": "tertiary"}
+
+
+def test_full_load_keeps_latest_client_per_key():
+    table = FakeClients([_client(1, 40, "admin.", 0), _client(2, 40, "admin.", 10), _client(3, 50, "admin.", 5)])
+    index = ClientIndex(load_all=table.load_all, load_since=table.load_since)
+    assert not index.ready
+    index.reload()
+
+    assert index.ready and len(index) == 2
+    assert index.lookup(_record(40, "admin.")) == 2
+    assert index.lookup(_record(50, "admin.")) == 3
+    assert index.lookup(_record(60, "admin.")) is None
+    assert index.stats()["watermark"]["id"] == 2
+
+
+def test_incremental_refresh_reads_from_watermark_with_overlap():
+    table = FakeClients([_client(1, 40, "admin.", 0), _client(2, 50, "admin.", 100)])
+    index = ClientIndex(overlap_seconds=5, load_all=table.load_all, load_since=table.load_since)
+    index.reload()
+
+    # Cliente nuevo para una combinación existente y otro para una nueva
+    table.rows += [_client(3, 40, "admin.", 200), _client(4, 60, "student", 201)]
+    assert index.refresh() == 2
+    assert table.since_calls[-1] == (T0 + timedelta(seconds=95), 0)
+    assert index.lookup(_record(40, "admin.")) == 3
+    assert index.lookup(_record(60, "student")) == 4
+
+    # Releer la ventana de solape no cambia nada
+    assert index.refresh() == 0
+    assert index.stats()["watermark"]["id"] == 4
+
+
+def test_late_committed_row_within_overlap_is_picked_up():
+    table = FakeClients([_client(1, 40, "admin.", 0), _client(3, 40, "admin.", 10)])
+    index = ClientIndex(overlap_seconds=5, load_all=table.load_all, load_since=table.load_since)
+    index.reload()
+
+    # Fila con created_at anterior a la marca que confirmó después de la carga
+    table.rows.append(_client(2, 45, "admin.", 8))
+    index.refresh()
+    assert index.lookup(_record(45, "admin.")) == 2
+    assert index.lookup(_record(40, "admin.")) == 3
+
+
+def test_refresh_without_load_does_full_load():
+    table = FakeClients([_client(1, 40, "admin.", 0)])
+    index = ClientIndex(load_all=table.load_all, load_since=table.load_since)
+    index.refresh()
+    assert index.ready and index.stats()["full_loads"] == 1
+
+
+def test_start_without_database_falls_back_to_sql(loaded_controller, monkeypatch):
+    from app.controllers import predict_controller
+
+    def db_down():
+        raise ConnectionError("base de datos caída")
+
+    index = ClientIndex(refresh_interval=60, load_all=db_down)
+    index.start()
+    monkeypatch.setattr(predict_controller, "client_index", index)
+    monkeypatch.setattr(predict_controller, "find_client_by_features", lambda data: 7)
+    assert predict_controller._link_client(_record(40, "admin.")) == (7, True)
+    assert index.stats()["refresh_errors"] == 1
+
+    # Con el índice cargado ya no se consulta la base de datos
+    table = FakeClients([_client(9, 40, "admin.", 0)])
+    index._load_all = table.load_all
+    index.reload()
+    assert predict_controller._link_client(_record(40, "admin.")) == (9, True)
+    assert predict_controller._link_clients([_record(40, "admin."), _record(41, "admin.")]) == [9, None]
+    index.stop()
+
+
+def test_index_matches_sql_lookup(test_db):
+    rng = random.Random(0)
+    jobs = ["admin.", "management", "student"]
+    rows = [
+        (rng.randint(30, 33), rng.choice(jobs), rng.choice(["married", "single"]), "tertiary",
+         T0 + timedelta(minutes=rng.randint(0, 5)))
+        for _ in range(300)
+    ]
+    conn = psycopg2.connect(test_db)
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT INTO clients (age, job, marital, education, created_at) VALUES (%s, %s, %s, %s, %s)", rows
+    )
+    conn.commit()
+
+    index = ClientIndex(overlap_seconds=0)
+    index.reload()
+    keys = {r[:4] for r in rows} | {(99, "admin.", "single", "tertiary")}
+    for age, job, marital, education in keys:
+        record = {"age": age, "job": job, "marital": marital, "education": education}
+        assert index.lookup(record) == db_model.find_client_by_features(record)
+
+    # Clientes nuevos: la actualización incremental solo lee las filas posteriores a la marca
+    cur.execute(
+        "INSERT INTO clients (age, job, marital, education, created_at) "
+        "VALUES (30, 'admin.', 'married', 'tertiary', %s), (77, 'student', 'single', 'tertiary', %s) RETURNING id",
+        (T0 + timedelta(hours=1), T0 + timedelta(hours=1)),
+    )
+    new_ids = [r[0] for r in cur.fetchall()]
+    conn.commit()
+    conn.close()
+
+    assert index.refresh() == 2
+    assert index.lookup({"age": 30, "job": "admin.", "marital": "married", "education": "tertiary"}) == new_ids[0]
+    assert index.lookup({"age": 77, "job": "student", "marital": "single", "education": "tertiary"}) == new_ids[1]
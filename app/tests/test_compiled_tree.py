@@ -0,0 +1,57 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_compiled_tree.py
+# =============================================
+"""
+Equivalencia aleatorizada entre CompiledTree y sklearn (predict/predict_proba).
+"""
+
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from app.services.compiled_tree import CompiledTree
+
+
+def _assert_equivalent(model, X):
+    compiled = CompiledTree.from_sklearn(model)
+    expected_class = model.predict(X)
+    expected_proba = model.predict_proba(X)[:, 1]
+
+    classes, proba = compiled.predict_many(X)
+    np.testing.assert_array_equal(classes, expected_class)
+    np.testing.assert_allclose(proba, expected_proba, rtol=0, atol=1e-12)
+
+    for i in range(len(X)):
+        c, p = compiled.predict_one(X[i])
+        assert c == expected_class[i]
+        assert abs(p - expected_proba[i]) <= 1e-12
+
+
+def test_equivalence_on_bank_dataset(bank_artifacts, trained_model):
+    df = bank_artifacts[0]
+    X = df.drop("deposit", axis=1).to_numpy(dtype=np.float64)
+    _assert_equivalent(trained_model, X)
+
+
+def test_equivalence_on_random_inputs(bank_artifacts, trained_model):
+    df = bank_artifacts[0].drop("deposit", axis=1)
+    rng = np.random.default_rng(0)
+    lo, hi = df.min().to_numpy(float), df.max().to_numpy(float)
+    X = rng.uniform(lo, hi, size=(5000, df.shape[1]))
+
+    # Valores exactamente en los umbrales y justo a cada lado
+    tree = trained_model.tree_
+    internal = np.flatnonzero(tree.children_left != -1)
+    for k, node in enumerate(internal):
+        for d, delta in enumerate((0.0, -1e-6, 1e-6)):
+            X[k * 3 + d, tree.feature[node]] = tree.threshold[node] + delta
+    _assert_equivalent(trained_model, X)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_equivalence_on_random_trees(seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(2000, 8)) * rng.uniform(1, 1000, size=8)
+    y = (X[:, 0] + rng.normal(size=2000) * X[:, 1] > 0).astype(int)
+    model = DecisionTreeClassifier(max_depth=int(rng.integers(1, 12)), random_state=seed).fit(X, y)
+    _assert_equivalent(model, rng.normal(size=(2000, 8)) * 1000)
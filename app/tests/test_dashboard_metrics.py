@@ -0,0 +1,147 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_dashboard_metrics.py
+# =============================================
+"""
+Pruebas de GET /api/dashboard/metrics servido desde prediction_summary:
+mismos valores que el cálculo anterior en pandas tras inserciones, COPY,
+cambios, borrados y cambios de clientes.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+T0 = datetime(2024, 3, 1, 8)
+
+
+def _pandas_metrics() -> dict:
+    """Cálculo anterior del endpoint: la tabla completa y el join con clients en pandas."""
+    from app.dashboards.db_utils import fetch_predictions
+    from app.database.connection import connection
+
+    df = fetch_predictions()
+    total = int(df.shape[0]) if not df.empty else 0
+    positive = int(df["result"].sum()) if not df.empty else 0
+    positive_rate = round((positive / total) * 100, 2) if total > 0 else 0.0
+    last_update = df["predicted_at"].max() if not df.empty else None
+
+    with connection() as conn:
+        df_truth = pd.read_sql("SELECT p.result AS predicted, c.deposit AS actual "
+                               "FROM predictions p JOIN clients c ON p.client_id = c.id", conn)
+    # Solo clientes con deposit 'yes' o 'no', como la matriz de confusión
+    df_truth["actual"] = df_truth["actual"].map({"yes": 1, "no": 0})
+    df_truth = df_truth[df_truth["actual"].notna()]
+    accuracy = 0
+    if not df_truth.empty:
+        accuracy = round((df_truth["predicted"] == df_truth["actual"]).mean() * 100, 2)
+    return {"total": total, "positive": positive, "positive_rate": positive_rate,
+            "accuracy": accuracy, "last_update": last_update}
+
+
+def _assert_equivalent():
+    from app.routes.dashboard_routes import _compute_metrics
+
+    expected, actual = _pandas_metrics(), _compute_metrics()
+    if expected["last_update"] is not None:
+        expected["last_update"] = expected["last_update"].to_pydatetime()
+    assert actual == expected
+
+
+def _execute(sql, params=None):
+    from app.database.connection import get_pool
+
+    with get_pool().connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+        conn.commit()
+
+
+def test_summary_matches_pandas_through_changes(test_db):
+    from app.models.db_model import copy_into, insert_prediction_rows, prediction_row
+
+    rng = random.Random(7)
+    _assert_equivalent()      # tabla vacía
+
+    clients = pd.DataFrame({
+        "age": [30 + i for i in range(12)],
+        "job": "admin.", "marital": "single", "education": "secondary", "balance": 10.0,
+        "deposit": ["yes", "no", None, "yes"] * 3,
+    })
+    copy_into([clients], "clients")
+
+    def rows(n, start):
+        return [
+            prediction_row({"age": 30, "job": "admin.", "marital": "single", "education": "secondary",
+                            "balance": 1.0}, rng.randint(0, 1), rng.choice([None, *range(1, 13)]),
+                           T0 + timedelta(minutes=start + 7 * i), "v1")
+            for i in range(n)
+        ]
+
+    insert_prediction_rows(rows(200, 0))                   # INSERT multi-fila en varias horas
+    _assert_equivalent()
+
+    copy_into([pd.DataFrame(rows(300, 1000), columns=[
+        "client_id", "age", "job", "marital", "education", "balance", "result", "model_version", "predicted_at",
+    ]).astype({"client_id": "Int64"})], "predictions")    # COPY
+    _assert_equivalent()
+
+    _execute("UPDATE predictions SET result = 1 - result WHERE id % 5 = 0")
+    _execute("UPDATE predictions SET predicted_at = predicted_at + INTERVAL '3 days' WHERE id % 11 = 0")
+    _assert_equivalent()
+
+    _execute("DELETE FROM predictions WHERE id % 7 = 0")
+    _assert_equivalent()
+
+    _execute("UPDATE clients SET deposit = 'no' WHERE deposit = 'yes'")
+    _execute("DELETE FROM clients WHERE id IN (2, 3)")      # ON DELETE SET NULL en predictions
+    _assert_equivalent()
+
+    _execute("INSERT INTO predictions (age, result) VALUES (40, 1)")  # predicted_at por defecto
+    _execute("INSERT INTO predictions (age, result, predicted_at) VALUES (41, 0, NULL)")
+    _assert_equivalent()
+
+    # Clientes vinculados con deposit NULL o 'unknown' no cuentan en ninguna de las dos accuracy
+    _execute("UPDATE clients SET deposit = 'unknown' WHERE id IN (5, 6)")
+    _assert_equivalent()
+    from app.dashboards.truth_view import TruthView
+    from app.routes.dashboard_routes import _compute_metrics
+
+    view = TruthView(max_age=3600)
+    assert view.refresh()
+    assert view.summary()["accuracy"] == _compute_metrics()["accuracy"] > 0
+
+    _execute("TRUNCATE predictions")
+    _assert_equivalent()
+
+
+def test_metrics_endpoint_reads_summary(test_db):
+    from app.main import app
+    from app.models.db_model import insert_prediction_rows, prediction_row
+
+    insert_prediction_rows([
+        prediction_row({"age": 50}, i % 2, None, T0 + timedelta(minutes=i), "v1") for i in range(10)
+    ])
+    # El endpoint no lee predictions: lo que cuenta es el resumen
+    _execute("UPDATE prediction_summary SET total = total + 990")
+    with TestClient(app) as client:
+        response = client.get("/api/dashboard/metrics")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1000 and body["positive"] == 5 and body["positive_rate"] == 0.5
+    assert body["last_update"] == (T0 + timedelta(minutes=9)).isoformat()
+
+
+def test_existing_predictions_are_backfilled(test_db):
+    from app.tests.conftest import schema_sql
+
+    _execute("ALTER TABLE predictions DISABLE TRIGGER USER")
+    _execute("INSERT INTO predictions (age, result, predicted_at) SELECT 30, g %% 2, %s FROM generate_series(1, 50) g",
+             (T0,))
+    _execute("ALTER TABLE predictions ENABLE TRIGGER USER")
+    _execute("DELETE FROM prediction_summary")
+
+    _execute(schema_sql())      # volver a aplicar el schema carga el resumen una vez
+    _assert_equivalent()
@@ -0,0 +1,100 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_dashboard_predictions.py
+# =============================================
+"""
+Pruebas de GET /api/dashboard/predictions: páginas por cursor sobre
+(predicted_at, id) sin saltos ni repeticiones, y modo stream NDJSON desde un
+cursor del servidor.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.routes.dashboard_routes import _decode_cursor, _encode_cursor
+
+T0 = datetime(2024, 5, 1, 9)
+
+
+@pytest.fixture
+def client(test_db):
+    from app.main import app
+    from app.models.db_model import insert_prediction_rows, prediction_row
+
+    # Marcas repetidas (cinco filas por segundo) y algunas sin predicted_at
+    insert_prediction_rows([
+        prediction_row({"age": 20 + i % 60, "job": "admin.", "marital": "single", "education": "primary",
+                        "balance": float(i)}, i % 2, None, T0 + timedelta(seconds=i // 5), "v1")
+        for i in range(537)
+    ])
+    from app.tests.test_dashboard_metrics import _execute
+    _execute("INSERT INTO predictions (age, result, predicted_at) SELECT 30, 1, NULL FROM generate_series(1, 4)")
+
+    with TestClient(app) as client:
+        yield client
+
+
+def _expected_ids():
+    from app.database.connection import connection
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM predictions ORDER BY predicted_at DESC NULLS FIRST, id DESC")
+            return [row[0] for row in cur.fetchall()]
+
+
+def test_cursor_round_trip():
+    row = (42, None, None, None, None, None, None, datetime(2024, 5, 1, 9, 30, 0, 123456))
+    assert _decode_cursor(_encode_cursor(row)) == (row[-1], 42)
+    assert _decode_cursor(_encode_cursor((7, *[None] * 7))) == (None, 7)
+    with pytest.raises(ValueError):
+        _decode_cursor("no-es-un-cursor")
+
+
+def test_pages_cover_the_table_once(client):
+    expected = _expected_ids()
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 50, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/dashboard/predictions", params=params).json()
+        seen += [p["id"] for p in body["predictions"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected and pages == 11
+    assert len(body["predictions"]) == 541 - 500
+
+
+def test_default_and_maximum_page_size(client, monkeypatch):
+    from app.routes import dashboard_routes
+
+    body = client.get("/api/dashboard/predictions").json()
+    assert len(body["predictions"]) == dashboard_routes.DASHBOARD_PAGE_SIZE and body["next_cursor"]
+    assert body["predictions"][0]["predicted_at"] is None    # las filas sin fecha van primero
+
+    monkeypatch.setattr(dashboard_routes, "DASHBOARD_PAGE_MAX", 30)
+    assert len(client.get("/api/dashboard/predictions", params={"limit": 1000}).json()["predictions"]) == 30
+    assert client.get("/api/dashboard/predictions", params={"cursor": "%%%"}).status_code == 400
+
+
+def test_stream_from_server_side_cursor(client, monkeypatch):
+    from app.database.connection import get_pool
+    from app.routes import dashboard_routes
+
+    monkeypatch.setattr(dashboard_routes, "DASHBOARD_STREAM_BATCH_ROWS", 64)
+    response = client.get("/api/dashboard/predictions", params={"stream": "true"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["id"] for r in rows] == _expected_ids()
+    assert rows[-1]["predicted_at"] == T0.isoformat() and set(rows[0]) == set(dashboard_routes.PAGE_COLUMNS)
+
+    # Desde un cursor de página y con límite
+    page = client.get("/api/dashboard/predictions", params={"limit": 10}).json()
+    streamed = client.get("/api/dashboard/predictions",
+                          params={"stream": "true", "cursor": page["next_cursor"], "limit": 25}).text.splitlines()
+    assert [json.loads(line)["id"] for line in streamed] == _expected_ids()[10:35]
+    assert get_pool().stats()["in_use"] == 0      # la conexión del cursor volvió al pool
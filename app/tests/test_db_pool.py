@@ -0,0 +1,178 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_db_pool.py
+# =============================================
+"""
+Pruebas del pool de conexiones compartido (app/database/connection.py)
+y de las funciones de db_model que lo usan, contra un PostgreSQL local.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+
+import psycopg2
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from app.database import connection
+from app.database.connection import ConnectionPool, DatabaseNotConfigured, PoolTimeout, get_pool
+from app.models import db_model
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _backend_pid(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_backend_pid()")
+        return cur.fetchone()[0]
+
+
+def test_connections_are_reused(test_db):
+    pool = ConnectionPool(test_db, min_size=1, max_size=2)
+    with pool.connection() as conn:
+        first = _backend_pid(conn)
+    with pool.connection() as conn:
+        assert _backend_pid(conn) == first
+    assert pool.stats()["created"] == 1
+    pool.close()
+
+
+def test_waits_and_times_out_when_exhausted(test_db):
+    pool = ConnectionPool(test_db, min_size=0, max_size=2, timeout=0.2)
+    a, b = pool.getconn(), pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+
+    # Al devolver una conexión, un hilo en espera la recibe
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.getconn()))
+    pool.timeout = 5
+    waiter.start()
+    pool.putconn(a)
+    waiter.join()
+    assert got == [a]
+    pool.putconn(b)
+    pool.putconn(got[0])
+    pool.close()
+
+
+def test_broken_connection_is_replaced_after_healthcheck(test_db):
+    pool = ConnectionPool(test_db, min_size=1, max_size=2, healthcheck_after=0)
+    with pool.connection() as conn:
+        pid = _backend_pid(conn)
+
+    admin = psycopg2.connect(test_db)
+    admin.autocommit = True
+    admin.cursor().execute("SELECT pg_terminate_backend(%s)", (pid,))
+    admin.close()
+
+    with pool.connection() as conn:
+        assert _backend_pid(conn) != pid
+    assert pool.stats()["discarded"] == 1
+    pool.close()
+
+
+def test_idle_connections_above_minimum_are_recycled(test_db):
+    clock = FakeClock()
+    pool = ConnectionPool(test_db, min_size=1, max_size=3, idle_timeout=60, clock=clock)
+    conns = [pool.getconn() for _ in range(3)]
+    for conn in conns:
+        pool.putconn(conn)
+    assert pool.stats()["open"] == 3
+
+    clock.now = 61
+    pool.putconn(pool.getconn())
+    stats = pool.stats()
+    assert (stats["open"], stats["recycled"]) == (1, 2)
+    assert sum(conn.closed != 0 for conn in conns) == 2
+    pool.close()
+
+
+def test_open_transactions_are_rolled_back_on_return(test_db):
+    pool = ConnectionPool(test_db, min_size=1, max_size=1)
+    conn = pool.getconn()
+    conn.cursor().execute("INSERT INTO clients (age, job) VALUES (30, 'student')")
+    pool.putconn(conn)
+
+    with pool.connection() as conn:
+        assert conn.get_transaction_status() == TRANSACTION_STATUS_IDLE
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM clients")
+            assert cur.fetchone()[0] == 0
+    pool.close()
+
+
+def test_pool_is_thread_safe(test_db):
+    pool = ConnectionPool(test_db, min_size=1, max_size=3)
+    peak, errors, lock = [0], [], threading.Lock()
+
+    def work():
+        try:
+            for _ in range(20):
+                with pool.connection() as conn:
+                    with lock:
+                        peak[0] = max(peak[0], pool.stats()["in_use"])
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert peak[0] <= 3
+    assert pool.stats()["open"] <= 3
+    pool.close()
+
+
+def test_db_model_uses_shared_pool(test_db):
+    conn = psycopg2.connect(test_db)
+    conn.cursor().execute(
+        "INSERT INTO clients (age, job, marital, education, deposit) VALUES "
+        "(45, 'management', 'married', 'tertiary', 'yes'), (45, 'management', 'married', 'tertiary', 'no')"
+    )
+    conn.commit()
+    conn.close()
+
+    record = {"age": 45, "job": "management", "marital": "married", "education": "tertiary", "balance": 1200.0}
+    client_id = db_model.find_client_by_features(record)
+    assert client_id is not None
+    db_model.save_prediction(record, 1, client_id)
+
+    other = {**record, "job": "student"}
+    assert db_model.find_clients_by_features([record, other]) == [client_id, None]
+    db_model.save_predictions([record, other], [0, 1], [client_id, None])
+
+    with get_pool().connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT client_id, result FROM predictions ORDER BY id")
+            assert cur.fetchall() == [(client_id, 1), (client_id, 0), (None, 1)]
+    assert get_pool().stats()["created"] == 1
+
+
+def test_missing_dsn_fails_loudly(monkeypatch):
+    # Sin DATABASE_URL ni DB_PASSWORD no se arma un DSN con credenciales por defecto
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL" and not k.startswith("DB_")}
+    code = "from app.config import DATABASE_URL; print(DATABASE_URL)"
+    assert subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True).stdout == "None\n"
+    composed = subprocess.run([sys.executable, "-c", code], env={**env, "DB_PASSWORD": "s3creta", "DB_HOST": "db"},
+                              capture_output=True, text=True).stdout
+    assert composed == "postgresql://postgres:s3creta@db:5432/bank_marketing\n"
+
+    monkeypatch.setattr(connection, "DATABASE_URL", None)
+    monkeypatch.setattr(connection, "_pool", None)
+    with pytest.raises(DatabaseNotConfigured, match="DATABASE_URL o DB_PASSWORD"):
+        get_pool()
+    with pytest.raises(DatabaseNotConfigured):
+        db_model.get_connection()
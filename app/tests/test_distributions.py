@@ -0,0 +1,189 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_distributions.py
+# =============================================
+"""
+Pruebas de las distribuciones contadas en SQL: mismos conteos que
+numpy.histogram y value_counts sobre las filas, y GET /api/dashboard/distribution.
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dashboards.components.distribution_plots import create_balance_distribution, create_job_distribution
+from app.dashboards.distributions import distribution
+
+JOBS = ["admin.", "blue-collar", "management", "retired", "student", None]
+
+
+def _load(seed=13, n=2500):
+    from app.models.db_model import copy_into, insert_prediction_rows, prediction_row
+
+    rng = random.Random(seed)
+    insert_prediction_rows([
+        prediction_row({"age": rng.randint(18, 95), "job": rng.choice(JOBS), "marital": "single",
+                        "education": rng.choice(["primary", "secondary", "tertiary"]),
+                        "balance": rng.choice([None, round(rng.gauss(1500, 3000), 2)])},
+                       rng.randint(0, 1), None, None, "v1")
+        for _ in range(n)
+    ])
+    copy_into([pd.DataFrame({"age": [40] * 50, "duration": [rng.randint(0, 3000) for _ in range(50)]})], "clients")
+
+
+def _rows(table, column) -> pd.Series:
+    from app.database.connection import connection
+
+    with connection() as conn:
+        return pd.read_sql(f'SELECT "{column}" FROM {table}', conn)[column]
+
+
+@pytest.mark.parametrize("source,column,bins", [
+    ("predictions", "age", 20),
+    ("predictions", "balance", 30),
+    ("clients", "duration", 7),
+])
+def test_histogram_matches_numpy(test_db, source, column, bins):
+    _load()
+    dist = distribution(column, source, bins)
+    values = _rows(source, column).dropna().astype(float)
+    counts, edges = np.histogram(values, bins=bins, range=(values.min(), values.max()))
+
+    assert dist["counts"] == counts.tolist() and dist["total"] == len(values)
+    assert dist["edges"] == pytest.approx(edges.tolist())
+    assert len(create_balance_distribution(dist).data[0].y) == bins
+
+
+def test_age_summary_follows_changes(test_db):
+    from app.tests.test_dashboard_metrics import _execute
+
+    _load()
+    _execute("UPDATE predictions SET age = age + 3 WHERE id % 5 = 0")
+    _execute("DELETE FROM predictions WHERE age > 90 OR id % 7 = 0")
+    _execute("INSERT INTO predictions (age, result) VALUES (17, 1), (NULL, 0)")
+    values = _rows("predictions", "age").dropna().astype(float)
+    for bins in (7, 20, 77):
+        counts, _ = np.histogram(values, bins=bins, range=(values.min(), values.max()))
+        assert distribution("age", bins=bins)["counts"] == counts.tolist()
+
+    _execute("TRUNCATE predictions")
+    assert distribution("age")["total"] == 0
+
+
+def test_histogram_ignores_rows_inserted_between_queries(test_db, monkeypatch):
+    import contextlib
+
+    import psycopg2
+
+    from app.dashboards import db_utils
+
+    _load(n=200)
+    expected = distribution("balance", bins=10)
+    real_connection = db_utils.connection
+
+    class Cursor:
+        # Tras leer mínimo y máximo, otra sesión inserta saldos fuera de ese rango
+        def __init__(self, cursor):
+            self.cursor = cursor
+
+        def __getattr__(self, name):
+            return getattr(self.cursor, name)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.cursor.close()
+
+        def execute(self, sql, params=None):
+            self.cursor.execute(sql, params)
+            if "min(" in sql:
+                other = psycopg2.connect(test_db)
+                other.cursor().execute("INSERT INTO predictions (balance, result) VALUES (-1e9, 0), (1e9, 1)")
+                other.commit()
+                other.close()
+
+    @contextlib.contextmanager
+    def connection():
+        with real_connection() as conn:
+            yield type("Conn", (), {"cursor": lambda self: Cursor(conn.cursor())})()
+
+    monkeypatch.setattr(db_utils, "connection", connection)
+    assert distribution("balance", bins=10) == expected
+    monkeypatch.undo()
+    after = distribution("balance", bins=10)
+    assert after["total"] == expected["total"] + 2 and after["edges"][0] == -1e9 and after["edges"][-1] == 1e9
+
+    # Un intervalo fuera de 1..bins no se suma a ninguno
+    monkeypatch.setattr(db_utils, "connection", lambda: _FakeConnection([(0.0, 10.0)], [(0, 3), (1, 2)]))
+    with pytest.raises(RuntimeError):
+        db_utils.fetch_histogram("predictions", "balance", 5)
+
+
+class _FakeConnection:
+    def __init__(self, *results):
+        self.results = list(results)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        if sql.startswith("SELECT"):
+            self.rows = self.results.pop(0)
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_category_counts_match_value_counts(test_db):
+    _load()
+    dist = distribution("job")
+    expected = _rows("predictions", "job").value_counts()
+
+    assert dict(zip(dist["categories"], dist["counts"])) == expected.to_dict()
+    assert dist["counts"] == sorted(dist["counts"], reverse=True) and dist["total"] == expected.sum()
+    assert list(create_job_distribution(dist).data[0].values) == dist["counts"]
+
+
+def test_constant_and_empty_columns():
+    constant = distribution("age", bins=5, load_histogram=lambda *a: (40.0, 40.0, [12, 0, 0, 0, 0]))
+    assert constant["edges"] == [40.0] * 6 and constant["counts"][0] == 12
+
+    empty = distribution("balance", load_histogram=lambda *a: (None, None, []))
+    assert empty["edges"] == [] and empty["total"] == 0
+    assert distribution("job", load_counts=lambda *a: [])["categories"] == []
+
+    for kwargs in ({"column": "id"}, {"column": "age", "source": "users"}, {"column": "age", "bins": 0}):
+        with pytest.raises(ValueError):
+            distribution(**kwargs)
+
+
+def test_distribution_endpoint(test_db):
+    from app.main import app
+
+    _load(n=300)
+    with TestClient(app) as client:
+        age = client.get("/api/dashboard/distribution/age", params={"bins": 10}).json()
+        education = client.get("/api/dashboard/distribution/education").json()
+        duration = client.get("/api/dashboard/distribution/duration", params={"source": "clients"}).json()
+        statuses = [client.get(url).status_code for url in (
+            "/api/dashboard/distribution/duration",          # duration solo existe en clients
+            "/api/dashboard/distribution/age?bins=100000",
+            "/api/dashboard/distribution/age?source=evaluation_metrics",
+        )]
+
+    assert age["kind"] == "numeric" and len(age["counts"]) == 10 and age["total"] == 300
+    assert education["kind"] == "categorical" and sum(education["counts"]) == 300
+    assert duration["total"] == 50 and len(duration["edges"]) == 31
+    assert statuses == [400, 400, 400]
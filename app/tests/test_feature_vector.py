@@ -0,0 +1,77 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_feature_vector.py
+# =============================================
+"""
+Paridad de FeatureVectorBuilder con la codificación anterior basada en pandas
+(DataFrame + LabelEncoder.transform por columna + reindex) sobre todo bank.csv.
+"""
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_preprocessing import DEFAULT_VALUES
+from app.services.feature_vector import FeatureVectorBuilder, UNKNOWN_CODE
+
+DATA_PATH = "app/data/raw/bank.csv"
+
+
+def _pandas_encode(records, label_encoders, feature_names):
+    """Ruta anterior de make_prediction, aplicada a uno o varios registros."""
+    processed = []
+    for data in records:
+        row = dict(data)
+        for col in DEFAULT_VALUES:
+            if col not in row or row[col] is None:
+                row[col] = DEFAULT_VALUES[col]
+        processed.append(row)
+
+    df = pd.DataFrame(processed)
+    for col in df.columns:
+        if col in label_encoders and not pd.api.types.is_numeric_dtype(df[col]):
+            try:
+                df[col] = label_encoders[col].transform(df[col].astype(str))
+            except ValueError:
+                df[col] = 0
+    feature_cols = [col for col in feature_names if col != "deposit"]
+    return df.reindex(columns=feature_cols, fill_value=0).to_numpy(dtype=np.float64)
+
+
+def _records():
+    return pd.read_csv(DATA_PATH).drop(columns=["deposit"]).to_dict("records")
+
+
+def test_matrix_parity_on_full_dataset(bank_artifacts):
+    _, label_encoders, _, feature_names = bank_artifacts
+    builder = FeatureVectorBuilder.from_encoders(label_encoders, feature_names)
+    records = _records()
+
+    expected = _pandas_encode(records, label_encoders, feature_names)
+    np.testing.assert_array_equal(builder.build_matrix(records), expected)
+
+
+def test_row_parity_on_full_dataset(bank_artifacts):
+    _, label_encoders, _, feature_names = bank_artifacts
+    builder = FeatureVectorBuilder.from_encoders(label_encoders, feature_names)
+    records = _records()
+
+    expected = _pandas_encode(records, label_encoders, feature_names)
+    for i, record in enumerate(records):
+        np.testing.assert_array_equal(builder.build_row(record)[0], expected[i])
+
+
+def test_unknown_categories_and_missing_fields(bank_artifacts):
+    _, label_encoders, _, feature_names = bank_artifacts
+    builder = FeatureVectorBuilder.from_encoders(label_encoders, feature_names)
+    record = _records()[0]
+    record["job"] = "astronaut"
+    del record["poutcome"]
+    record["balance"] = None
+
+    unknown = []
+    row = builder.build_row(record, unknown)[0].copy()
+    assert unknown == ["job"]
+    assert row[builder.feature_cols.index("job")] == UNKNOWN_CODE
+
+    expected = _pandas_encode([record], label_encoders, feature_names)[0]
+    np.testing.assert_array_equal(row, expected)
+    np.testing.assert_array_equal(builder.build_matrix([record])[0], expected)
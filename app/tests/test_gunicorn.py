@@ -0,0 +1,61 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_gunicorn.py
+# =============================================
+"""
+Pruebas del modo de producción con gunicorn: configuración, calentamiento
+por worker y modelo precargado en el maestro y compartido por los workers.
+"""
+
+import os
+import sys
+
+import httpx
+import pytest
+
+from app.benchmarks.worker_scaling import ADMIN_TOKEN, start_gunicorn
+
+
+def test_config_preloads_uvicorn_workers():
+    from app import gunicorn_conf
+
+    assert gunicorn_conf.preload_app is True
+    assert gunicorn_conf.wsgi_app == "app.main:app"
+    assert gunicorn_conf.worker_class.endswith("UvicornWorker")
+    assert gunicorn_conf.workers >= 1 and gunicorn_conf.max_requests > 0
+
+
+def test_warm_up_worker_leaves_no_trace(loaded_controller):
+    from app.controllers import predict_controller
+    from app.services.metrics import PREDICT_STAGE_SECONDS
+
+    observed = PREDICT_STAGE_SECONDS.count("predict", "single")
+    report = predict_controller.warm_up_worker(rounds=5)
+
+    assert report["pid"] == os.getpid() and report["model_version"] == "test" and report["rounds"] == 5
+    assert predict_controller.get_model_info()["warm_up"] == report
+    # Ni caché, ni base de datos, ni métricas de solicitudes
+    assert loaded_controller == []
+    assert predict_controller.prediction_cache.stats()["size"] == 0
+    assert PREDICT_STAGE_SECONDS.count("predict", "single") == observed
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="gunicorn y /proc solo en Linux")
+def test_workers_share_preloaded_model():
+    process, url = start_gunicorn(workers=2, preload=True, db_latency=0.0, cache_size=0)
+    try:
+        infos = {}
+        with httpx.Client(base_url=url, headers={"X-Admin-Token": ADMIN_TOKEN}) as client:
+            for _ in range(40):
+                info = client.get("/api/admin/model").json()
+                infos[info["pid"]] = info
+                if len(infos) == 2:
+                    break
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    assert set(infos) and process.pid not in infos
+    for info in infos.values():
+        # Cargado una vez en el maestro y calentado en cada worker
+        assert info["preloaded"] and info["startup"]["pid"] == process.pid
+        assert info["warm_up"]["pid"] == info["pid"] and info["warm_up"]["rounds"] > 0
@@ -0,0 +1,63 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_load_test.py
+# =============================================
+"""
+Pruebas del generador de carga: lectura de JSON lines, modos de concurrencia
+y de tasa contra la app en proceso, y comparación de reportes.
+"""
+
+import asyncio
+
+import pytest
+
+from app.benchmarks.load_test import batch_bodies, compare, read_jsonl, run_load
+
+RECORD = {
+    "age": 45, "job": "management", "marital": "married", "education": "tertiary",
+    "balance": 1200.0, "housing": "yes", "loan": "no", "contact": "cellular",
+    "day": 12, "month": "may", "duration": 300, "campaign": 2, "pdays": -1, "previous": 0,
+}
+
+
+def test_read_jsonl_skips_bad_lines(tmp_path):
+    path = tmp_path / "solicitudes.jsonl"
+    path.write_text('{"age": 30}\n\n{roto\n[1, 2]\n{"age": 31}\n', encoding="utf-8")
+    bodies, skipped = read_jsonl(str(path))
+    assert bodies == [{"age": 30}, {"age": 31}] and skipped == 2
+    assert batch_bodies(list(range(5)), 2) == [{"records": [0, 1]}, {"records": [2, 3]}, {"records": [4]}]
+
+
+def test_concurrency_mode_reports_latency_and_errors(loaded_controller):
+    from app.main import app
+
+    bodies = [RECORD, {**RECORD, "age": 52}, {**RECORD, "age": -1}]   # la última es inválida (422)
+    report = asyncio.run(run_load(bodies, app=app, concurrency=4, n_requests=30))
+
+    assert report["requests"] == 30
+    assert report["status_codes"] == {"200": 20, "422": 10}
+    assert report["errors"] == 10 and report["error_rate"] == pytest.approx(1 / 3, abs=1e-6)
+    latency = report["latency_ms"]
+    assert 0 < latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+    assert report["throughput_rps"] > 0
+
+
+def test_rate_mode_follows_schedule(loaded_controller):
+    from app.main import app
+
+    report = asyncio.run(run_load([RECORD], app=app, rate=100, duration=0.3))
+    assert report["requests"] == 30 and report["errors"] == 0
+    # 30 solicitudes a 100/s: al menos ~0.29 s desde la primera
+    assert report["elapsed_s"] >= 0.28
+
+
+def test_mode_is_required():
+    with pytest.raises(ValueError):
+        asyncio.run(run_load([RECORD], app=object()))
+
+
+def test_compare_reports():
+    baseline = {"throughput_rps": 100.0, "error_rate": 0.01, "latency_ms": {"p50": 10.0, "p95": 20.0, "p99": 40.0}}
+    current = {"throughput_rps": 120.0, "error_rate": 0.0, "latency_ms": {"p50": 8.0, "p95": 20.0, "p99": 50.0}}
+    assert compare(current, baseline) == {
+        "throughput_rps": 0.2, "error_rate": -0.01, "latency_p50": -0.2, "latency_p95": 0.0, "latency_p99": 0.25,
+    }
@@ -0,0 +1,126 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_metrics.py
+# =============================================
+"""
+Pruebas de las métricas: histogramas de buckets fijos, formato de texto de
+Prometheus, instrumentación de la predicción y endpoint /metrics.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.services.metrics import (
+    PREDICT_ERRORS,
+    PREDICT_REQUESTS,
+    PREDICT_STAGE_SECONDS,
+    MetricsRegistry,
+)
+
+RECORD = {
+    "age": 45, "job": "management", "marital": "married", "education": "tertiary",
+    "balance": 1200.0, "housing": "yes", "loan": "no", "contact": "cellular",
+    "day": 12, "month": "may", "duration": 300, "campaign": 2, "pdays": -1, "previous": 0,
+}
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latencia", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "encode")
+    counter = registry.counter("errors_total", "Errores", ("type",))
+    counter.inc('db "link"')
+
+    text = registry.render()
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{stage="encode",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{stage="encode",le="1"} 3' in text
+    assert 'latency_seconds_bucket{stage="encode",le="+Inf"} 4' in text
+    assert 'latency_seconds_sum{stage="encode"} 3.65' in text
+    assert 'latency_seconds_count{stage="encode"} 4' in text
+    assert 'errors_total{type="db \\"link\\""} 1' in text
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    histogram = registry.histogram("latency_seconds", "Latencia")
+    counter = registry.counter("requests_total", "Solicitudes")
+    with histogram.time():
+        counter.inc()
+    assert histogram.count() == 0 and counter.value() == 0
+
+
+def test_callback_metrics_are_read_at_scrape_time():
+    registry = MetricsRegistry()
+    state = {"depth": 3}
+    registry.callback("queue_depth", "Profundidad", lambda: state["depth"])
+    registry.callback("model_info", "Modelo", lambda: {("v1",): 1}, labelnames=("version",))
+    registry.callback("missing", "Sin valor", lambda: None)
+    state["depth"] = 5
+
+    text = registry.render()
+    assert "queue_depth 5" in text
+    assert 'model_info{version="v1"} 1' in text
+    assert "missing " not in text.replace("# HELP missing", "").replace("# TYPE missing", "")
+
+
+def test_prediction_stages_are_timed(loaded_controller, monkeypatch):
+    from app.controllers import predict_controller
+
+    stages = ("normalize", "cache_lookup", "encode", "predict", "link_client", "save", "total")
+    before = {stage: PREDICT_STAGE_SECONDS.count(stage, "single") for stage in stages}
+    ok, cached = PREDICT_REQUESTS.value("single", "ok"), PREDICT_REQUESTS.value("single", "cached")
+
+    predict_controller.make_prediction(dict(RECORD))
+    predict_controller.make_prediction(dict(RECORD))
+
+    after = {stage: PREDICT_STAGE_SECONDS.count(stage, "single") for stage in stages}
+    # La segunda solicitud sale de la caché: no codifica, no predice ni vincula
+    assert {stage: after[stage] - before[stage] for stage in stages} == {
+        "normalize": 2, "cache_lookup": 2, "encode": 1, "predict": 1, "link_client": 1, "save": 2, "total": 2,
+    }
+    assert PREDICT_REQUESTS.value("single", "ok") == ok + 1
+    assert PREDICT_REQUESTS.value("single", "cached") == cached + 1
+
+    batch = PREDICT_STAGE_SECONDS.count("predict", "batch")
+    predict_controller.make_batch_prediction([dict(RECORD)] * 3)
+    assert PREDICT_STAGE_SECONDS.count("predict", "batch") == batch + 1
+
+
+def test_errors_are_counted_by_type(loaded_controller, monkeypatch):
+    from app.controllers import predict_controller
+
+    def db_down(*args):
+        raise ConnectionError("base de datos caída")
+
+    monkeypatch.setattr(predict_controller, "find_client_by_features", db_down)
+    db_link, unknown = PREDICT_ERRORS.value("db_link"), PREDICT_ERRORS.value("unknown_category")
+    predict_controller.make_prediction({**RECORD, "job": "astronaut"})
+    assert PREDICT_ERRORS.value("db_link") == db_link + 1
+    assert PREDICT_ERRORS.value("unknown_category") == unknown + 1
+
+    monkeypatch.setattr(predict_controller, "save_prediction", db_down)
+    db_save, failed = PREDICT_ERRORS.value("db_save"), PREDICT_REQUESTS.value("single", "error")
+    try:
+        predict_controller.make_prediction({**RECORD, "age": 46})
+    except Exception:
+        pass
+    assert PREDICT_ERRORS.value("db_save") == db_save + 1
+    assert PREDICT_REQUESTS.value("single", "error") == failed + 1
+
+
+def test_metrics_endpoint(loaded_controller):
+    from app.main import app
+
+    client = TestClient(app)
+    assert client.post("/api/predict", json=RECORD).status_code == 200
+    assert client.post("/api/predict", json={**RECORD, "age": -1}).status_code == 422
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'bank_http_requests_total{method="POST",route="/api/predict",status="200"}' in text
+    assert 'bank_http_requests_total{method="POST",route="/api/predict",status="422"}' in text
+    assert 'bank_predict_stage_seconds_bucket{stage="encode",path="single",le="+Inf"}' in text
+    assert 'bank_model_info{version="test"} 1' in text
+    assert "bank_prediction_cache_misses_total" in text
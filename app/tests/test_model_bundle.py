@@ -0,0 +1,89 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_model_bundle.py
+# =============================================
+"""
+Pruebas del bundle de artefactos: ida y vuelta, equivalencia de predicciones,
+checksum y mapeo en memoria de los arrays del árbol.
+"""
+
+import os
+import re
+
+import numpy as np
+import pytest
+
+from app.services.data_preprocessing import DEFAULT_VALUES
+from app.services.feature_vector import FeatureVectorBuilder
+from app.services.model_bundle import BundleError, load_bundle, save_bundle
+
+
+@pytest.fixture
+def bundle_path(tmp_path, bank_artifacts, trained_model):
+    _, label_encoders, _, feature_names = bank_artifacts
+    path = str(tmp_path / "model_bundle.bin")
+    save_bundle(path, trained_model, label_encoders, feature_names, metrics={"accuracy": 0.8})
+    return path
+
+
+def test_manifest_describes_artifacts(bundle_path, bank_artifacts, trained_model):
+    _, label_encoders, _, feature_names = bank_artifacts
+    bundle = load_bundle(bundle_path)
+    manifest = bundle.manifest
+
+    assert manifest["feature_names"] == [c for c in feature_names if c != "deposit"]
+    assert manifest["categories"]["job"] == list(label_encoders["job"].classes_)
+    assert manifest["default_values"] == DEFAULT_VALUES
+    assert manifest["classes"] == trained_model.classes_.tolist()
+    assert manifest["metrics"] == {"accuracy": 0.8}
+    assert re.fullmatch(r"\d{8}-\d{6}-[0-9a-f]{8}", bundle.version)
+    # Escritura atómica: no quedan temporales junto al bundle
+    assert os.listdir(os.path.dirname(bundle_path)) == ["model_bundle.bin"]
+
+
+def test_predictions_match_trained_model(bundle_path, bank_artifacts, trained_model):
+    df, label_encoders, _, feature_names = bank_artifacts
+    bundle = load_bundle(bundle_path)
+    X = df.drop("deposit", axis=1).to_numpy(dtype=np.float64)
+
+    classes, proba = bundle.compiled_tree().predict_many(X)
+    np.testing.assert_array_equal(classes, trained_model.predict(X))
+    np.testing.assert_allclose(proba, trained_model.predict_proba(X)[:, 1], rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(bundle.sklearn_model().predict(X), trained_model.predict(X))
+
+    # El builder del bundle codifica igual que el creado desde los LabelEncoder
+    records = df.drop("deposit", axis=1).head(200).to_dict("records")
+    expected = FeatureVectorBuilder.from_encoders(label_encoders, feature_names)
+    for col, le in label_encoders.items():
+        if col != "deposit":
+            for r in records:
+                r[col] = le.classes_[r[col]]
+    np.testing.assert_array_equal(bundle.feature_builder().build_matrix(records), expected.build_matrix(records))
+
+
+def test_tree_arrays_are_memory_mapped(bundle_path):
+    bundle = load_bundle(bundle_path)
+    for name in ("children_left", "children_right", "feature", "threshold", "value"):
+        array = bundle.arrays[name]
+        assert not array.flags.owndata and not array.flags.writeable
+    # El evaluador compilado usa los arrays del mapeo sin copiarlos
+    assert np.shares_memory(bundle.compiled_tree().threshold, bundle.arrays["threshold"])
+    if os.path.exists("/proc/self/maps"):
+        with open("/proc/self/maps") as f:
+            assert os.path.realpath(bundle_path) in f.read()
+
+
+def test_corrupted_bundle_is_rejected(bundle_path):
+    with open(bundle_path, "r+b") as f:
+        f.seek(-10, os.SEEK_END)
+        byte = f.read(1)
+        f.seek(-10, os.SEEK_END)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    with pytest.raises(BundleError, match="checksum"):
+        load_bundle(bundle_path)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "model_dt.pkl"
+    path.write_bytes(b"\x80\x04not a bundle at all")
+    with pytest.raises(BundleError):
+        load_bundle(str(path))
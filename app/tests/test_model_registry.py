@@ -0,0 +1,169 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_model_registry.py
+# =============================================
+"""
+Pruebas de la recarga en caliente del modelo: cambio atómico de versión,
+bundle inválido, vigilancia del fichero, solicitudes en curso, endpoint de
+administración y versión guardada con cada predicción.
+"""
+
+import time
+from datetime import datetime
+
+import psycopg2
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.tree import DecisionTreeClassifier
+
+from app.models import db_model
+from app.services.model_bundle import save_bundle
+from app.services.model_registry import ModelRegistry
+
+RECORD = {
+    "age": 45, "job": "management", "marital": "married", "education": "tertiary",
+    "balance": 1200.0, "housing": "yes", "loan": "no", "contact": "cellular",
+    "day": 12, "month": "may", "duration": 300, "campaign": 2, "pdays": -1, "previous": 0,
+}
+
+
+@pytest.fixture(scope="module")
+def write_bundle(bank_artifacts):
+    """Escribe en 'path' el bundle de un árbol con la profundidad indicada y retorna su versión."""
+    df, label_encoders, _, feature_names = bank_artifacts
+    models = {}
+
+    def write(path, max_depth):
+        if max_depth not in models:
+            model = DecisionTreeClassifier(max_depth=max_depth, random_state=42)
+            models[max_depth] = model.fit(df.drop("deposit", axis=1), df["deposit"])
+        return save_bundle(str(path), models[max_depth], label_encoders, feature_names)["version"]
+
+    return write
+
+
+def test_reload_swaps_model(tmp_path, write_bundle):
+    path = tmp_path / "model_bundle.bin"
+    v1 = write_bundle(path, 3)
+    registry = ModelRegistry(str(path))
+    assert registry.reload()["status"] == "loaded"
+    first = registry.current
+    assert first.version == v1 and first.evaluator == "compiled"
+
+    assert registry.reload() == {"status": "unchanged", "version": v1}
+    assert registry.current is first
+    assert registry.reload(force=True)["status"] == "loaded"
+    assert registry.current is not first and registry.current.version == v1
+
+    v2 = write_bundle(path, 6)
+    result = registry.reload()
+    assert result["status"] == "loaded" and result["previous_version"] == v1
+    assert registry.current.version == v2
+    assert [h["status"] for h in registry.stats()["history"]] == ["loaded", "loaded", "loaded"]
+
+
+def test_invalid_bundle_keeps_previous_model(tmp_path, write_bundle):
+    path = tmp_path / "model_bundle.bin"
+    v1 = write_bundle(path, 3)
+    registry = ModelRegistry(str(path))
+    registry.reload()
+    active = registry.current
+
+    # Fichero a medio copiar: el checksum no coincide
+    data = path.read_bytes()
+    path.write_bytes(data[:-100])
+    result = registry.reload()
+    assert result["status"] == "failed" and "checksum" in result["error"]
+    assert registry.current is active and result["version"] == v1
+    assert registry.stats()["failed_reloads"] == 1
+    # El mismo fichero inválido no se reintenta en cada comprobación
+    assert registry.check_for_update() is None
+
+
+def test_watcher_picks_up_replaced_bundle(tmp_path, write_bundle):
+    path = tmp_path / "model_bundle.bin"
+    write_bundle(path, 3)
+    registry = ModelRegistry(str(path), watch_interval=0.02)
+    registry.reload()
+    registry.start_watching()
+    try:
+        v2 = write_bundle(path, 6)
+        deadline = time.monotonic() + 5
+        while registry.current.version != v2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert registry.current.version == v2
+        assert registry.stats()["watching"]
+    finally:
+        registry.stop_watching()
+    assert not registry.stats()["watching"]
+
+
+def test_in_flight_request_finishes_with_its_model(tmp_path, write_bundle, loaded_controller, monkeypatch):
+    from app.controllers import predict_controller
+
+    path = tmp_path / "model_bundle.bin"
+    v1 = write_bundle(path, 3)
+    registry = ModelRegistry(str(path))
+    registry.reload()
+    monkeypatch.setattr(predict_controller, "model_registry", registry)
+
+    expected = predict_controller.make_prediction(dict(RECORD))
+    assert expected["model_version"] == v1
+
+    # La solicitud ya tomó su modelo cuando llega la recarga
+    active, processed, _, _ = predict_controller._start_prediction(dict(RECORD))
+    v2 = write_bundle(path, 6)
+    registry.reload()
+    assert active.version == v1 and registry.current.version == v2
+    prediction_num, probability = predict_controller._predict_one(active, processed)
+    assert expected["probability"] == probability
+
+    # Las siguientes ya usan el modelo nuevo, y la caché no mezcla versiones
+    assert predict_controller.make_prediction(dict(RECORD))["model_version"] == v2
+    batch = predict_controller.make_batch_prediction([dict(RECORD)])
+    assert batch[0]["model_version"] == v2
+
+
+def test_admin_reload_endpoint(tmp_path, write_bundle, loaded_controller, monkeypatch):
+    from app.controllers import predict_controller
+    from app.main import app
+    from app.routes import admin_routes
+
+    path = tmp_path / "model_bundle.bin"
+    v1 = write_bundle(path, 3)
+    registry = ModelRegistry(str(path))
+    monkeypatch.setattr(predict_controller, "model_registry", registry)
+    client = TestClient(app)
+
+    # Sin ADMIN_TOKEN las rutas quedan cerradas
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", None)
+    assert client.post("/api/admin/model/reload").status_code == 403
+    assert client.get("/api/admin/model", headers={"X-Admin-Token": ""}).status_code == 403
+    assert registry.current is None
+
+    monkeypatch.setattr(admin_routes, "ADMIN_TOKEN", "secreto")
+    assert client.post("/api/admin/model/reload").status_code == 403
+    headers = {"X-Admin-Token": "secreto"}
+    response = client.post("/api/admin/model/reload", headers=headers)
+    assert response.status_code == 200 and response.json()["version"] == v1
+    assert client.post("/api/admin/model/reload", headers=headers).json()["status"] == "unchanged"
+    assert client.get("/api/admin/model", headers=headers).json()["current"]["version"] == v1
+
+    path.write_bytes(b"no es un bundle")
+    response = client.post("/api/admin/model/reload?force=true", headers=headers)
+    assert response.status_code == 409
+    assert registry.current.version == v1
+    assert client.post("/api/predict", json=RECORD).json()["model_version"] == v1
+
+
+def test_model_version_is_stored_with_prediction(test_db):
+    record = {"age": 45, "job": "management", "marital": "married", "education": "tertiary", "balance": 1200.0}
+    db_model.save_prediction(record, 1, None, "20240101-120000-aaaaaaaa")
+    db_model.save_predictions([record], [0], None, "20240102-120000-bbbbbbbb")
+    # Fila del spool anterior a model_version (sin esa columna)
+    db_model.insert_prediction_rows([db_model.prediction_row(record, 1)[:7] + (datetime.now(),)])
+
+    conn = psycopg2.connect(test_db)
+    cur = conn.cursor()
+    cur.execute("SELECT result, model_version FROM predictions ORDER BY id")
+    assert cur.fetchall() == [(1, "20240101-120000-aaaaaaaa"), (0, "20240102-120000-bbbbbbbb"), (1, None)]
+    conn.close()
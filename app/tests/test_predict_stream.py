@@ -0,0 +1,138 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_predict_stream.py
+# =============================================
+"""
+Pruebas de /api/predict/stream: resultados y errores por línea, micro-lotes
+a medida que llega el cuerpo, contrapresión y memoria constante.
+"""
+
+import asyncio
+import json
+import tracemalloc
+
+from fastapi.testclient import TestClient
+
+from app.routes import predict_routes
+from app.services.model_registry import ModelRegistry
+
+RECORD = {
+    "age": 45, "job": "management", "marital": "married", "education": "tertiary",
+    "balance": 1200.0, "housing": "yes", "loan": "no", "contact": "cellular",
+    "day": 12, "month": "may", "duration": 300, "campaign": 2, "pdays": -1, "previous": 0,
+}
+LINE = (json.dumps(RECORD) + "\n").encode("utf-8")
+
+
+def _scope():
+    return {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/api/predict/stream", "raw_path": b"/api/predict/stream",
+        "root_path": "", "query_string": b"", "headers": [(b"content-type", b"application/x-ndjson")],
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+    }
+
+
+def _drive(app, chunks, on_body=None) -> dict:
+    """Ejecuta la app ASGI leyendo el cuerpo de 'chunks' bajo demanda, sin guardar la respuesta."""
+    chunks = iter(chunks)
+    state = {"status": None, "lines": 0, "bytes": 0}
+
+    async def receive():
+        chunk = next(chunks, None)
+        if chunk is None:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.request", "body": chunk, "more_body": True}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+        elif message["body"]:
+            state["lines"] += message["body"].count(b"\n")
+            state["bytes"] += len(message["body"])
+            if on_body is not None:
+                await on_body(message["body"], state)
+
+    asyncio.run(app(_scope(), receive, send))
+    return state
+
+
+def test_results_and_errors_per_line(loaded_controller):
+    from app.main import app
+
+    invalid = json.dumps({**RECORD, "age": -3}).encode()
+    last = json.dumps({**RECORD, "age": 60}).encode()
+    body = LINE + b"\n" + b"{roto\n" + invalid + b"\n" + last
+    response = TestClient(app).post("/api/predict/stream", content=body, headers={"content-type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert lines[0]["prediction"] in ("yes", "no") and lines[0]["model_version"] == "test"
+    assert "JSON inválido" in lines[1]["error"] and "age" in lines[2]["error"]
+    assert "probability" in lines[3]    # última línea sin salto final
+    assert len(loaded_controller) == 2
+
+
+def test_micro_batches_follow_the_body_with_backpressure(loaded_controller, monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(predict_routes, "PREDICT_STREAM_BATCH_SIZE", 10)
+    sent = {"records": 0}
+    gaps = []
+
+    def body():
+        data = LINE * 7
+        for _ in range(100):                  # 700 registros en trozos que cortan líneas
+            for start in range(0, len(data), 1000):
+                yield data[start:start + 1000]
+            sent["records"] += 7
+
+    async def slow_reader(chunk, state):
+        # Registros leídos y aún sin responder mientras el cliente lee despacio
+        gaps.append(sent["records"] - state["lines"])
+        await asyncio.sleep(0)
+
+    state = _drive(app, body(), slow_reader)
+    assert state["status"] == 200 and state["lines"] == 700
+    assert len(gaps) >= 70                    # respuestas por micro-lote, no al final
+    assert max(gaps) <= 10 + 7                # nunca más de un micro-lote y un trozo por delante
+    assert len(loaded_controller) == 700
+
+
+def test_memory_does_not_grow_with_lines(loaded_controller, monkeypatch):
+    from app.controllers import predict_controller
+    from app.main import app
+
+    # Sin guardar las filas en la lista del doble de la base de datos
+    monkeypatch.setattr(predict_controller, "save_predictions", lambda *args, **kwargs: None)
+
+    def peak(n_lines):
+        tracemalloc.start()
+        state = _drive(app, (LINE * 50 for _ in range(n_lines // 50)))
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert state["lines"] == n_lines
+        return peak_bytes
+
+    small, large = peak(1000), peak(10000)
+    assert large < small * 1.5
+
+
+def test_oversized_line_stops_the_stream(loaded_controller, monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(predict_routes, "PREDICT_STREAM_MAX_LINE_BYTES", 1000)
+    response = TestClient(app).post("/api/predict/stream", content=LINE + b"x" * 5000 + b"\n" + LINE)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["index"] == 0 and "prediction" in lines[0]
+    assert "1000 bytes" in lines[-1]["error"]
+
+
+def test_stream_without_model_returns_500(loaded_controller, monkeypatch):
+    from app.controllers import predict_controller
+    from app.main import app
+
+    monkeypatch.setattr(predict_controller, "model_registry", ModelRegistry(None))
+    response = TestClient(app).post("/api/predict/stream", content=LINE)
+    assert response.status_code == 500
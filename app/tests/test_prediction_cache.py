@@ -0,0 +1,87 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_prediction_cache.py
+# =============================================
+"""
+Pruebas de la caché de predicciones: LRU, TTL, invalidación por versión
+y uso desde make_prediction.
+"""
+
+from app.services.model_registry import LoadedModel
+from app.services.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_counters():
+    cache = PredictionCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1, "v1")
+    cache.put("b", 2, "v1")
+    assert cache.get("a", "v1") == 1  # "a" pasa a ser la más reciente
+    cache.put("c", 3, "v1")           # expulsa "b"
+
+    assert cache.get("b", "v1") is None
+    assert cache.get("c", "v1") == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 1, 1, 2)
+
+
+def test_ttl_expiration():
+    clock = FakeClock()
+    cache = PredictionCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.put("a", 1, "v1")
+    clock.now = 4.9
+    assert cache.get("a", "v1") == 1
+    clock.now = 5.0
+    assert cache.get("a", "v1") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_version_change_flushes_entries():
+    cache = PredictionCache(max_size=10, ttl_seconds=60)
+    cache.put("a", 1, "v1")
+    assert cache.get("a", "v2") is None
+    assert cache.get("a", "v1") is None  # ya no existe aunque se vuelva a v1
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_disabled_cache_never_stores():
+    cache = PredictionCache(max_size=0)
+    cache.put("a", 1, "v1")
+    assert cache.get("a", "v1") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_make_prediction_reuses_cached_result(loaded_controller, monkeypatch):
+    from app.controllers import predict_controller
+
+    lookups = []
+    monkeypatch.setattr(predict_controller, "find_client_by_features", lambda data: lookups.append(data) or 7)
+    record = {
+        "age": 45, "job": "management", "marital": "married", "education": "tertiary",
+        "balance": 1200.0, "housing": "yes", "loan": "no", "contact": "cellular",
+        "day": 12, "month": "may", "duration": 300, "campaign": 2, "pdays": -1, "previous": 0,
+    }
+
+    first = predict_controller.make_prediction(dict(record))
+    # Mismo perfil con los defaults explícitos -> misma clave canónica
+    second = predict_controller.make_prediction({**record, "default": "no", "poutcome": "unknown"})
+
+    assert first == second
+    assert len(lookups) == 1
+    assert len(loaded_controller) == 2  # ambas predicciones se siguen registrando
+    stats = predict_controller.get_prediction_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    # Un modelo nuevo (otra versión) no reutiliza resultados del anterior
+    active = predict_controller.model_registry.current
+    predict_controller.model_registry.install(
+        LoadedModel("retrained", active.feature_builder, active.compiled_model, active.model)
+    )
+    predict_controller.make_prediction(dict(record))
+    assert len(lookups) == 2
@@ -0,0 +1,101 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_prediction_series.py
+# =============================================
+"""
+Pruebas de la serie temporal de predicciones: elección del intervalo según el
+rango, mismos conteos que agrupar las filas en pandas y GET /api/dashboard/series.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dashboards.prediction_series import floor_to, pick_bucket, prediction_series
+
+T0 = datetime(2024, 6, 1, 22, 47, 13)
+
+
+def _load(n=3000, span=timedelta(days=3), seed=11):
+    from app.models.db_model import insert_prediction_rows, prediction_row
+
+    rng = random.Random(seed)
+    insert_prediction_rows([
+        prediction_row({"age": 40}, rng.randint(0, 1), None, T0 + rng.random() * span, "v1")
+        for _ in range(n)
+    ])
+    from app.tests.test_dashboard_metrics import _execute
+    _execute("INSERT INTO predictions (age, result, predicted_at) VALUES (30, 1, NULL)")
+
+
+def _pandas_series(bucket, start, end) -> list:
+    """Agrupa en pandas las filas de [start, end) por el intervalo pedido."""
+    from app.dashboards.db_utils import fetch_predictions
+
+    df = fetch_predictions()
+    df = df[(df["predicted_at"] >= start) & (df["predicted_at"] < end)]
+    freq = {"minute": "min", "hour": "h", "day": "D"}[bucket]
+    grouped = df.groupby(df["predicted_at"].dt.floor(freq))["result"].agg(["count", "sum"])
+    return [(ts.to_pydatetime(), int(total), int(positive)) for ts, (total, positive) in grouped.iterrows()]
+
+
+def test_pick_bucket_and_floor():
+    assert pick_bucket(T0, T0 + timedelta(hours=6), max_buckets=1500) == "minute"
+    assert pick_bucket(T0, T0 + timedelta(days=20), max_buckets=1500) == "hour"
+    assert pick_bucket(T0, T0 + timedelta(days=200), max_buckets=1500) == "day"
+    assert pick_bucket(T0, T0 + timedelta(days=5000), max_buckets=1500) == "day"
+    assert floor_to(T0, "minute") == datetime(2024, 6, 1, 22, 47)
+    assert floor_to(T0, "hour") == datetime(2024, 6, 1, 22)
+    assert floor_to(T0, "day") == datetime(2024, 6, 1)
+
+
+def test_explicit_bucket_is_validated():
+    load_range = lambda: (T0, T0 + timedelta(days=30))
+    with pytest.raises(ValueError):
+        prediction_series(bucket="week", load_range=load_range)
+    with pytest.raises(ValueError):
+        prediction_series(bucket="minute", max_buckets=1500, load_range=load_range)
+    with pytest.raises(ValueError):
+        prediction_series(T0, T0 - timedelta(hours=1), load=lambda *a: [])
+
+    empty = prediction_series(load_range=lambda: (None, None))
+    assert empty["points"] == [] and empty["start"] is None
+
+
+@pytest.mark.parametrize("bucket,start,end,max_buckets", [
+    ("minute", T0 + timedelta(hours=5, seconds=30), T0 + timedelta(hours=9), 1500),
+    ("hour", T0 + timedelta(hours=3, minutes=10), T0 + timedelta(days=2), 1500),
+    ("day", None, None, 24),       # todo el rango: ~73 horas
+])
+def test_matches_pandas_grouping(test_db, bucket, start, end, max_buckets):
+    _load()
+    series = prediction_series(start, end, max_buckets=max_buckets)
+    assert series["bucket"] == bucket
+
+    expected = _pandas_series(bucket, series["start"], series["end"])
+    assert [(p["bucket"], p["total"], p["positive"]) for p in series["points"]] == expected
+    assert sum(p["total"] for p in series["points"]) > 0
+    for p in series["points"]:
+        assert p["positive_rate"] == round(p["positive"] / p["total"] * 100, 2)
+
+
+def test_series_endpoint(test_db):
+    from app.main import app
+
+    _load(n=500, span=timedelta(hours=2))
+    expected = prediction_series()
+    with TestClient(app) as client:
+        body = client.get("/api/dashboard/series").json()
+        hourly = client.get("/api/dashboard/series", params={"bucket": "hour"}).json()
+        bad = client.get("/api/dashboard/series", params={"bucket": "week"})
+        zoom = client.get("/api/dashboard/series", params={
+            "start": (T0 + timedelta(minutes=30)).isoformat(), "end": (T0 + timedelta(minutes=45)).isoformat(),
+        }).json()
+
+    # Un punto por minuto con predicciones, no uno por fila
+    assert body["bucket"] == "minute" and len(body["points"]) == len(expected["points"]) <= 121
+    assert sum(p["total"] for p in body["points"]) == 500
+    assert len(hourly["points"]) == 3 and sum(p["total"] for p in hourly["points"]) == 500
+    assert bad.status_code == 400
+    assert zoom["start"] == datetime(2024, 6, 1, 23, 17).isoformat() and len(zoom["points"]) <= 16
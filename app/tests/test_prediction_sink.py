@@ -0,0 +1,229 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_prediction_sink.py
+# =============================================
+"""
+Pruebas del registro diferido de predicciones: agrupación por lotes, spool
+local cuando la base de datos falla, recuperación y vaciado al cerrar.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.prediction_sink import PredictionSink
+
+
+def _row(i):
+    return (None, 30 + i, "admin.", "single", "secondary", 100.0, i % 2, datetime(2024, 1, 1, 12) + timedelta(seconds=i))
+
+
+class FlakyWriter:
+    """Writer que falla mientras 'down' sea True y guarda los lotes recibidos."""
+
+    def __init__(self):
+        self.down = False
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, rows):
+        if self.down:
+            raise ConnectionError("base de datos caída")
+        with self.lock:
+            self.batches.append(list(rows))
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+
+@pytest.fixture
+def writer():
+    return FlakyWriter()
+
+
+def test_rows_are_written_in_batches(tmp_path, writer):
+    sink = PredictionSink(writer, str(tmp_path / "spool.jsonl"), batch_size=10, flush_interval=0.5)
+    sink.submit_many([_row(i) for i in range(25)])
+    assert sink.flush(timeout=5)
+
+    assert writer.rows == [_row(i) for i in range(25)]
+    # Dos lotes llenos sin esperar al intervalo; el resto sale al vencer el plazo
+    assert [len(b) for b in writer.batches][:2] == [10, 10]
+    stats = sink.stats()
+    assert (stats["enqueued"], stats["written"], stats["queue_depth"]) == (25, 25, 0)
+    assert stats["flush_latency_ms"]["max"] is not None
+    sink.close()
+
+
+def test_partial_batch_is_flushed_after_interval(tmp_path, writer):
+    sink = PredictionSink(writer, str(tmp_path / "spool.jsonl"), batch_size=100, flush_interval=0.05)
+    sink.submit(_row(0))
+    assert sink.flush(timeout=5)
+    assert writer.batches == [[_row(0)]]
+    sink.close()
+
+
+def test_failed_batches_go_to_spool_and_are_replayed(tmp_path, writer):
+    spool = tmp_path / "spool.jsonl"
+    sink = PredictionSink(writer, str(spool), batch_size=5, flush_interval=0.02, retry_interval=0.05)
+    writer.down = True
+    sink.submit_many([_row(i) for i in range(7)])
+    assert sink.flush(timeout=5)
+    assert writer.rows == []
+    assert sink.stats()["spooled"] == 7
+    assert sink.stats()["spool_bytes"] > 0
+
+    writer.down = False
+    time.sleep(0.1)  # vence retry_interval
+    sink.submit(_row(7))
+    sink.flush(timeout=5)
+    sink.close()
+
+    assert sorted(writer.rows, key=lambda r: r[1]) == [_row(i) for i in range(8)]
+    assert sink.stats()["replayed"] == 7
+    assert not spool.exists() and not (tmp_path / "spool.jsonl.replay").exists()
+
+
+def test_spool_survives_restart(tmp_path, writer):
+    spool = str(tmp_path / "spool.jsonl")
+    writer.down = True
+    first = PredictionSink(writer, spool, batch_size=5, flush_interval=0.02)
+    first.submit_many([_row(i) for i in range(3)])
+    first.close()
+    assert writer.rows == []
+
+    # Un proceso nuevo recupera el spool dejado por el anterior
+    writer.down = False
+    second = PredictionSink(writer, spool, batch_size=5, flush_interval=0.02)
+    second.submit(_row(3))
+    second.close()
+    assert sorted(writer.rows, key=lambda r: r[1]) == [_row(i) for i in range(4)]
+
+
+def test_truncated_spool_line_is_skipped(tmp_path, writer):
+    spool = tmp_path / "spool.jsonl"
+    sink = PredictionSink(writer, str(spool), flush_interval=0.02)
+    sink._spool([_row(0)])
+    with open(spool, "a", encoding="utf-8") as f:
+        f.write('[null, 31, "adm')  # escritura interrumpida
+    sink.submit(_row(1))
+    sink.close()
+    assert sorted(writer.rows, key=lambda r: r[1]) == [_row(0), _row(1)]
+
+
+def test_shared_spool_is_replayed_by_one_process(tmp_path):
+    # Dos sinks sobre el mismo spool, como dos workers de gunicorn
+    spool = str(tmp_path / "spool.jsonl")
+    replaying, release = threading.Event(), threading.Event()
+    first_rows, second_rows = [], []
+
+    def slow_writer(rows):
+        replaying.set()
+        release.wait(5)
+        first_rows.extend(rows)
+
+    first = PredictionSink(slow_writer, spool)
+    second = PredictionSink(second_rows.extend, spool)
+    first._spool([_row(i) for i in range(3)])
+
+    replay = threading.Thread(target=first._maybe_replay, kwargs={"force": True})
+    replay.start()
+    assert replaying.wait(5)
+    second._spool([_row(3)])            # escribir en el spool no espera a la reproducción
+    second._maybe_replay(force=True)    # la reproducción en curso es del otro proceso
+    assert second_rows == []
+    release.set()
+    replay.join(5)
+
+    second._maybe_replay(force=True)
+    assert sorted(r[1] for r in first_rows + second_rows) == [30, 31, 32, 33]
+
+
+def test_close_drains_queue(tmp_path, writer):
+    sink = PredictionSink(writer, str(tmp_path / "spool.jsonl"), batch_size=1000, flush_interval=60)
+    sink.submit_many([_row(i) for i in range(50)])
+    sink.close()
+    assert len(writer.rows) == 50
+    assert not sink.stats()["running"]
+
+    # Tras cerrar, el sink puede volver a usarse
+    sink.submit(_row(50))
+    sink.close()
+    assert len(writer.rows) == 51
+
+
+def test_full_queue_overflows_to_spool(tmp_path):
+    release = threading.Event()
+    written = []
+
+    def slow_writer(rows):
+        release.wait(5)
+        written.extend(rows)
+
+    sink = PredictionSink(slow_writer, str(tmp_path / "spool.jsonl"), batch_size=1, flush_interval=0.01, max_queue=2)
+    sink.submit_many([_row(i) for i in range(10)])
+    assert sink.stats()["overflowed"] > 0
+    release.set()
+    sink.close()
+    # Lo desbordado se recupera del spool al cerrar: no se pierde ninguna fila
+    assert sorted(r[1] for r in written) == [30 + i for i in range(10)]
+
+
+def test_make_prediction_enqueues_without_db(loaded_controller, monkeypatch, tmp_path, writer):
+    from app.controllers import predict_controller
+
+    def db_down(*args, **kwargs):
+        raise ConnectionError("base de datos caída")
+
+    sink = PredictionSink(writer, str(tmp_path / "spool.jsonl"), flush_interval=0.02)
+    monkeypatch.setattr(predict_controller, "prediction_sink", sink)
+    monkeypatch.setattr(predict_controller, "find_client_by_features", db_down)
+    writer.down = True
+
+    record = {
+        "age": 41, "job": "management", "marital": "married", "education": "tertiary",
+        "default": "no", "balance": 1500, "housing": "yes", "loan": "no",
+        "contact": "cellular", "day": 15, "month": "may", "duration": 300,
+        "campaign": 1, "pdays": -1, "previous": 0, "poutcome": "unknown",
+    }
+    result = predict_controller.make_prediction(record)
+    assert result["linked_client_id"] is None
+    assert predict_controller.prediction_cache.stats()["size"] == 0  # sin vincular no se cachea
+
+    writer.down = False
+    sink.close()
+    assert len(writer.rows) == 1
+    assert writer.rows[0][1:5] == (41, "management", "married", "tertiary")
+    assert loaded_controller == []  # no pasó por el INSERT síncrono
+
+
+def test_sync_and_async_paths_save_the_same_record(loaded_controller):
+    import asyncio
+
+    from app.controllers import predict_controller
+
+    # Sin sink, el INSERT síncrono recibe el registro normalizado en ambos caminos
+    record = {"age": 52, "job": "retired", "marital": "married", "education": "primary", "balance": 800}
+    predict_controller.make_prediction(dict(record))
+    asyncio.run(predict_controller.make_prediction_async(dict(record)))
+
+    (sync_data, *sync_rest), (async_data, *async_rest) = loaded_controller
+    assert async_data == sync_data and async_rest == sync_rest
+    assert async_data["poutcome"] == "unknown"      # DEFAULT_VALUES aplicados
+
+
+def test_sink_writes_to_postgres(test_db, tmp_path):
+    from app.database.connection import get_pool
+    from app.models.db_model import insert_prediction_rows
+
+    sink = PredictionSink(insert_prediction_rows, str(tmp_path / "spool.jsonl"), batch_size=50, flush_interval=0.02)
+    sink.submit_many([_row(i) for i in range(120)])
+    sink.close()
+
+    with get_pool().connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*), min(age), max(predicted_at) FROM predictions")
+            assert cur.fetchone() == (120, 30, datetime(2024, 1, 1, 12, 1, 59))
+    assert sink.stats()["flushes"] == 3
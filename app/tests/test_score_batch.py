@@ -0,0 +1,114 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_score_batch.py
+# =============================================
+"""
+Pruebas del scoring masivo: mismas predicciones que la API, orden de la
+entrada con varios procesos y carga en la base de datos.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import score_batch
+from app.services.model_bundle import save_bundle
+
+DATA_PATH = "app/data/raw/bank.csv"
+
+
+@pytest.fixture
+def bundle_path(tmp_path, bank_artifacts, trained_model):
+    _, label_encoders, _, feature_names = bank_artifacts
+    path = str(tmp_path / "model_bundle.bin")
+    save_bundle(path, trained_model, label_encoders, feature_names)
+    return path
+
+
+@pytest.fixture
+def campaign(tmp_path):
+    """Primeras 2000 filas de bank.csv sin la columna objetivo y con algunos campos vacíos."""
+    df = pd.read_csv(DATA_PATH, nrows=2000).drop(columns="deposit")
+    df.loc[::97, "job"] = None
+    df.loc[::131, "balance"] = None
+    path = tmp_path / "campaign.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def test_matches_the_api_batch_path(loaded_controller, bundle_path, campaign, tmp_path):
+    from app.controllers.predict_controller import make_batch_prediction
+
+    path, df = campaign
+    output = str(tmp_path / "scores.csv")
+    report = score_batch.score_file(path, output, workers=0, chunk_rows=300, bundle_path=bundle_path)
+
+    records = df.astype(object).where(df.notna(), None).to_dict("records")
+    expected = make_batch_prediction(records)
+    scored = pd.read_csv(output)
+    assert report["rows"] == len(scored) == len(df) and report["chunks"] == 7
+    assert scored["prediction"].tolist() == [r["prediction"] for r in expected]
+    np.testing.assert_allclose(scored["probability"], [r["probability"] for r in expected], rtol=1e-9)
+    # Las columnas de entrada se conservan tal cual
+    pd.testing.assert_frame_equal(scored[df.columns], df, check_dtype=False)
+
+
+def test_process_pool_keeps_input_order(bundle_path, campaign, tmp_path):
+    path, _ = campaign
+    serial, parallel = str(tmp_path / "serial.csv"), str(tmp_path / "parallel.csv")
+    score_batch.score_file(path, serial, workers=0, chunk_rows=150, bundle_path=bundle_path)
+    report = score_batch.score_file(path, parallel, workers=2, chunk_rows=150, bundle_path=bundle_path)
+
+    pd.testing.assert_frame_equal(pd.read_csv(serial), pd.read_csv(parallel))
+    assert report["workers"] == 2 and report["worker_peak_rss_mb"] > 0
+
+
+def test_cli_writes_report(bundle_path, campaign, tmp_path, capsys):
+    path, _ = campaign
+    report_path = tmp_path / "report.json"
+    report = score_batch.main([path, "--output", str(tmp_path / "scores.csv"), "--workers", "0",
+                               "--bundle", bundle_path, "--report", str(report_path)])
+
+    assert json.loads(report_path.read_text(encoding="utf-8")) == report
+    assert json.loads(capsys.readouterr().out) == report
+    assert report["rows"] == 2000 and report["rows_per_s"] > 0 and report["peak_rss_mb"] > 0
+
+
+def test_link_clients_and_save(test_db, bundle_path, campaign, tmp_path):
+    from app.database.connection import get_pool
+    from app.models.db_model import copy_into
+
+    path, df = campaign
+    # Dos de los registros de la campaña ya son clientes
+    clients = df.iloc[[1, 5]][["age", "job", "marital", "education", "balance"]]
+    copy_into([clients], "clients")
+
+    output = str(tmp_path / "scores.csv")
+    report = score_batch.score_file(path, output, workers=0, chunk_rows=500, bundle_path=bundle_path,
+                                    link_clients=True, save=True)
+    scored = pd.read_csv(output)
+
+    assert report["saved"] == 2000 and report["linked"] >= 2
+    assert scored.loc[[1, 5], "linked_client_id"].notna().all()
+    with get_pool().connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*), count(client_id), sum(result) FROM predictions")
+            assert cur.fetchone() == (2000, report["linked"], report["positive"])
+
+
+def test_parquet_schema_survives_type_changes_between_chunks(bundle_path, campaign, tmp_path):
+    pytest.importorskip("pyarrow")
+    path, df = campaign
+    # Primer bloque con poutcome y job vacíos (pandas los lee como float), el resto con texto
+    df.loc[:299, ["poutcome", "job"]] = None
+    df.to_csv(path, index=False)
+
+    output = str(tmp_path / "scores.parquet")
+    report = score_batch.score_file(path, output, workers=0, chunk_rows=300, bundle_path=bundle_path)
+    scored = pd.read_parquet(output)
+
+    assert report["rows"] == len(scored) == 2000
+    assert scored["poutcome"].iloc[:300].isna().all() and scored["poutcome"].iloc[300:].notna().all()
+    assert scored["poutcome"].iloc[300:].tolist() == df["poutcome"].iloc[300:].tolist()
+    assert scored["age"].tolist() == df["age"].tolist()
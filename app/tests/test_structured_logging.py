@@ -0,0 +1,120 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_structured_logging.py
+# =============================================
+"""
+Pruebas de los logs estructurados: formato JSON lines, request_id propagado
+a los pools de hilos, muestreo de payloads y cola que descarta sin bloquear.
+"""
+
+import io
+import json
+import logging
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import structured_logging
+from app.services.structured_logging import AsyncQueueHandler, configure_logging, flush_logging, request_id_var
+
+RECORD = {
+    "age": 45, "job": "management", "marital": "married", "education": "tertiary",
+    "balance": 1200.0, "housing": "yes", "loan": "no", "contact": "cellular",
+    "day": 12, "month": "may", "duration": 300, "campaign": 2, "pdays": -1, "previous": 0,
+}
+
+
+@pytest.fixture
+def log_lines():
+    """Redirige el logger "app" a un buffer en DEBUG; retorna una función que lee las líneas JSON."""
+    buffer = io.StringIO()
+    configure_logging(stream=buffer, level="DEBUG")
+
+    def read():
+        flush_logging()
+        return [json.loads(line) for line in buffer.getvalue().splitlines()]
+
+    yield read
+    configure_logging(stream=sys.stdout)
+
+
+def test_records_are_json_lines_with_request_id(log_lines):
+    log = logging.getLogger("app.test")
+    token = request_id_var.set("abc123")
+    try:
+        log.warning("Error BD: %s", "timeout", extra={"fields": {"error_type": "OperationalError"}})
+    finally:
+        request_id_var.reset(token)
+    log.info("sin solicitud")
+
+    first, second = log_lines()
+    assert first["msg"] == "Error BD: timeout" and first["level"] == "WARNING"
+    assert first["request_id"] == "abc123" and first["error_type"] == "OperationalError"
+    assert first["logger"] == "app.test" and "ts" in first and "pid" in first
+    assert second["request_id"] is None
+
+
+def test_debug_payloads_are_sampled(log_lines, loaded_controller, monkeypatch):
+    from app.controllers import predict_controller
+
+    monkeypatch.setattr(structured_logging, "LOG_DEBUG_SAMPLE_RATE", 0.0)
+    predict_controller.make_prediction(dict(RECORD))
+    assert not [line for line in log_lines() if "payload" in line or "vector" in line]
+
+    monkeypatch.setattr(structured_logging, "LOG_DEBUG_SAMPLE_RATE", 1.0)
+    predict_controller.make_prediction({**RECORD, "age": 50})
+    messages = {line["msg"]: line for line in log_lines()}
+    assert messages["Iniciando predicción"]["payload"]["age"] == 50
+    assert set(messages["Vector preparado"]["vector"]) >= {"age", "job", "balance"}
+    assert messages["Predicción calculada"]["model_version"] == "test"
+
+
+def test_request_id_reaches_worker_threads(log_lines, loaded_controller, monkeypatch):
+    from app.controllers import predict_controller
+    from app.main import app
+
+    def db_down(data):
+        raise ConnectionError("base de datos caída")
+
+    monkeypatch.setattr(predict_controller, "find_client_by_features", db_down)
+    client = TestClient(app)
+    response = client.post("/api/predict", json=RECORD, headers={"X-Request-ID": "req-42"})
+    assert response.status_code == 200
+    assert response.headers["x-request-id"] == "req-42"
+    assert client.get("/").headers["x-request-id"]  # generado si no viene
+
+    # La vinculación corre en el pool de E/S y conserva el request_id
+    warnings = [line for line in log_lines() if line["msg"].startswith("No se pudo vincular")]
+    assert warnings and warnings[0]["request_id"] == "req-42"
+
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+
+    class SlowHandler(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.records = []
+
+        def emit(self, record):
+            release.wait(5)
+            self.records.append(record)
+
+    target = SlowHandler()
+    handler = AsyncQueueHandler(target, maxsize=2)
+    log = logging.getLogger("app.test.slow")
+    log.propagate = False
+    log.addHandler(handler)
+    try:
+        started = time.perf_counter()
+        for i in range(10):
+            log.warning("registro %d", i)
+        assert time.perf_counter() - started < 1
+        assert handler.dropped >= 7
+    finally:
+        release.set()
+        handler.stop()
+        log.removeHandler(handler)
+    assert len(target.records) == 10 - handler.dropped
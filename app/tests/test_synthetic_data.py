@@ -0,0 +1,106 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_synthetic_data.py
+# =============================================
+"""
+Pruebas del generador sintético: reproducibilidad por semilla, fidelidad de
+las distribuciones aprendidas de bank.csv y salidas CSV / COPY.
+"""
+
+import pandas as pd
+import pytest
+
+from app.models.db_model import PREDICTION_COLUMNS
+from app.services.data_preprocessing import preprocess_data
+from app.services.synthetic_data import SyntheticModel, copy_into, to_predictions, write_csv, write_parquet
+
+DATA_PATH = "app/data/raw/bank.csv"
+
+
+@pytest.fixture(scope="module")
+def source():
+    return pd.read_csv(DATA_PATH)
+
+
+@pytest.fixture(scope="module")
+def model(source):
+    return SyntheticModel.fit(source)
+
+
+def test_seed_makes_output_reproducible(model):
+    first = pd.concat(model.generate(1200, seed=7, block_rows=500), ignore_index=True)
+    again = pd.concat(model.generate(1200, seed=7, block_rows=500), ignore_index=True)
+    longer = pd.concat(model.generate(3000, seed=7, block_rows=500), ignore_index=True)
+    other = pd.concat(model.generate(1200, seed=8, block_rows=500), ignore_index=True)
+
+    pd.testing.assert_frame_equal(first, again)
+    pd.testing.assert_frame_equal(first, longer.iloc[:1200])   # mismas primeras filas con más total
+    assert not first.equals(other)
+    assert [len(f) for f in model.generate(1200, block_rows=500)] == [500, 500, 200]
+
+
+def test_distributions_follow_source(model, source):
+    synthetic = pd.concat(model.generate(60000, seed=1), ignore_index=True)
+
+    assert list(synthetic.columns) == list(source.columns)
+    for column in ("job", "marital", "education", "month", "poutcome", "deposit"):
+        assert set(synthetic[column]) <= set(source[column])
+        expected = source[column].value_counts(normalize=True)
+        observed = synthetic[column].value_counts(normalize=True).reindex(expected.index, fill_value=0)
+        assert (expected - observed).abs().sum() / 2 < 0.02, column
+    for column in ("age", "balance", "day", "duration", "campaign", "pdays", "previous"):
+        assert source[column].min() <= synthetic[column].min() <= synthetic[column].max() <= source[column].max()
+        assert synthetic[column].median() == pytest.approx(source[column].median(), rel=0.1, abs=1)
+
+    # Dependencias conjuntas conservadas
+    assert ((synthetic["pdays"] == -1) == (synthetic["previous"] == 0)).mean() > 0.99
+    success_rate = lambda df: (df.loc[df["poutcome"] == "success", "deposit"] == "yes").mean()
+    assert success_rate(synthetic) == pytest.approx(success_rate(source), abs=0.02)
+
+
+def test_csv_feeds_training_pipeline(model, tmp_path):
+    expected_features = preprocess_data(DATA_PATH)[3]
+    path = str(tmp_path / "bank_synthetic.csv")
+    assert write_csv(model.generate(2000, seed=3, block_rows=700), path) == 2000
+
+    df, _, _, feature_names = preprocess_data(path)
+    assert len(df) == 2000 and "deposit" in df and feature_names == expected_features
+
+
+def test_prediction_rows(model):
+    start = pd.Timestamp("2025-03-01")
+    frames = list(to_predictions(model.generate(1000, seed=2, block_rows=300), 1000, start=start, days=10))
+    rows = pd.concat(frames, ignore_index=True)
+
+    assert list(rows.columns) == list(PREDICTION_COLUMNS)
+    assert rows["client_id"].isna().all() and set(rows["result"]) <= {0, 1}
+    assert rows["predicted_at"].is_monotonic_increasing
+    assert start <= rows["predicted_at"].min() and rows["predicted_at"].max() < start + pd.Timedelta(days=10)
+
+
+def test_parquet_requires_pyarrow(model, tmp_path):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        with pytest.raises(RuntimeError, match="pyarrow"):
+            write_parquet(model.generate(10), str(tmp_path / "out.parquet"))
+        return
+    path = str(tmp_path / "out.parquet")
+    assert write_parquet(model.generate(1000, block_rows=400), path) == 1000
+    pd.testing.assert_frame_equal(pd.read_parquet(path), pd.concat(model.generate(1000, block_rows=400),
+                                                                     ignore_index=True), check_dtype=False)
+
+
+def test_copy_into_tables(model, test_db):
+    import psycopg2
+
+    assert copy_into(model.generate(1500, seed=4, block_rows=600), "clients") == 1500
+    assert copy_into(to_predictions(model.generate(800, seed=4), 800), "predictions") == 800
+    with pytest.raises(ValueError):
+        copy_into(model.generate(1), "evaluation_metrics")
+
+    with psycopg2.connect(test_db) as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT count(*), count(DISTINCT job), min(age) >= 18 FROM clients')
+        assert cursor.fetchone() == (1500, 12, True)
+        cursor.execute("SELECT count(*), count(client_id), count(DISTINCT model_version) FROM predictions")
+        assert cursor.fetchone() == (800, 0, 1)
@@ -0,0 +1,115 @@
+# =============================================
+# 📁 Archivo: /app/tests/test_truth_view.py
+# =============================================
+"""
+Pruebas de la matriz de confusión desde la vista materializada
+prediction_truth: mismos valores que el cálculo anterior en pandas, refresco
+en segundo plano cuando está vieja y un solo refresco a la vez.
+"""
+
+import random
+import threading
+
+import pandas as pd
+import psycopg2
+from fastapi.testclient import TestClient
+from sklearn.metrics import accuracy_score, confusion_matrix
+
+from app.dashboards.db_utils import TRUTH_VIEW_LOCK_KEY
+from app.dashboards.truth_view import TruthView
+
+
+def _load(seed=3, n_clients=40, n_predictions=2000):
+    from app.models.db_model import copy_into, insert_prediction_rows, prediction_row
+
+    rng = random.Random(seed)
+    copy_into([pd.DataFrame({
+        "age": range(20, 20 + n_clients),
+        "deposit": [rng.choice(["yes", "no", "no", None]) for _ in range(n_clients)],
+    })], "clients")
+    insert_prediction_rows([
+        prediction_row({"age": 30}, rng.randint(0, 1), rng.choice([None, *range(1, n_clients + 1)]), None, "v1")
+        for _ in range(n_predictions)
+    ])
+
+
+def _pandas_truth():
+    """Cálculo anterior: el join completo en pandas con sklearn."""
+    from app.database.connection import connection
+
+    with connection() as conn:
+        df = pd.read_sql("SELECT p.result AS predicted, c.deposit AS actual "
+                         "FROM predictions p JOIN clients c ON p.client_id = c.id", conn)
+    df["actual"] = df["actual"].map({"yes": 1, "no": 0})
+    df = df[df["actual"].notna()]
+    actual, predicted = df["actual"].astype(int), df["predicted"].astype(int)
+    return (confusion_matrix(actual, predicted, labels=[0, 1]).tolist(),
+            round(accuracy_score(actual, predicted) * 100, 2))
+
+
+def test_matches_pandas_computation(test_db):
+    _load()
+    view = TruthView(max_age=3600)
+    assert view.summary()["labelled"] == 0        # la vista aún no se refrescó
+    assert view.refresh()
+
+    summary = view.summary()
+    matrix, accuracy = _pandas_truth()
+    assert summary["matrix"] == matrix and summary["accuracy"] == accuracy
+    assert summary["labelled"] == sum(map(sum, matrix)) > 0
+    assert view.stats()["refreshes"] == 1 and not view.stats()["refreshing"]
+
+
+def test_stale_view_is_refreshed_in_background():
+    cells = {(1, 1): 3}
+    refreshed, release = threading.Event(), threading.Event()
+
+    def slow_refresh():
+        release.wait(5)
+        cells[(0, 0)] = 5
+        refreshed.set()
+        return True
+
+    view = TruthView(max_age=60, load=lambda: (dict(cells), 120.0), refresh=slow_refresh)
+    first = view.summary()
+    # Se sirve el contenido actual sin esperar al refresco
+    assert first["matrix"] == [[0, 0], [0, 3]] and first["age_s"] == 120.0
+    assert view.stats()["refreshing"]
+    view.summary()                                 # no lanza un segundo refresco
+    release.set()
+    view.wait(5)
+
+    assert refreshed.is_set() and view.stats()["refreshes"] == 1
+    assert view.summary()["matrix"] == [[5, 0], [0, 3]]
+
+
+def test_fresh_view_is_not_refreshed():
+    view = TruthView(max_age=60, load=lambda: ({}, 10.0), refresh=lambda: 1 / 0)
+    assert view.summary() == {"matrix": [[0, 0], [0, 0]], "labelled": 0, "accuracy": 0, "age_s": 10.0}
+    assert view.stats()["refreshes"] == view.stats()["refresh_errors"] == 0
+
+
+def test_refresh_is_skipped_while_another_process_refreshes(test_db):
+    other = psycopg2.connect(test_db)
+    try:
+        other.cursor().execute("SELECT pg_advisory_lock(%s)", (TRUTH_VIEW_LOCK_KEY,))
+        view = TruthView()
+        assert not view.refresh()
+        assert view.stats()["refresh_skipped"] == 1
+    finally:
+        other.close()
+    assert view.refresh()
+
+
+def test_confusion_matrix_endpoint(test_db):
+    from app.dashboards.truth_view import truth_view
+    from app.main import app
+
+    _load(seed=5)
+    truth_view.refresh()
+    matrix, accuracy = _pandas_truth()
+    with TestClient(app) as client:
+        body = client.get("/api/dashboard/confusion-matrix").json()
+
+    assert body["matrix"] == matrix and body["accuracy"] == accuracy
+    assert set(body) == {"matrix", "labelled", "accuracy", "age_s"} and body["age_s"] < 60
@@ -3,13 +3,7 @@ from config import DB_CONFIG
 
 def test_connection():
     try:
-        conn = psycopg2.connect(
-            host=DB_CONFIG["host"],
-            user=DB_CONFIG["user"],
-            password=DB_CONFIG["password"],
-            dbname=DB_CONFIG["dbname"],
-            port=DB_CONFIG["port"]
-        )
+        conn = psycopg2.connect(DB_CONFIG["database_url"])
         print("✅ Conexión exitosa a la base de datos")
         
         # Intentar crear las tablas si no existen